@@ -1,49 +1,266 @@
 # Controller/AppController.py
+import queue
+import threading
 import traceback#デバッグ用
+from Model.change_events import ChangeBus, TermChangeEvent, RELOAD
+from Controller.view_lifecycle import ViewLifecycleManager, DEFAULT_MAX_VIEWS, count_widgets
+from Controller.ui_profiler import UIProfiler, profiled, ui_profile_enabled
+from Controller.async_bridge import TkAsyncBridge
+
+# 他プロセスからの DB 変更（PRAGMA data_version）を確認する間隔（ミリ秒）
+DATA_VERSION_POLL_MS = 1000
+
+# 他プロセスの変更を changefeed から読むときの読み手名
+APP_FEED_CONSUMER = "app"
+# これより多くの変更が一度に来たら、行単位の通知をやめて RELOAD にする
+EXTERNAL_EVENT_LIMIT = 500
 
 class AppController:
     """アプリケーション全体の画面遷移を統括するメインコントローラー"""
-    def __init__(self, root, db_path=None):
+    def __init__(self, root, db_path=None, max_views=DEFAULT_MAX_VIEWS, profile_ui=None):
         self.root = root
         self.root.geometry("600x400")
         self.current_controller = None
+        self.current_view_name = None
         self.db_path = db_path
 
+        # 生成済みの画面は LRU で保持し、戻ってきたときに使い回す
+        self.views = ViewLifecycleManager(max_views)
+
         # モデルの遅延初期化用の参照を保持（必要になったら生成）
         self._models = {}
 
+        # モデルの書き込み通知。UI 側の購読者にはメインスレッドで配る
+        self.events = ChangeBus()
+        self.events.subscribe(self._on_model_event)
+        self._ui_subscribers = []
+        self._pending_events = queue.Queue()
+        self._main_thread = threading.current_thread()
+        self._seen_versions = None
+        self._poll_id = None
+        # 前回の確認以降にこのプロセスが通知した用語の question_id（changefeed から読んでも配り直さない）
+        self._notified_ids = set()
+        self._publishing_feed = False
+
+        # コントローラが await でモデルを呼ぶためのイベントループと DB スレッド（後者は遅延生成）
+        self.async_bridge = TkAsyncBridge(root)
+        self.db_executor = None
+
         # コントローラーのファクトリ辞書（キーは小文字で統一）
         self.controllers = {
             "home": lambda: self._create_home_controller(),
             "wordbook": lambda: self._create_wordbook_controller(),
             "wordlist": lambda: self._create_wordlist_controller(),
             "wordentry": lambda: self._create_wordentry_controller(),
-            "quiz": None,
+            "quiz": lambda: self._create_quiz_controller(),
         }
 
+        # UI ハンドラの計測（既定は環境変数 ITLS_UI_PROFILE）
+        if profile_ui is None:
+            profile_ui = ui_profile_enabled()
+        self.profiler = UIProfiler(root).start() if profile_ui else None
+
+        # ウィンドウを閉じたときに DB 接続を確実に閉じる
+        self.root.protocol("WM_DELETE_WINDOW", self.shutdown)
+
         # 最初の画面を表示
         self.switch_view("home")
 
+    def shutdown(self):
+        """アプリ終了処理。保持している DB 接続を閉じてからウィンドウを破棄する。"""
+        from Model.BaseModel import close_all_connections
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        if self.profiler is not None:
+            self.profiler.stop()
+        self.views.clear()
+        self.async_bridge.shutdown()
+        if self.db_executor is not None:
+            self.db_executor.shutdown(wait=True, cancel_futures=True)
+        wordbook = self._models.get("wordbook")
+        if wordbook is not None:
+            wordbook.prefetch.shutdown()
+        answer_log = self._models.get("answers")
+        if answer_log is not None:
+            # 未書き出しの解答記録を DB に入れてから接続を閉じる
+            answer_log.shutdown()
+        try:
+            close_all_connections()
+        except Exception as e:
+            print(f"Warning: closing DB connections failed: {e}")
+        self.root.destroy()
+
     # モデルファクトリ
+    def _register_model(self, key, model):
+        if self.profiler is not None:
+            self.profiler.instrument_model(model)
+        self._models[key] = model
+        return model
+
+    def async_model(self, model):
+        """model のメソッドを DB スレッドで実行するコルーチンとして呼べる AsyncModel を返す"""
+        from Model.async_model import AsyncModel, create_db_executor
+        if self.db_executor is None:
+            self.db_executor = create_db_executor()
+        return AsyncModel(model, self.db_executor)
+
+    def run_async(self, coro, on_error=None):
+        """coro を Tk のメインスレッド上のイベントループで実行する（asyncio.Task を返す）"""
+        return self.async_bridge.spawn(coro, on_error)
+
+    def _get_term_repository(self):
+        # 用語キャッシュは全モデルで 1 つを共有する
+        if "terms" not in self._models:
+            from Model.term_repository import TermRepository
+            self._register_model("terms", TermRepository(db_path=self.db_path, events=self.events))
+            self._poll_id = self.root.after(DATA_VERSION_POLL_MS, self._poll_data_version)
+        return self._models["terms"]
+
+    # --- 変更通知 ---
+
+    def subscribe(self, callback):
+        """データ変更通知（TermChangeEvent）を受け取る。登録解除用の関数を返す。
+
+        callback は常に Tk のメインスレッドで呼ばれる。
+        """
+        self._ui_subscribers.append(callback)
+
+        def unsubscribe():
+            if callback in self._ui_subscribers:
+                self._ui_subscribers.remove(callback)
+        return unsubscribe
+
+    def on_term_changed(self, event=None):
+        """用語が変更されたことを知らせる。
+
+        event があればそのまま配信し、無ければ DB の変更有無を確認する。
+        """
+        if event is not None:
+            self.events.publish(event)
+        else:
+            self.check_external_changes()
+
+    def check_external_changes(self):
+        """PRAGMA data_version で他プロセスによる変更を検出し、あれば変更された行の通知を配信する。
+
+        どの行が変わったかは changefeed から読む（多すぎるときや読めないときは RELOAD）。
+        同じ間隔にこのプロセスの書き込みが混ざっていても changefeed は読み、通知済みの行だけを除く。
+        """
+        repository = self._models.get("terms")
+        if repository is None:
+            return
+        try:
+            feed = self._get_changefeed()
+            versions = (repository.sqlite_data_version(), repository.data_version())
+        except Exception as e:
+            print(f"Warning: checking data_version failed: {e}")
+            return
+        previous, self._seen_versions = self._seen_versions, versions
+        if previous is None or versions == previous:
+            return
+        notified, self._notified_ids = self._notified_ids, set()
+        try:
+            self._publish_feed_changes(repository, feed, notified)
+        except Exception as e:
+            print(f"Warning: reading changefeed failed: {e}")
+            self.events.publish(TermChangeEvent(RELOAD))
+        # ack 自体の書き込みを、次回このプロセスの書き込みと見なさないようにする
+        self._seen_versions = (versions[0], repository.data_version())
+
+    def _publish_feed_changes(self, repository, feed, notified=()):
+        from Model.changefeed import coalesce
+        changes = feed.read_batch(APP_FEED_CONSUMER, limit=EXTERNAL_EVENT_LIMIT + 1)
+        if not changes:
+            return
+        if len(changes) > EXTERNAL_EVENT_LIMIT:
+            feed.ack(APP_FEED_CONSUMER, feed.head())
+            self.events.publish(TermChangeEvent(RELOAD))
+            return
+        events = repository.change_events(
+            c for c in coalesce(changes) if c.table == "terms" and c.key not in notified)
+        feed.ack(APP_FEED_CONSUMER, changes[-1].seq)
+        self._publishing_feed = True
+        try:
+            for event in events:
+                self.events.publish(event)
+        finally:
+            self._publishing_feed = False
+
+    def _poll_data_version(self):
+        self._poll_id = None
+        self._drain_events()
+        self.check_external_changes()
+        self._poll_id = self.root.after(DATA_VERSION_POLL_MS, self._poll_data_version)
+
+    def _on_model_event(self, event):
+        if event.question_id is not None and not (
+                self._publishing_feed and threading.current_thread() is self._main_thread):
+            self._notified_ids.add(event.question_id)
+        if threading.current_thread() is self._main_thread:
+            self._dispatch_event(event)
+        else:
+            # ワーカースレッドからの通知は次のポーリングでメインスレッドに渡す
+            self._pending_events.put(event)
+
+    def _drain_events(self):
+        while True:
+            try:
+                event = self._pending_events.get_nowait()
+            except queue.Empty:
+                return
+            self._dispatch_event(event)
+
+    def _dispatch_event(self, event):
+        for callback in list(self._ui_subscribers):
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Warning: change subscriber failed: {e}")
+
     def _get_wordbook_model(self):
         if "wordbook" not in self._models:
             from Model.WordbookModel import WordbookModel
-            self._models["wordbook"] = WordbookModel(db_path=self.db_path)
+            self._register_model("wordbook", WordbookModel(db_path=self.db_path, repository=self._get_term_repository()))
         return self._models["wordbook"]
 
     def _get_wordlist_model(self):
         if "wordlist" not in self._models:
             from Model.wordlist_model import WordListModel
-            self._models["wordlist"] = WordListModel(db_path=self.db_path)
+            self._register_model("wordlist", WordListModel(db_path=self.db_path, repository=self._get_term_repository()))
         return self._models["wordlist"]
 
     def _get_wordentry_model(self):
         # 修正: key を "wordentry" をチェックする（以前は "wordlist" になっていた）
         if "wordentry" not in self._models:
             from Model.WordEntryModel import WordEntryModel
-            self._models["wordentry"] = WordEntryModel(db_path=self.db_path)
+            self._register_model("wordentry", WordEntryModel(db_path=self.db_path, repository=self._get_term_repository()))
         return self._models["wordentry"]
 
+    def _get_changefeed(self):
+        if "changefeed" not in self._models:
+            from Model.changefeed import Changefeed
+            feed = Changefeed(db_path=self.db_path)
+            # 起動前の変更はキャッシュに無関係なので読み飛ばす（ここで古い行も compaction される）
+            feed.register(APP_FEED_CONSUMER)
+            feed.ack(APP_FEED_CONSUMER, feed.head())
+            self._register_model("changefeed", feed)
+        return self._models["changefeed"]
+
+    def _get_quiz_model(self):
+        if "quiz" not in self._models:
+            from Model.quiz_scheduler import QuizScheduler
+            # 他プロセスの変更検出（RELOAD 通知）は用語キャッシュの data_version に頼る
+            self._get_term_repository()
+            self._register_model("quiz", QuizScheduler(db_path=self.db_path, events=self.events))
+        return self._models["quiz"]
+
+    def _get_answer_logger(self):
+        if "answers" not in self._models:
+            from Model.answer_log import AnswerLogger
+            self._register_model("answers", AnswerLogger(db_path=self.db_path))
+        return self._models["answers"]
+
     # コントローラ生成ラッパ（各 factory は遅延インポート）
     def _create_home_controller(self):
         from Controller.HomeController import HomeController
@@ -60,7 +277,12 @@ class AppController:
     def _create_wordentry_controller(self):
         from Controller.WordEntryController import WordEntryController
         return WordEntryController(self, self._get_wordentry_model())
+
+    def _create_quiz_controller(self):
+        from Controller.QuizController import QuizController
+        return QuizController(self, self._get_quiz_model(), self._get_answer_logger())
     
+    @profiled("app.switch_view")
     def switch_view(self, view_name):
         """指定されたビューに切り替える"""
         if view_name not in self.controllers:
@@ -73,23 +295,27 @@ class AppController:
             return
 
         try:
-            next_controller = factory()
+            next_controller, _created = self.views.get(view_name, factory)
         except Exception as e:
             print(f"Error: Failed to create controller for '{view_name}': {e}")
             return
 
-        if self.current_controller:
+        if self.current_controller and self.current_controller is not next_controller:
             try:
                 self.current_controller.hide()
             except Exception:
                 pass
 
         self.current_controller = next_controller
+        self.current_view_name = view_name
         try:
             self.current_controller.show()
         except Exception as e:
             print(f"Error: Showing controller '{view_name}' failed: {e}")
 
+        # 上限を超えた古い画面を破棄する（表示中の画面は残す）
+        self.views.evict_over_limit(keep=view_name)
+
         self.root.title(f"WordBook - {view_name.capitalize()}")
 
         if view_name == "wordbook":
@@ -99,6 +325,10 @@ class AppController:
                 except Exception as e:
                     print(f"Warning: initialize_data_on_switch failed: {e}")
 
+    def live_widget_count(self) -> int:
+        """root 配下で生きているウィジェット数（画面の破棄漏れ確認用）"""
+        return count_widgets(self.root)
+
     def open_wordbook(self, word_name: str):
         """wordbook 画面へ遷移し、遷移先コントローラに選択語を渡して表示させるヘルパ。"""
         # 切り替え
@@ -23,10 +23,10 @@ class HomeController:
         # メインコントローラーを通じてWordList画面への切り替えを指示
         self.root_controller.switch_view("wordlist")
 
-    #def go_to_quiz(self):
-    #    """「問題を解く」ボタンが押された時の処理"""
-    #    print("Controller: クイズ画面へ遷移を要求")
-    #    self.root_controller.switch_view("quiz")
+    def go_to_quiz(self):
+        """「問題を解く」ボタンが押された時の処理"""
+        print("Controller: クイズ画面へ遷移を要求")
+        self.root_controller.switch_view("quiz")
        
     def show(self):
         """この画面を表示状態にする"""
@@ -34,4 +34,8 @@ class HomeController:
 
     def hide(self):
         """この画面を非表示状態にする"""
-        self.view.pack_forget()
\ No newline at end of file
+        self.view.pack_forget()
+
+    def destroy(self):
+        """画面を破棄する（AppController が保持上限を超えたときに呼ぶ）"""
+        self.view.destroy()
\ No newline at end of file
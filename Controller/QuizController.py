@@ -0,0 +1,70 @@
+#QuizController.py
+from typing import Optional
+from Model.quiz_scheduler import QuizScheduler, QuizCard, PASSING_GRADE
+from Model.answer_log import AnswerLogger
+from View.QuizView import QuizView
+from Controller.ui_profiler import profiled
+
+class QuizController:
+    """クイズ画面。出題順は QuizScheduler（SM-2）に任せる"""
+    def __init__(self, root_controller, model: QuizScheduler, answer_log: Optional[AnswerLogger] = None):
+        self.root_controller = root_controller
+        self.model = model
+        self.answer_log = answer_log
+        # この画面で解いた問題数（answers.total_questions に記録する）
+        self.answered = 0
+        self.view = QuizView(root_controller.root, self)
+        self.current_card: Optional[QuizCard] = None
+
+    def show(self):
+        """この画面を表示状態にする（表示のたびに次の問題を出す）"""
+        self.view.pack(expand=True, fill='both')
+        if self.current_card is None:
+            self.next_question()
+
+    def hide(self):
+        self.view.pack_forget()
+
+    def destroy(self):
+        """画面を破棄する（AppController が保持上限を超えたときに呼ぶ）"""
+        self.view.destroy()
+
+    # --- 出題・採点 ---
+
+    def next_question(self):
+        self.current_card = self.model.next_card()
+        self._update_status()
+        if self.current_card is None:
+            self.view.show_finished("今日の問題はすべて終わりました")
+            return
+        self.view.show_question(self.current_card.term.word_name)
+
+    def reveal_answer(self):
+        if self.current_card is None:
+            return
+        self.view.show_answer(self.current_card.term.explain or "")
+
+    @profiled("quiz.answer")
+    def grade_answer(self, grade: int):
+        if self.current_card is None:
+            return
+        term = self.current_card.term
+        if self.model.answer(term.question_id, grade) is None:
+            print(f"Warning: failed to record answer for '{term.word_name}'")
+        self.answered += 1
+        if self.answer_log is not None:
+            # キューに積むだけ（DB への書き出しは AnswerLogger のスレッドがまとめて行う）
+            try:
+                self.answer_log.log(term.word_cloud_id or str(term.question_id),
+                                    grade < PASSING_GRADE, self.answered)
+            except Exception as e:
+                print(f"Warning: failed to log answer: {e}")
+        self.next_question()
+
+    def _update_status(self):
+        card = self.current_card
+        kind = "新しい用語" if card is not None and card.is_new else "復習"
+        self.view.set_status(f"{kind} / 期限切れ {self.model.due_count()} 件")
+
+    def handle_go_home(self):
+        self.root_controller.switch_view("home")
@@ -1,6 +1,7 @@
 # Controller/WordEntryController.py
 from typing import Optional
 from Model.WordEntryModel import WordEntryModel
+from Controller.ui_profiler import profiled
 import tkinter as tk
 from tkinter import messagebox
 
@@ -25,6 +26,7 @@ class WordEntryController:
         if hasattr(self.view, "show"):
             self.view.show()
 
+    @profiled("wordentry.create")
     def get_id_pass(self):
         """作成ボタン押下時の処理: 入力を取得して model.create_word を呼ぶ。"""
         self._ensure_view()
@@ -49,6 +51,12 @@ class WordEntryController:
         if self.view and hasattr(self.view, "close"):
             self.view.close()
 
+    def destroy(self):
+        """画面を破棄する（AppController が保持上限を超えたときに呼ぶ）"""
+        if self.view is not None:
+            self.view.frame.destroy()
+            self.view = None
+
     def create_close_window(self):
         """戻るボタン。Home に戻るよう AppController に切り替えを依頼する。"""
         # AppController が show_home / switch_view("home") を提供する想定
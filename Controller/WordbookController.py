@@ -2,6 +2,7 @@
 import tkinter as tk
 from Model.WordbookModel import WordbookModel
 from View.WordbookView import WordbookView
+from Controller.ui_profiler import profiled
 
 class WordbookController:
     def __init__(self, root_controller, model):
@@ -12,6 +13,7 @@ class WordbookController:
 
         # アプリ起動時はデータをロードしない (AppControllerからの指示を待つため)
 
+    @profiled("wordbook.load_term")
     def load_term(self, word_name: str):
         """渡された単語名で詳細を取得して View に表示する"""
         try:
@@ -19,14 +21,9 @@ class WordbookController:
             if not detail:
                 print(f"Warning: no detail found for '{word_name}'")
                 return
-            # detail のキーが 'id', 'name', 'desc' の形式を期待
-            if 'id' in detail:
-                try:
-                    self.model.current_word_id = int(detail['id'])
-                except Exception:
-                    pass
-            name = detail.get('name') or detail.get('word_name') or word_name
-            desc = detail.get('desc') or detail.get('explain') or ""
+            self.model.current_word_id = detail.question_id
+            name = detail.word_name or word_name
+            desc = detail.explain or ""
             # 表示（view.update_data は既存実装）
             self.view.update_data(name, desc)
         except Exception as e:
@@ -58,9 +55,7 @@ class WordbookController:
                 if hasattr(self.model, "get_by_id"):
                     detail = self.model.get_by_id(1)
                     if detail:
-                        name = detail.get('name') or detail.get('word_name') or ""
-                        desc = detail.get('desc') or detail.get('explain') or ""
-                        self.view.update_data(name, desc)
+                        self.view.update_data(detail.word_name or "", detail.explain or "")
         except Exception as e:
             print(f"Warning: initialize_data_on_switch failed: {e}")
 
@@ -72,6 +67,10 @@ class WordbookController:
         """この画面を非表示状態にする"""
         self.view.pack_forget()
 
+    def destroy(self):
+        """画面を破棄する（AppController が保持上限を超えたときに呼ぶ）"""
+        self.view.destroy()
+
     # --- UI表示・非表示トグルロジック ---
 
     def toggle_name_view(self):
@@ -87,6 +86,7 @@ class WordbookController:
 
     # --- データ切り替えロジック (次へ/前へ) ---
 
+    @profiled("wordbook.next")
     def handle_next_word(self):
         if hasattr(self.model, "go_to_next_word"):
             self.model.go_to_next_word()
@@ -95,6 +95,7 @@ class WordbookController:
         else:
             print("Warning: model has no go_to_next_word")
 
+    @profiled("wordbook.previous")
     def handle_previous_word(self):
         if hasattr(self.model, "go_to_previous_word"):
             self.model.go_to_previous_word()
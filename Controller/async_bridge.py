@@ -0,0 +1,87 @@
+# Controller/async_bridge.py
+import asyncio
+from typing import Callable, Coroutine, Dict, Optional, Set
+
+# 実行中のタスクがある間、イベントループを回す間隔（ミリ秒）
+DEFAULT_TICK_MS = 10
+
+
+class TkAsyncBridge:
+    """asyncio のイベントループを root.after で少しずつ回す。
+
+    - コルーチンは Tk のメインスレッドで進むので、await の後でそのまま View を触ってよい
+    - DB 呼び出しは AsyncModel 経由でワーカースレッドに出し、その間 Tk は止まらない
+    - タスクが無い間は after を登録しない（アイドル時に CPU を使わない）
+    """
+
+    def __init__(self, root, tick_ms: int = DEFAULT_TICK_MS):
+        self.root = root
+        self.tick_ms = tick_ms
+        self.loop = asyncio.new_event_loop()
+        self._tasks: Set[asyncio.Task] = set()
+        self._tick_id: Optional[str] = None
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    def spawn(self, coro: Coroutine, on_error: Optional[Callable[[Exception], None]] = None) -> asyncio.Task:
+        """coro をタスクとして開始する（最初の一歩は次の after で進む）。"""
+        task = self.loop.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(lambda t: self._on_done(t, on_error))
+        if self._tick_id is None:
+            self._tick_id = self.root.after(0, self._tick)
+        return task
+
+    def pending(self) -> int:
+        return len(self._tasks)
+
+    def shutdown(self):
+        """実行中のタスクを取り消し、イベントループを閉じる"""
+        if self._tick_id is not None:
+            try:
+                self.root.after_cancel(self._tick_id)
+            except Exception:
+                pass
+            self._tick_id = None
+        if self.loop.is_closed():
+            return
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+    def _run_once(self):
+        # stop() を先に呼んでおくと、run_forever は準備済みのコールバックを 1 巡だけ実行して戻る
+        self.loop.stop()
+        self.loop.run_forever()
+
+    def _tick(self):
+        self._tick_id = None
+        self._run_once()
+        if self._tasks:
+            self._tick_id = self.root.after(self.tick_ms, self._tick)
+
+    def _on_done(self, task: asyncio.Task, on_error: Optional[Callable[[Exception], None]]):
+        self._tasks.discard(task)
+        if task.cancelled():
+            self.cancelled += 1
+            return
+        error = task.exception()
+        if error is None:
+            self.completed += 1
+            return
+        self.failed += 1
+        try:
+            if on_error:
+                on_error(error)
+            else:
+                print(f"Warning: async task failed: {error}")
+        except Exception as e:
+            print(f"Warning: async error handler failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        return {'pending': len(self._tasks), 'completed': self.completed,
+                'failed': self.failed, 'cancelled': self.cancelled}
@@ -0,0 +1,134 @@
+# Controller/query_executor.py
+import queue
+import threading
+from typing import Any, Callable, Dict, Optional
+
+# 入力確定を待つ既定の時間（ミリ秒）
+DEFAULT_DEBOUNCE_MS = 150
+# ワーカーの結果を取りに行く間隔（ミリ秒）
+DEFAULT_POLL_MS = 15
+
+_STOP = object()
+
+
+class QueryExecutor:
+    """DB 問い合わせを Tk のメインスレッド外で実行する。
+
+    - 要求はチャネル（key）ごとに世代番号を持ち、新しい要求が来た時点で
+      古い要求は実行前・実行後どちらでも捨てられる
+    - debounce=True の要求は debounce_ms だけ待ってからワーカーに渡す
+    - 結果は root.after で回すポーリングでメインスレッドに戻し、callback を呼ぶ
+
+    ワーカースレッドは ConnectionManager から自分専用の接続を受け取る。
+    """
+
+    def __init__(self, root, connections=None, debounce_ms: int = DEFAULT_DEBOUNCE_MS,
+                 poll_ms: int = DEFAULT_POLL_MS):
+        self.root = root
+        self.connections = connections
+        self.debounce_ms = debounce_ms
+        self.poll_ms = poll_ms
+        self._requests: "queue.Queue" = queue.Queue()
+        self._results: "queue.Queue" = queue.Queue()
+        self._latest: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._debounce_ids: Dict[str, str] = {}
+        self._pending = 0
+        self._poll_id: Optional[str] = None
+        self.dropped = 0
+        self.completed = 0
+        self._worker = threading.Thread(target=self._run, name="QueryExecutor", daemon=True)
+        self._worker.start()
+
+    def submit(self, key: str, func: Callable[[], Any], callback: Callable[[Any], None],
+               on_error: Optional[Callable[[Exception], None]] = None, debounce: bool = False):
+        """func をワーカーで実行し、結果を callback(result) でメインスレッドに返す。"""
+        with self._lock:
+            generation = self._latest.get(key, 0) + 1
+            self._latest[key] = generation
+
+        after_id = self._debounce_ids.pop(key, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+            self.dropped += 1
+
+        request = (key, generation, func, callback, on_error)
+        if debounce and self.debounce_ms > 0:
+            self._debounce_ids[key] = self.root.after(self.debounce_ms, self._enqueue, request)
+        else:
+            self._enqueue(request)
+
+    def cancel(self, key: str):
+        """key の未処理・処理中の要求をすべて無効にする。"""
+        with self._lock:
+            self._latest[key] = self._latest.get(key, 0) + 1
+        after_id = self._debounce_ids.pop(key, None)
+        if after_id is not None:
+            self.root.after_cancel(after_id)
+
+    def shutdown(self):
+        for key in list(self._debounce_ids):
+            self.cancel(key)
+        if self._poll_id is not None:
+            try:
+                self.root.after_cancel(self._poll_id)
+            except Exception:
+                pass
+            self._poll_id = None
+        self._requests.put(_STOP)
+
+    def _is_current(self, key: str, generation: int) -> bool:
+        with self._lock:
+            return self._latest.get(key) == generation
+
+    def _enqueue(self, request):
+        self._debounce_ids.pop(request[0], None)
+        self._pending += 1
+        self._requests.put(request)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def _run(self):
+        while True:
+            request = self._requests.get()
+            if request is _STOP:
+                break
+            key, generation, func, callback, on_error = request
+            if not self._is_current(key, generation):
+                self._results.put((request, None, None, False))
+                continue
+            try:
+                self._results.put((request, func(), None, True))
+            except Exception as e:
+                self._results.put((request, None, e, True))
+        if self.connections is not None:
+            self.connections.close_thread()
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                request, result, error, ran = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._pending -= 1
+            key, generation, func, callback, on_error = request
+            if not ran or not self._is_current(key, generation):
+                self.dropped += 1
+                continue
+            self.completed += 1
+            try:
+                if error is not None:
+                    if on_error:
+                        on_error(error)
+                    else:
+                        print(f"Warning: background query '{key}' failed: {error}")
+                else:
+                    callback(result)
+            except Exception as e:
+                print(f"Warning: query callback for '{key}' failed: {e}")
+        if self._pending > 0:
+            self._poll_id = self.root.after(self.poll_ms, self._poll)
+
+    def stats(self) -> Dict[str, int]:
+        return {'pending': self._pending, 'completed': self.completed, 'dropped': self.dropped}
@@ -0,0 +1,105 @@
+# Controller/search_session.py
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from Model.term import Term
+
+# キャッシュしておくクエリ数の既定値
+DEFAULT_MAX_ENTRIES = 64
+
+# 絞り込みに使う Term の属性
+SEARCH_FIELDS = ('word_name', 'yomi', 'explain', 'tag')
+
+
+class SearchSession:
+    """入力中の検索を前回結果の絞り込みで処理するセッション。
+
+    クエリごとの結果を LRU で保持し、
+    - 同じクエリ（BackSpace で戻った場合など）はキャッシュをそのまま返す
+    - キャッシュ済みクエリを含む長いクエリは、その結果だけを絞り込む
+    - どちらにも当たらない場合だけ model で全体検索する
+    model.data_version() が変わったらキャッシュを捨てる。
+    """
+
+    def __init__(self, model, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.model = model
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, List[Term]]" = OrderedDict()
+        self._version: Optional[int] = None
+        self.last_query: str = ""
+        self.last_results: List[Term] = []
+        self.hits = 0
+        self.narrowed = 0
+        self.full_searches = 0
+
+    def search(self, query: str) -> List[str]:
+        """query に一致する用語名を関連度順で返す。"""
+        return [term.word_name for term in self.search_rows(query)]
+
+    def search_rows(self, query: str) -> List[Term]:
+        key = query.strip()
+        if not key:
+            return []
+        self._check_version()
+
+        rows = self._cache.get(key)
+        if rows is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+        else:
+            base = self._find_base(key)
+            if base is not None:
+                rows = self._narrow(self._cache[base], key)
+                self.narrowed += 1
+            else:
+                rows = self.model.search_terms_ranked(key)
+                self.full_searches += 1
+            self._store(key, rows)
+
+        self.last_query = key
+        self.last_results = rows
+        return rows
+
+    def clear(self):
+        self._cache.clear()
+        self.last_query = ""
+        self.last_results = []
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'entries': len(self._cache),
+            'hits': self.hits,
+            'narrowed': self.narrowed,
+            'full_searches': self.full_searches,
+        }
+
+    def _check_version(self):
+        version = self.model.data_version()
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def _is_complete(self, rows: List[Term]) -> bool:
+        # 上限で打ち切られた結果からは絞り込めない
+        limit = getattr(self.model, 'search_limit', None)
+        return limit is None or len(rows) < limit
+
+    def _find_base(self, key: str) -> Optional[str]:
+        """key を部分文字列として含む、最も長いキャッシュ済みクエリを探す。"""
+        best = None
+        for cached, rows in self._cache.items():
+            if cached in key and self._is_complete(rows):
+                if best is None or len(cached) > len(best):
+                    best = cached
+        return best
+
+    def _narrow(self, rows: List[Term], key: str) -> List[Term]:
+        needle = key.lower()
+        return [term for term in rows
+                if any(needle in (getattr(term, f) or '').lower() for f in SEARCH_FIELDS)]
+
+    def _store(self, key: str, rows: List[Term]):
+        self._cache[key] = rows
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
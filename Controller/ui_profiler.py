@@ -0,0 +1,244 @@
+# Controller/ui_profiler.py
+"""UI ハンドラの所要時間の計測と、イベントループの停止（stall）検出。
+
+環境変数 ITLS_UI_PROFILE=1 のとき AppController が UIProfiler を起動する。
+
+- @profiled("wordlist.search") を付けたハンドラの実時間を、モデル呼び出しの時間と
+  それ以外（ウィジェット操作など）の時間に分けて記録する
+- root.after の heartbeat が stall_ms 以上遅れたら停止とみなし、監視スレッドが
+  メインスレッドのスタックを採取してログに出す
+- report_interval_ms ごとにアクション別の p50 / p99 をログに出す
+"""
+import collections
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from Model.query_stats import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+UI_PROFILE_ENV = "ITLS_UI_PROFILE"
+
+DEFAULT_HEARTBEAT_MS = 50
+DEFAULT_STALL_MS = 250
+DEFAULT_REPORT_INTERVAL_MS = 30000
+# 記録しておく直近の停止の件数
+MAX_STALLS = 50
+
+# 起動中のプロファイラ（無ければ @profiled は何もしない）
+_active: Optional["UIProfiler"] = None
+
+
+def ui_profile_enabled() -> bool:
+    return os.environ.get(UI_PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def profiled(action: str) -> Callable:
+    """ハンドラの実行時間を action 名で記録するデコレータ（プロファイラ停止中はそのまま呼ぶ）"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _active
+            if profiler is None or threading.get_ident() != profiler.main_ident:
+                return func(*args, **kwargs)
+            return profiler.run(action, func, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class ActionStats:
+    __slots__ = ("wall", "model", "widget")
+
+    def __init__(self):
+        self.wall = LatencyHistogram()
+        self.model = LatencyHistogram()
+        self.widget = LatencyHistogram()
+
+    def as_dict(self, action: str) -> Dict:
+        return {
+            "action": action,
+            "calls": self.wall.count,
+            "p50_ms": self.wall.percentile(50),
+            "p99_ms": self.wall.percentile(99),
+            "max_ms": round(self.wall.max_ms, 3),
+            "model_p50_ms": self.model.percentile(50),
+            "model_p99_ms": self.model.percentile(99),
+            "widget_p50_ms": self.widget.percentile(50),
+            "widget_p99_ms": self.widget.percentile(99),
+        }
+
+
+class Stall(NamedTuple):
+    """イベントループの停止 1 件（heartbeat の再開時に記録する）"""
+    started: float
+    duration_ms: float
+    action: Optional[str]
+    stack: Optional[str]   # 監視スレッドが採取したメインスレッドのスタック
+
+
+class UIProfiler:
+    """UI ハンドラの計測とイベントループの監視"""
+
+    def __init__(self, root, heartbeat_ms: int = DEFAULT_HEARTBEAT_MS, stall_ms: int = DEFAULT_STALL_MS,
+                 report_interval_ms: int = DEFAULT_REPORT_INTERVAL_MS):
+        self.root = root
+        self.heartbeat_ms = heartbeat_ms
+        self.stall_ms = stall_ms
+        self.report_interval_ms = report_interval_ms
+        self.main_ident = threading.get_ident()
+        self._lock = threading.Lock()
+        self._actions: Dict[str, ActionStats] = {}
+        # 実行中のアクション（入れ子あり）。各要素は [action, モデル時間 ms]
+        self._stack: List[list] = []
+        self._model_depth = 0
+        self._last_beat = time.perf_counter()
+        # 監視スレッドが採取した停止中の (action, スタック)
+        self._stall_info: Optional[tuple] = None
+        self.stalls: "collections.deque[Stall]" = collections.deque(maxlen=MAX_STALLS)
+        self._after_ids: Dict[str, Optional[str]] = {"beat": None, "report": None}
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- 起動・停止 ---
+
+    def start(self) -> "UIProfiler":
+        global _active
+        _active = self
+        self._last_beat = time.perf_counter()
+        self._after_ids["beat"] = self.root.after(self.heartbeat_ms, self._beat)
+        if self.report_interval_ms:
+            self._after_ids["report"] = self.root.after(self.report_interval_ms, self._periodic_report)
+        self._stop.clear()
+        self._watchdog = threading.Thread(target=self._watch, name="ui-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info("UI プロファイラを開始しました (heartbeat %dms / stall %dms)", self.heartbeat_ms, self.stall_ms)
+        return self
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+        self._stop.set()
+        for key, after_id in self._after_ids.items():
+            if after_id is not None:
+                try:
+                    self.root.after_cancel(after_id)
+                except Exception:
+                    pass
+                self._after_ids[key] = None
+        if self._actions:
+            logger.info("UI ハンドラの所要時間:\n%s", self.report())
+
+    # --- ハンドラの計測 ---
+
+    def run(self, action: str, func, *args, **kwargs):
+        frame = [action, 0.0]
+        self._stack.append(frame)
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            wall_ms = (time.perf_counter() - started) * 1000.0
+            self._stack.pop()
+            self._record(action, wall_ms, frame[1])
+
+    def _record(self, action: str, wall_ms: float, model_ms: float):
+        with self._lock:
+            stats = self._actions.get(action)
+            if stats is None:
+                stats = self._actions[action] = ActionStats()
+            stats.wall.add(wall_ms)
+            stats.model.add(model_ms)
+            stats.widget.add(max(0.0, wall_ms - model_ms))
+
+    def instrument_model(self, model):
+        """model の公開メソッドをインスタンス上で包み、ハンドラ内での呼び出し時間をモデル時間に数える"""
+        if getattr(model, "_ui_profiled", False):
+            return model
+        for name in dir(type(model)):
+            if name.startswith("_"):
+                continue
+            method = getattr(model, name, None)
+            if callable(method) and not isinstance(method, type):
+                setattr(model, name, self._wrap_model_call(method))
+        model._ui_profiled = True
+        return model
+
+    def _wrap_model_call(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            # メインスレッドのハンドラ内で、最も外側のモデル呼び出しだけを数える
+            if not self._stack or self._model_depth or threading.get_ident() != self.main_ident:
+                return method(*args, **kwargs)
+            self._model_depth += 1
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._model_depth -= 1
+                elapsed = (time.perf_counter() - started) * 1000.0
+                for frame in self._stack:
+                    frame[1] += elapsed
+        return wrapper
+
+    # --- イベントループの監視 ---
+
+    def _beat(self):
+        now = time.perf_counter()
+        lag_ms = (now - self._last_beat) * 1000.0 - self.heartbeat_ms
+        self._last_beat = now
+        info, self._stall_info = self._stall_info, None
+        if lag_ms >= self.stall_ms:
+            action, stack = info or (None, None)
+            stall = Stall(time.time() - lag_ms / 1000.0, lag_ms, action, stack)
+            self.stalls.append(stall)
+            logger.warning("イベントループが %.0fms 停止しました (action=%s)", lag_ms, stall.action or "-")
+        self._after_ids["beat"] = self.root.after(self.heartbeat_ms, self._beat)
+
+    def _watch(self):
+        interval = self.heartbeat_ms / 1000.0
+        while not self._stop.wait(interval):
+            gap_ms = (time.perf_counter() - self._last_beat) * 1000.0 - self.heartbeat_ms
+            if gap_ms < self.stall_ms or self._stall_info is not None:
+                continue
+            frame = sys._current_frames().get(self.main_ident)
+            if frame is None:
+                continue
+            action = self._current_action()
+            stack = "".join(traceback.format_stack(frame))
+            self._stall_info = (action, stack)
+            logger.warning("イベントループが停止中です (%.0fms, action=%s)\n%s", gap_ms, action or "-", stack)
+
+    def _current_action(self) -> Optional[str]:
+        stack = list(self._stack)
+        return stack[-1][0] if stack else None
+
+    # --- 集計 ---
+
+    def summary(self) -> List[Dict]:
+        """アクション別の p50 / p99（全体・モデル・ウィジェット）を呼び出し回数の多い順で返す"""
+        with self._lock:
+            rows = [stats.as_dict(action) for action, stats in self._actions.items()]
+        rows.sort(key=lambda r: r["calls"], reverse=True)
+        return rows
+
+    def report(self) -> str:
+        lines = [f"{'calls':>6} {'p50':>8} {'p99':>8} {'model p99':>10} {'widget p99':>11}  action"]
+        for r in self.summary():
+            lines.append(f"{r['calls']:>6} {r['p50_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+                         f"{r['model_p99_ms']:>10.1f} {r['widget_p99_ms']:>11.1f}  {r['action']}")
+        if self.stalls:
+            worst = max(s.duration_ms for s in self.stalls)
+            lines.append(f"stalls: {len(self.stalls)} (max {worst:.0f}ms)")
+        return "\n".join(lines)
+
+    def _periodic_report(self):
+        if self._actions:
+            logger.info("UI ハンドラの所要時間:\n%s", self.report())
+        self._after_ids["report"] = self.root.after(self.report_interval_ms, self._periodic_report)
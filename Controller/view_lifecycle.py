@@ -0,0 +1,86 @@
+# Controller/view_lifecycle.py
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+# 同時に保持しておく画面（コントローラ）の既定数
+DEFAULT_MAX_VIEWS = 3
+
+
+def count_widgets(widget) -> int:
+    """widget 自身を含む配下のウィジェット数を数える"""
+    total = 1
+    for child in widget.winfo_children():
+        total += count_widgets(child)
+    return total
+
+
+class ViewLifecycleManager:
+    """画面ごとのコントローラを LRU で保持し、再訪時に使い回す。
+
+    上限を超えたら最も長く使われていない画面を destroy() で破棄する。
+    表示中の画面は破棄しない。
+    """
+
+    def __init__(self, max_views: int = DEFAULT_MAX_VIEWS):
+        self.max_views = max(1, max_views)
+        self._controllers: "OrderedDict[str, object]" = OrderedDict()
+        self.created = 0
+        self.resumed = 0
+        self.evicted = 0
+
+    def get(self, name: str, factory: Callable[[], object]) -> Tuple[object, bool]:
+        """name の画面のコントローラを返す。(controller, 新規生成したか)"""
+        controller = self._controllers.get(name)
+        if controller is not None:
+            self._controllers.move_to_end(name)
+            self.resumed += 1
+            return controller, False
+        controller = factory()
+        self._controllers[name] = controller
+        self.created += 1
+        return controller, True
+
+    def evict_over_limit(self, keep: Optional[str] = None):
+        """上限を超えた分を古い順に破棄する（keep は対象外）"""
+        for name in list(self._controllers):
+            if len(self._controllers) <= self.max_views:
+                break
+            if name == keep:
+                continue
+            self.discard(name)
+
+    def discard(self, name: str):
+        controller = self._controllers.pop(name, None)
+        if controller is None:
+            return
+        self.evicted += 1
+        destroy_controller(controller)
+
+    def clear(self):
+        for name in list(self._controllers):
+            self.discard(name)
+
+    def names(self):
+        return list(self._controllers)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'cached': len(self._controllers),
+            'created': self.created,
+            'resumed': self.resumed,
+            'evicted': self.evicted,
+        }
+
+
+def destroy_controller(controller):
+    """controller.destroy() があれば呼び、無ければ view を直接破棄する"""
+    try:
+        if hasattr(controller, "destroy"):
+            controller.destroy()
+            return
+        view = getattr(controller, "view", None)
+        widget = getattr(view, "frame", view)
+        if widget is not None and hasattr(widget, "destroy"):
+            widget.destroy()
+    except Exception as e:
+        print(f"Warning: destroying controller failed: {e}")
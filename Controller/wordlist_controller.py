@@ -1,6 +1,11 @@
 # Controller/wordlist_controller.py
-from typing import List, Optional, Callable
+import asyncio
+from typing import Dict, List, Optional, Callable
 from Model.wordlist_model import WordListModel
+from Controller.search_session import SearchSession
+from Controller.query_executor import QueryExecutor
+from Model.change_events import RELOAD
+from Controller.ui_profiler import profiled
 
 class WordListController:
     def __init__(self, root_controller, model: Optional[WordListModel] = None):
@@ -11,6 +16,16 @@ class WordListController:
         self.use_yomi_filter: bool = True
         self.view_update_callback: Optional[Callable] = None
         self.view = None  # 遅延生成
+        # 入力中の検索は前回結果を絞り込んで処理する
+        self.search_session = SearchSession(self.model)
+        # 一覧用の問い合わせはワーカースレッドで実行し、結果だけを Tk に戻す
+        self.executor = QueryExecutor(self.app.root, connections=getattr(self.model, "connections", None))
+        # 画面を開いたときの読み込みは、await で複数の問い合わせを同時に流す
+        self.amodel = self.app.async_model(self.model) if hasattr(self.app, "async_model") else None
+        self._initial_load = None
+        # 一覧を描き換える要求の通し番号（初期読み込みより後の要求があれば、その結果を優先する）
+        self._terms_requests = 0
+        self._unsubscribe: Optional[Callable] = None
 
     def _ensure_view(self):
         if self.view is None:
@@ -24,19 +39,16 @@ class WordListController:
                 print(f"Warning: ensure_view initialize failed: {e}")
 
     def set_view_update_callback(self, callback: Callable):
-        """View がコールバックを登録したときに直ちに現在データを渡す"""
+        """View がコールバックを登録したときにキャッシュ済みデータがあれば直ちに渡す"""
         self.view_update_callback = callback
         try:
-            # 可能ならキャッシュ済みデータを渡す（無ければ model から取得）
+            # 未取得なら initialize() の非同期読み込み完了時に描画される
             if getattr(self, "_last_terms", None) is not None:
                 callback(self._last_terms, None)
-            else:
-                terms = self.model.get_all_terms()
-                self._last_terms = terms
-                callback(terms, None)
         except Exception as e:
             print(f"Warning: set_view_update_callback failed to push initial data: {e}")
 
+    @profiled("wordlist.render")
     def _notify_view(self, terms: List[str], message: Optional[str] = None):
         self._ensure_view()
         # キャッシュ
@@ -47,46 +59,90 @@ class WordListController:
             if hasattr(self.view, "update_list"):
                 self.view.update_list(terms, message)
 
+    def _request_terms(self, query: Callable[[], List[str]], empty_message: Optional[str] = None,
+                       debounce: bool = False):
+        """query をワーカーで実行し、結果を View に反映する。
+
+        一覧を描き換える要求は同じチャネルに流すので、後から来た要求が前の要求を置き換える。
+        """
+        def deliver(terms: List[str]):
+            if not terms and empty_message:
+                self._notify_view([], empty_message)
+            else:
+                self._notify_view(terms)
+
+        def failed(error: Exception):
+            print(f"Warning: term query failed: {error}")
+            self._notify_view([], "用語の取得に失敗しました")
+
+        self._terms_requests += 1
+        self.executor.submit("terms", query, deliver, on_error=failed, debounce=debounce)
+
+    def _query_for_category(self, category: str) -> Callable[[], List[str]]:
+        if self.use_yomi_filter:
+            return lambda: self.model.get_terms_by_yomi(category)
+        return lambda: self.model.get_terms_by_category(category)
+
     def initialize(self):
         if not self.model.is_db_available():
             self._notify_view([], "データベースが見つかりません")
             return False
-        all_terms = self.model.get_all_terms()
-        self._notify_view(all_terms)
+        if self.amodel is not None:
+            if self._initial_load is not None:
+                self._initial_load.cancel()
+            self._initial_load = self.app.run_async(self._load_initial(self._terms_requests), on_error=self._initial_load_failed)
+        else:
+            self._request_terms(self.model.get_all_terms)
+            self._refresh_counts()
         return True
 
+    async def _load_initial(self, requests_before: int):
+        """用語一覧と件数（term_stats）を同時に読み込み、揃ったところで描画する"""
+        terms, stats = await asyncio.gather(self.amodel.get_all_terms(), self.amodel.get_stats())
+        if self._initial_load is asyncio.current_task():
+            self._initial_load = None
+        if self._terms_requests == requests_before:
+            self._notify_view(terms)
+        if self.view is not None:
+            self.view.update_index_counts(stats.get('by_yomi_row', {}))
+            self.view.update_term_count(stats.get('total', 0))
+
+    def _initial_load_failed(self, error: Exception):
+        self._initial_load = None
+        print(f"Warning: initial load failed: {error}")
+        if self.view is not None:
+            self._notify_view([], "用語の取得に失敗しました")
+
+    @profiled("wordlist.select_category")
     def select_category(self, category: str):
         self.current_category = category
         self.current_search_query = ""
-        if self.use_yomi_filter:
-            terms = self.model.get_terms_by_yomi(category)
-        else:
-            terms = self.model.get_terms_by_category(category)
-        if not terms:
-            message = f"{category}行の用語はありません"
-            self._notify_view([], message)
-        else:
-            self._notify_view(terms)
+        self._request_terms(self._query_for_category(category), f"{category}行の用語はありません")
 
+    @profiled("wordlist.clear_category")
     def clear_category(self):
         self.current_category = None
         self.apply_search(self.current_search_query)
 
+    @profiled("wordlist.search")
     def apply_search(self, query: str):
         self.current_search_query = query.strip()
         if self.current_search_query:
-            terms = self.model.search_terms(self.current_search_query)
-            if not terms:
-                self._notify_view([], "該当する用語はありません")
-            else:
-                self._notify_view(terms)
+            q = self.current_search_query
+            # キー入力ごとに呼ばれるので、入力が落ち着くまで待ってから検索する
+            self._request_terms(lambda: self._search_with_fallback(q), "該当する用語はありません",
+                                debounce=True)
         else:
             if self.current_category:
                 self.select_category(self.current_category)
             else:
-                all_terms = self.model.get_all_terms()
-                self._notify_view(all_terms)
+                self._request_terms(self.model.get_all_terms)
 
+    def _search_with_fallback(self, query: str) -> List[str]:
+        """通常の検索で何も無ければ、打ち間違いを許す検索の結果を返す（ワーカースレッドで呼ぶ）"""
+        return self.search_session.search(query) or self.model.fuzzy_search_terms(query)
+
+    @profiled("wordlist.clear_search")
     def clear_search(self):
         self.apply_search("")
 
@@ -96,18 +152,67 @@ class WordListController:
     def get_available_categories(self):
         return self.model.get_categories()
 
+    def get_category_counts(self) -> Dict[str, int]:
+        """索引ボタンに添える行ごとの用語数"""
+        return self.model.get_yomi_row_counts()
+
+    def _refresh_counts(self):
+        """索引ボタンの件数と総用語数を取り直す（term_stats を読むだけ）"""
+        if self.view is None or not hasattr(self.view, "update_index_counts"):
+            return
+        self.executor.submit("counts", self.model.get_yomi_row_counts, self.view.update_index_counts)
+        self.executor.submit("term_count", self.model.get_term_count, self.view.update_term_count)
+
     def get_stats(self):
         return self.model.get_stats()
 
+    def get_term_count(self) -> int:
+        return self.model.get_term_count()
+
+    def get_cache_stats(self):
+        """共有用語キャッシュのヒット/ミス数"""
+        return self.model.repository.stats()
+
     def refresh_data(self):
-        self.model.get_all_terms(force_refresh=True)
-        if self.current_search_query:
-            self.apply_search(self.current_search_query)
-        elif self.current_category:
-            self.select_category(self.current_category)
+        self._reload_current(force_refresh=True)
+
+    def _reload_current(self, force_refresh: bool):
+        """現在の検索条件・カテゴリで一覧を取り直す。"""
+        query = self.current_search_query
+        category = self.current_category
+        category_query = self._query_for_category(category) if category else None
+
+        def reload() -> List[str]:
+            # search_session はワーカースレッドからしか触らない
+            if force_refresh:
+                self.model.get_all_terms(force_refresh=True)
+                self.search_session.clear()
+            if query:
+                return self._search_with_fallback(query)
+            if category_query:
+                return category_query()
+            return self.model.get_all_terms()
+
+        if query:
+            message = "該当する用語はありません"
+        elif category:
+            message = f"{category}行の用語はありません"
         else:
-            all_terms = self.model.get_all_terms()
-            self._notify_view(all_terms)
+            message = None
+        self._request_terms(reload, message)
+
+    def on_data_changed(self, event):
+        """AppController からの変更通知（メインスレッドで呼ばれる）"""
+        if self.view is None:
+            return
+        self._refresh_counts()
+        if event.kind == RELOAD:
+            self.refresh_data()
+        elif self.current_search_query or self.current_category:
+            self._reload_current(force_refresh=False)
+        else:
+            # 名前一覧は共有キャッシュ側で差分更新済みなので、そのまま描き直す
+            self._notify_view(self.model.get_all_terms())
 
     def is_ready(self) -> bool:
         return self.model.is_db_available()
@@ -118,6 +223,9 @@ class WordListController:
             self.select_category(self.current_category)
 
     def show(self):
+        # 非表示の間も一覧を最新に保つため、破棄されるまで変更通知を受け取る
+        if self._unsubscribe is None and hasattr(self.app, "subscribe"):
+            self._unsubscribe = self.app.subscribe(self.on_data_changed)
     # view が未生成なら生成して初期描画させる
         try:
             self._ensure_view()
@@ -132,8 +240,7 @@ class WordListController:
         else:
             # デバッグ用フォールバック: view が None のままなら初期データを直接通知しておく
             try:
-                all_terms = self.model.get_all_terms()
-                self._notify_view(all_terms)
+                self._request_terms(self.model.get_all_terms)
             except Exception as e:
                 print(f"Warning: fallback notify failed: {e}")
 
@@ -141,6 +248,21 @@ class WordListController:
         if hasattr(self.view, "hide"):
             self.view.hide()
 
+    def destroy(self):
+        """画面を破棄する（AppController が保持上限を超えたときに呼ぶ）"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+        self.executor.shutdown()
+        if self._initial_load is not None:
+            self._initial_load.cancel()
+            self._initial_load = None
+        if self.view is not None:
+            self.view.frame.destroy()
+            self.view = None
+            self.view_update_callback = None
+
+    @profiled("wordlist.select_term")
     def on_term_selected(self, word_name: str):
         """用語が選択されたときの処理。
         AppController に wordbook 画面を開くよう依頼する。
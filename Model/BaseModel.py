@@ -2,10 +2,16 @@
 
 import sqlite3
 import os
-from typing import Optional, List, Dict
+import atexit
+import threading
+from typing import Any, Iterator, Optional, List, Dict, Tuple
 from contextlib import contextmanager
 import logging
 
+from Model.migrations import run_migrations
+from Model.query_stats import QueryStats, InstrumentedConnection, query_stats_enabled
+from Model.memory_replica import MemoryReplica, install_change_tracking, replica_enabled
+
 logger = logging.getLogger(__name__)
 
 DB_FILE = "word_master.db"
@@ -16,11 +22,235 @@ DB_CANDIDATES = [
     DB_FILE
 ]
 
+# 接続ごとに一度だけ適用する PRAGMA（順序どおりに実行）
+CONNECTION_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("cache_size", -16000),          # 負値は KiB 指定（約16MB）
+    ("mmap_size", 64 * 1024 * 1024),
+    ("foreign_keys", "ON"),
+)
+
+# sqlite3 のプリペアドステートメントキャッシュ（標準は 128）
+CACHED_STATEMENTS = 256
+
+# iter_rows が 1 回の fetchmany で読む行数
+DEFAULT_CHUNK_SIZE = 500
+
+
+class ConnectionManager:
+    """DB ファイルごとの接続マネージャ。
+
+    スレッドごとに長寿命の接続を 1 本だけ開き、以降はそれを使い回す。
+    PRAGMA は接続を開いたときに一度だけ適用する。
+    instrument が真（既定は環境変数 ITLS_QUERY_STATS）なら SQL の実行時間を query_stats に集計する。
+    replica が真（既定は環境変数 ITLS_MEMORY_REPLICA）なら、読み出しはメモリ上のレプリカから行う。
+    """
+
+    def __init__(self, db_path: str, cached_statements: int = CACHED_STATEMENTS,
+                 instrument: Optional[bool] = None, replica: Optional[bool] = None):
+        self.db_path = db_path
+        self.cached_statements = cached_statements
+        if instrument is None:
+            instrument = query_stats_enabled()
+        self.query_stats: Optional[QueryStats] = QueryStats() if instrument else None
+        if replica is None:
+            replica = replica_enabled()
+        self.replica: Optional[MemoryReplica] = MemoryReplica(db_path, query_stats=self.query_stats) if replica else None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        # マイグレーション適用後のスキーマバージョン（未確認なら None）
+        self.schema_version: Optional[int] = None
+        # close_all のたびに進める。古い世代の接続は acquire 時に開き直す
+        self._generation = 0
+        self.connects = 0
+        self.reuses = 0
+        # このプロセスからの書き込みコミットごとに進む版数
+        self.write_version = 0
+
+    def _open(self) -> sqlite3.Connection:
+        # 接続は所有スレッドだけが使うが、終了時の close_all は別スレッドから呼ばれうる
+        conn = sqlite3.connect(
+            self.db_path,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+            factory=InstrumentedConnection if self.query_stats is not None else sqlite3.Connection,
+        )
+        if self.query_stats is not None:
+            conn.query_stats = self.query_stats
+        conn.row_factory = sqlite3.Row
+        for name, value in CONNECTION_PRAGMAS:
+            try:
+                conn.execute(f"PRAGMA {name} = {value};")
+            except sqlite3.DatabaseError:
+                logger.warning("PRAGMA %s の適用に失敗しました", name)
+        with self._lock:
+            self._connections[threading.get_ident()] = conn
+            self.connects += 1
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        """呼び出しスレッド用の接続を返す（無ければ開く）。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "generation", None) != self._generation:
+            conn = self._open()
+            self._local.conn = conn
+            self._local.generation = self._generation
+            self._local.tracked_schema = None
+        else:
+            with self._lock:
+                self.reuses += 1
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """トランザクション単位で接続を貸し出す。
+
+        ネストした場合は最も外側だけが commit / rollback する。
+        """
+        conn = self.acquire()
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        if depth == 0 and self.replica is not None and self.replica.active:
+            self._track_changes(conn)
+        changes_before = conn.total_changes
+        try:
+            yield conn
+            if depth == 0:
+                if self.replica is not None:
+                    # 変わった行をコミットと同じ手順でメモリ上のレプリカへ写す
+                    self.replica.commit(conn, getattr(self._local, "tracked_schema", None))
+                else:
+                    conn.commit()
+                if conn.total_changes != changes_before:
+                    with self._lock:
+                        self.write_version += 1
+        except Exception:
+            if depth == 0:
+                conn.rollback()
+            raise
+        finally:
+            self._local.depth = depth
+
+    def _track_changes(self, conn: sqlite3.Connection):
+        """レプリカへ写す変更行を記録する TEMP トリガを、スキーマが変わっていれば入れ直す"""
+        schema = conn.execute("PRAGMA schema_version;").fetchone()[0]
+        if getattr(self._local, "tracked_schema", None) == schema:
+            return
+        try:
+            install_change_tracking(conn)
+        except sqlite3.DatabaseError:
+            logger.exception("変更行の記録トリガの作成エラー")
+            self._local.tracked_schema = None
+            return
+        self._local.tracked_schema = schema
+
+    @contextmanager
+    def read_connection(self):
+        """読み出し専用の接続を貸し出す。
+
+        レプリカが有効ならメモリ上の接続、そうでなければ（またはこのスレッドで書き込み中なら）ファイルの接続。
+        """
+        if self.replica is not None and not getattr(self._local, "depth", 0):
+            self.ensure_schema()
+            conn = self.replica.reader()
+            if conn is not None:
+                yield conn
+                return
+        with self.connection() as conn:
+            yield conn
+
+    def ensure_schema(self) -> int:
+        """未適用のマイグレーションをプロセス内で一度だけ適用する。"""
+        with self._lock:
+            if self.schema_version is not None:
+                return self.schema_version
+        with self.connection() as conn:
+            version = run_migrations(conn)
+        with self._lock:
+            self.schema_version = version
+        return version
+
+    @property
+    def saved_connects(self) -> int:
+        """接続を使い回したことで省略できた connect の回数"""
+        return self.reuses
+
+    def close_thread(self):
+        """呼び出しスレッドの接続を閉じる（ワーカースレッド終了時用）。"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+
+    def close_all(self):
+        """全スレッドの接続を閉じる（アプリ終了時用）。"""
+        if self.replica is not None:
+            self.replica.close()
+        with self._lock:
+            conns = list(self._connections.values())
+            self._connections.clear()
+            self._generation += 1
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                logger.exception("接続のクローズに失敗しました")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {
+                "connects": self.connects,
+                "saved_connects": self.reuses,
+                "open_connections": len(self._connections),
+            }
+        if self.replica is not None:
+            stats.update({"replica_" + key: value for key, value in self.replica.stats().items()})
+        return stats
+
+
+_managers: Dict[str, ConnectionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def get_connection_manager(db_path: str) -> ConnectionManager:
+    """db_path に対応する ConnectionManager を返す（プロセス内で共有）。"""
+    key = os.path.abspath(db_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = ConnectionManager(key)
+            _managers[key] = manager
+        return manager
+
+
+def close_all_connections():
+    """全 ConnectionManager の接続を閉じる（計測が有効なら集計をログに出す）。"""
+    with _managers_lock:
+        managers = list(_managers.values())
+    for manager in managers:
+        if manager.query_stats is not None:
+            logger.info("SQL 実行統計 (%s):\n%s", manager.db_path, manager.query_stats.report())
+        manager.close_all()
+
+
+atexit.register(close_all_connections)
+
+
 class BaseModel:
     def __init__(self, db_path: Optional[str] = None):
         self.db_path = db_path or self._find_db_path()
         if not self.db_path:
             raise ValueError("データベースファイル 'word_master.db' が見つかりません。")
+        self.connections = get_connection_manager(self.db_path)
+        try:
+            self.connections.ensure_schema()
+        except Exception:
+            logger.exception("スキーマの確認に失敗しました")
 
     def _find_db_path(self) -> Optional[str]:
         for p in DB_CANDIDATES:
@@ -31,24 +261,68 @@ class BaseModel:
 
     @contextmanager
     def get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
         try:
-            conn.row_factory = sqlite3.Row
-            conn.execute("PRAGMA foreign_keys = ON;")
-            yield conn
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
+            with self.connections.connection() as conn:
+                yield conn
+        except Exception:
             logger.exception("DB operation failed")
             raise
-        finally:
-            conn.close()
+
+    @contextmanager
+    def read_conn(self) -> sqlite3.Connection:
+        """読み出し専用の接続（メモリ上のレプリカが有効ならそちら）。書き込みには get_conn を使うこと"""
+        try:
+            with self.connections.read_connection() as conn:
+                yield conn
+        except Exception:
+            logger.exception("DB read failed")
+            raise
 
     def fetchall(self, sql, params=()):
-        with self.get_conn() as conn:
+        with self.read_conn() as conn:
             cur = conn.execute(sql, params)
             return [dict(row) for row in cur.fetchall()]
 
+    def fetchall_tuples(self, sql, params=()) -> List[Tuple]:
+        """Row ファクトリを使わずにタプルのリストで返す（dict を作らない分軽い）"""
+        with self.read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            return cur.execute(sql, params).fetchall()
+
+    def fetch_column(self, sql, params=(), index: int = 0) -> List[Any]:
+        """index 列目だけをリストで返す（用語名一覧など 1 列の取得用）"""
+        with self.read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            return [row[index] for row in cur.execute(sql, params)]
+
+    def fetch_value(self, sql, params=(), default: Any = None) -> Any:
+        """先頭行の先頭列を返す（行が無ければ default）"""
+        with self.read_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            row = cur.execute(sql, params).fetchone()
+            return row[0] if row else default
+
+    def iter_rows(self, sql, params=(), chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Tuple]:
+        """chunk_size 行ずつ fetchmany しながらタプルを 1 行ずつ返すジェネレータ。
+
+        読み終わるまで呼び出しスレッドの接続を使い続けるので、
+        反復の途中で同じスレッドから書き込みを行わないこと。
+        長く読み続ける用途（エクスポートなど）なので、レプリカではなくファイルから読む
+        （レプリカへの反映を止めないため）。
+        """
+        with self.get_conn() as conn:
+            cur = conn.cursor()
+            cur.row_factory = None
+            cur.execute(sql, params)
+            while True:
+                rows = cur.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+
     def execute(self, sql, params=()):
         with self.get_conn() as conn:
             cur = conn.execute(sql, params)
@@ -57,4 +331,26 @@ class BaseModel:
     def exists(self, table_name: str) -> bool:
         sql = "SELECT name FROM sqlite_master WHERE type='table' AND name=?;"
         rows = self.fetchall(sql, (table_name,))
-        return len(rows) > 0
\ No newline at end of file
+        return len(rows) > 0
+
+    def data_version(self) -> int:
+        """データが書き換わるたびに増える版数（キャッシュの無効化判定用）"""
+        return self.connections.write_version
+
+    def sqlite_data_version(self) -> int:
+        """PRAGMA data_version（この接続以外からのコミットで値が変わる）"""
+        with self.get_conn() as conn:
+            return conn.execute("PRAGMA data_version;").fetchone()[0]
+
+    def connection_stats(self) -> Dict[str, int]:
+        """接続の再利用状況（connects / saved_connects / open_connections）"""
+        return self.connections.stats()
+
+    def query_stats(self, top: Optional[int] = None) -> List[Dict]:
+        """SQL の形ごとの実行統計（calls / total_ms / p50_ms / p99_ms など）。計測が無効なら空"""
+        stats = self.connections.query_stats
+        return stats.snapshot(top) if stats is not None else []
+
+    def close(self):
+        """この DB ファイルの接続をすべて閉じる。"""
+        self.connections.close_all()
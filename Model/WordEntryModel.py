@@ -2,14 +2,18 @@
 
 from typing import Optional, List
 from Model.BaseModel import BaseModel
+from Model.term_repository import TermRepository, fetch_term_row
+from Model.change_events import TermChangeEvent, INSERT
 import logging
 
 logger = logging.getLogger(__name__)
 
 class WordEntryModel(BaseModel):
-    def __init__(self, db_path: Optional[str] = None, use_stub: bool = False):
+    def __init__(self, db_path: Optional[str] = None, use_stub: bool = False,
+                 repository: Optional[TermRepository] = None):
         super().__init__(db_path=db_path)
         self.use_stub = use_stub
+        self.repository = repository if repository is not None else TermRepository(db_path=self.db_path)
         self._stub_categories = ["生物", "物理", "数学", "歴史"]
         self._stub_makers = ["松下","日立","東芝","ソニー","シャープ","三井","三菱","住友","安田"]
 
@@ -17,9 +21,7 @@ class WordEntryModel(BaseModel):
         if self.use_stub:
             return self._stub_categories
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute("SELECT DISTINCT category FROM terms WHERE category IS NOT NULL ORDER BY category;")
-                return [r["category"] for r in cur.fetchall()]
+            return self.fetch_column("SELECT DISTINCT category FROM terms WHERE category IS NOT NULL ORDER BY category;")
         except Exception:
             logger.exception("カテゴリ取得エラー")
             return self._stub_categories
@@ -28,10 +30,8 @@ class WordEntryModel(BaseModel):
         if self.use_stub:
             return self._stub_makers
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute("SELECT DISTINCT maker FROM terms WHERE maker IS NOT NULL ORDER BY maker;")
-                rows = [r["maker"] for r in cur.fetchall()]
-                return rows if rows else self._stub_makers
+            rows = self.fetch_column("SELECT DISTINCT maker FROM terms WHERE maker IS NOT NULL ORDER BY maker;")
+            return rows if rows else self._stub_makers
         except Exception:
             logger.exception("メーカー取得エラー")
             return self._stub_makers
@@ -48,7 +48,10 @@ class WordEntryModel(BaseModel):
                     "INSERT INTO terms (word_name, explain, category, maker) VALUES (?, ?, ?, ?);",
                     (word_name, explain, category, maker)
                 )
-                return cur.lastrowid
+                new_id = cur.lastrowid
+                row = fetch_term_row(conn, new_id)
+            self.repository.events.publish(TermChangeEvent(INSERT, new_id, row=row))
+            return new_id
         except Exception:
             logger.exception("単語作成エラー")
             return None
\ No newline at end of file
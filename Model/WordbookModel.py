@@ -1,53 +1,50 @@
 # Model/WordbookModel.py
-from typing import Optional, Dict
+from typing import Optional, List, Tuple
 from Model.BaseModel import BaseModel
+from Model.term import Term
+from Model.term_repository import TermRepository, DETAIL_COLUMNS, fetch_term_row
+from Model.change_events import TermChangeEvent, UPDATE, DELETE
+from Model.prefetch_window import PrefetchWindow
 import logging
 
 logger = logging.getLogger(__name__)
 
 class WordbookModel(BaseModel):
-    def __init__(self, db_path: Optional[str] = None, use_stub: bool = False):
+    def __init__(self, db_path: Optional[str] = None, use_stub: bool = False,
+                 repository: Optional[TermRepository] = None):
         super().__init__(db_path=db_path)
         self.use_stub = use_stub
+        self.repository = repository if repository is not None else TermRepository(db_path=self.db_path)
+        # 次へ/前への移動用に前後の単語を先読みしておく（書き込みがあれば捨てる）
+        self.prefetch = PrefetchWindow(self._load_window)
+        self.repository.events.subscribe(lambda event: self.prefetch.invalidate())
         # stub データ
         self._stub_words = {
-            1: {"id":1, "name":"ベルクマンの法則", "desc":"..."},
-            2: {"id":2, "name":"アレンの法則", "desc":"..."}
+            1: Term("ベルクマンの法則", question_id=1, explain="..."),
+            2: Term("アレンの法則", question_id=2, explain="...")
         }
         # 表示中の状態（インスタンス属性として初期化）
         self.current_word_id: Optional[int] = None
         self.wN: str = ""
         self.wD: str = ""
 
-    def get_by_id(self, question_id: int) -> Optional[Dict]:
+    def get_by_id(self, question_id: int) -> Optional[Term]:
         if self.use_stub:
             return self._stub_words.get(question_id)
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute(
-                    "SELECT question_id AS id, word_name AS name, explain AS desc, tag, category, yomi FROM terms WHERE question_id = ? LIMIT 1;",
-                    (question_id,)
-                )
-                row = cur.fetchone()
-                return dict(row) if row else None
+            return self.repository.get_by_id(question_id)
         except Exception:
             logger.exception("ID検索エラー")
             return None
 
-    def get_term_detail(self, word_name: str) -> Optional[Dict]:
+    def get_term_detail(self, word_name: str) -> Optional[Term]:
         if self.use_stub:
             for v in self._stub_words.values():
-                if v["name"] == word_name:
+                if v.word_name == word_name:
                     return v
             return None
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute(
-                    "SELECT question_id AS id, word_name AS name, explain AS desc, tag, category, yomi FROM terms WHERE word_name = ? LIMIT 1;",
-                    (word_name,)
-                )
-                row = cur.fetchone()
-                return dict(row) if row else None
+            return self.repository.get_by_name(word_name)
         except Exception:
             logger.exception("詳細取得エラー")
             return None
@@ -57,16 +54,20 @@ class WordbookModel(BaseModel):
         if self.use_stub:
             if question_id in self._stub_words:
                 w = self._stub_words[question_id]
-                if word_name: w["name"] = word_name
-                if explain: w["desc"] = explain
+                self._stub_words[question_id] = w.replace(word_name=word_name or w.word_name,
+                                                          explain=explain or w.explain)
                 return True
             return False
         try:
             with self.get_conn() as conn:
+                old_row = fetch_term_row(conn, question_id)
                 conn.execute(
                     "UPDATE terms SET word_name = COALESCE(?, word_name), explain = COALESCE(?, explain), tag = COALESCE(?, tag), category = COALESCE(?, category) WHERE question_id = ?;",
                     (word_name, explain, tag, category, question_id)
                 )
+                row = fetch_term_row(conn, question_id)
+            if old_row is not None:
+                self.repository.events.publish(TermChangeEvent(UPDATE, question_id, row=row, old_row=old_row))
             return True
         except Exception:
             logger.exception("更新エラー")
@@ -77,35 +78,66 @@ class WordbookModel(BaseModel):
             return self._stub_words.pop(question_id, None) is not None
         try:
             with self.get_conn() as conn:
+                old_row = fetch_term_row(conn, question_id)
                 conn.execute("DELETE FROM terms WHERE question_id = ?;", (question_id,))
+            if old_row is not None:
+                self.repository.events.publish(TermChangeEvent(DELETE, question_id, old_row=old_row))
             return True
         except Exception:
             logger.exception("削除エラー")
             return False
 
     # ---------- ここから表示用の補助メソッドを追加 ----------
-    def fetch_word_data(self) -> Optional[Dict]:
+    def fetch_word_data(self) -> Optional[Term]:
         """current_word_id に基づき self.wN/self.wD を更新して返す"""
         if self.current_word_id is None:
             return None
-        if self.use_stub:
-            item = self._stub_words.get(self.current_word_id)
-            if not item:
-                return None
-            self.wN = item.get("name", "")
-            self.wD = item.get("desc", "")
-            return item
         try:
-            row = self.get_by_id(self.current_word_id)
-            if not row:
+            term = self.get_by_id(self.current_word_id)
+            if not term:
                 return None
-            self.wN = row.get("name") or row.get("word_name") or ""
-            self.wD = row.get("desc") or row.get("explain") or ""
-            return row
+            self.wN = term.word_name or ""
+            self.wD = term.explain or ""
+            return term
         except Exception:
             logger.exception("fetch_word_data error")
             return None
 
+    def _load_window(self, center_id: int, radius: int) -> Tuple[List[Term], bool, bool]:
+        """center_id の前 radius 件と、center_id 以降 radius + 1 件を 1 回の問い合わせで読む"""
+        rows = self.fetchall_tuples(f"""
+            SELECT * FROM (
+                SELECT {DETAIL_COLUMNS}
+                FROM terms WHERE question_id < :center ORDER BY question_id DESC LIMIT :before
+            )
+            UNION ALL
+            SELECT * FROM (
+                SELECT {DETAIL_COLUMNS}
+                FROM terms WHERE question_id >= :center ORDER BY question_id ASC LIMIT :after
+            )
+            ORDER BY question_id;
+        """, {"center": center_id, "before": radius, "after": radius + 1})
+        records = [Term.from_tuple(row) for row in rows]
+        before = sum(1 for r in records if r.question_id < center_id)
+        after = len(records) - before
+        return records, before < radius, after < radius + 1
+
+    def _move(self, step: int) -> bool:
+        """先読み窓を使って step 件移動し、wN/wD を更新する。"""
+        if self.current_word_id is None:
+            return False
+        try:
+            row = self.prefetch.neighbor(self.current_word_id, step)
+        except Exception:
+            logger.exception("先読みエラー")
+            return False
+        if not row:
+            return False
+        self.current_word_id = row.question_id
+        self.wN = row.word_name or ""
+        self.wD = row.explain or ""
+        return True
+
     def _get_next_id(self, current_id: int) -> Optional[int]:
         """current_id より大きい最小の question_id を返す"""
         if self.use_stub:
@@ -115,7 +147,7 @@ class WordbookModel(BaseModel):
                     return i
             return None
         try:
-            with self.get_conn() as conn:
+            with self.read_conn() as conn:
                 cur = conn.execute(
                     "SELECT question_id FROM terms WHERE question_id > ? ORDER BY question_id ASC LIMIT 1;",
                     (current_id,)
@@ -135,7 +167,7 @@ class WordbookModel(BaseModel):
                     return i
             return None
         try:
-            with self.get_conn() as conn:
+            with self.read_conn() as conn:
                 cur = conn.execute(
                     "SELECT question_id FROM terms WHERE question_id < ? ORDER BY question_id DESC LIMIT 1;",
                     (current_id,)
@@ -150,6 +182,8 @@ class WordbookModel(BaseModel):
         """次の単語へ移動して fetch する。移動できれば True"""
         if self.current_word_id is None:
             return False
+        if not self.use_stub:
+            return self._move(1)
         next_id = self._get_next_id(self.current_word_id)
         if not next_id:
             return False
@@ -160,6 +194,8 @@ class WordbookModel(BaseModel):
         """前の単語へ移動して fetch する。移動できれば True"""
         if self.current_word_id is None:
             return False
+        if not self.use_stub:
+            return self._move(-1)
         prev_id = self._get_prev_id(self.current_word_id)
         if not prev_id:
             return False
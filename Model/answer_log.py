@@ -0,0 +1,277 @@
+# Model/answer_log.py
+"""クイズの解答記録（answers テーブル）の後書きバッファ。
+
+log() はメモリ上のキューとジャーナルファイルに追記するだけで、DB を待たない。
+書き込みは専用スレッドがまとめて行う（1 トランザクションで executemany 1 回）。
+
+- キューが batch_size 件たまるか、最初の記録から flush_interval 秒たったら書き出す
+- shutdown() で残りを書き出してスレッドを止める
+- ジャーナルの各行には通し番号 seq を付け、書き出し済みの最大 seq は同じトランザクションで
+  settings の 'answers_committed_seq' に記録する。異常終了した場合は、次の起動時に
+  ジャーナルのうちそれより後の分だけを書き出す（二重登録しない）
+- 起動時の復旧に失敗したとき（DB がロック中など）は、ジャーナルの記録をキューに積んで
+  通常の書き出しで再試行する。ジャーナルを空にするのは、キューが空になった（全行を書き出した）ときだけ。
+  書き出し済みの seq が分からないまま振った通し番号は、最初の書き出しの前に読み直した seq の後ろへ振り直す
+"""
+import json
+import os
+import threading
+import time
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from Model.BaseModel import BaseModel
+
+logger = logging.getLogger(__name__)
+
+COMMITTED_SEQ_KEY = "answers_committed_seq"
+JOURNAL_SUFFIX = ".answers.journal"
+
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_FLUSH_INTERVAL = 2.0   # 秒
+
+INSERT_SQL = """
+    INSERT INTO answers (quiz_cloud_id, retry_checkflag, total_questions, answered_at)
+    VALUES (?, ?, ?, ?);
+"""
+SAVE_SEQ_SQL = """
+    INSERT INTO settings (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+"""
+
+
+class AnswerRecord(NamedTuple):
+    """answers の 1 行（seq はジャーナル上の通し番号で、DB には入れない）"""
+    seq: int
+    quiz_cloud_id: Optional[str]
+    retry_checkflag: int
+    total_questions: int
+    answered_at: float
+
+    def params(self) -> Tuple:
+        return self[1:]
+
+
+class AnswerLogger(BaseModel):
+    """解答記録をまとめて書き出す（group commit）"""
+
+    def __init__(self, db_path: Optional[str] = None, journal_path: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 fsync: bool = False, clock: Callable[[], float] = time.time):
+        super().__init__(db_path=db_path)
+        self.journal_path = journal_path or self.db_path + JOURNAL_SUFFIX
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        # True ならジャーナルの追記ごとに fsync する（電源断にも耐えるが、log() がディスクを待つ）
+        self.fsync = fsync
+        self.clock = clock
+        self._lock = threading.Lock()          # キューとジャーナル
+        self._flush_lock = threading.Lock()    # 書き出しは 1 つずつ
+        self._queue: List[AnswerRecord] = []
+        self._first_queued: Optional[float] = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self.logged = 0
+        self.flushed = 0
+        self.batches = 0
+        self.recovered = 0
+        self.last_flush_ms = 0.0
+        # 復旧に失敗したときは、ジャーナルから読んだ最大の seq と、書き出し済みの seq が未確認であること
+        self._journal_seq = 0
+        self._committed_unknown = False
+
+        self._seq = self._recover()
+        self._journal = open(self.journal_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="answer-log", daemon=True)
+        self._thread.start()
+
+    # --- 記録 ---
+
+    def log(self, quiz_cloud_id: Optional[str], retry_checkflag: bool, total_questions: int,
+            answered_at: Optional[float] = None) -> int:
+        """解答を 1 件記録する（キューに積むだけ）。通し番号を返す"""
+        answered_at = self.clock() if answered_at is None else answered_at
+        with self._lock:
+            if self._journal is None:
+                raise RuntimeError("AnswerLogger は停止済みです")
+            self._seq += 1
+            record = AnswerRecord(self._seq, quiz_cloud_id, int(bool(retry_checkflag)),
+                                  total_questions, answered_at)
+            self._journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._queue.append(record)
+            # 最初の 1 件（時間の期限を設定）と、batch_size 件目でスレッドを起こす
+            wake = self._first_queued is None or len(self._queue) >= self.batch_size
+            if self._first_queued is None:
+                self._first_queued = time.monotonic()
+            self.logged += 1
+        if wake:
+            self._wakeup.set()
+        return record.seq
+
+    def flush(self) -> int:
+        """キューの中身を 1 トランザクションで書き出す。書き出した件数を返す"""
+        with self._flush_lock:
+            if self._committed_unknown:
+                try:
+                    self._renumber(self._committed_seq())
+                except Exception:
+                    logger.exception("解答記録の書き出し済み番号の取得エラー")
+                    with self._lock:
+                        self._first_queued = time.monotonic()
+                    return 0
+            with self._lock:
+                batch, self._queue = self._queue, []
+                self._first_queued = None
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            try:
+                self._write(batch)
+            except Exception:
+                logger.exception("解答記録の書き込みエラー")
+                # 失敗した分はキューの先頭に戻し、次の書き出しで再試行する
+                with self._lock:
+                    self._queue[:0] = batch
+                    self._first_queued = time.monotonic()
+                return 0
+            self.last_flush_ms = (time.perf_counter() - started) * 1000.0
+            self.flushed += len(batch)
+            self.batches += 1
+            self._truncate_journal()
+            return len(batch)
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            pending = len(self._queue)
+        return {
+            'logged': self.logged,
+            'flushed': self.flushed,
+            'pending': pending,
+            'batches': self.batches,
+            'recovered': self.recovered,
+            'last_flush_ms': round(self.last_flush_ms, 3),
+        }
+
+    def shutdown(self):
+        """残りを書き出し、書き込みスレッドとジャーナルを閉じる"""
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join()
+        self.flush()
+        with self._lock:
+            journal, self._journal = self._journal, None
+        if journal is not None:
+            journal.close()
+
+    # --- 書き込みスレッド ---
+
+    def _run(self):
+        try:
+            while not self._stop.is_set():
+                with self._lock:
+                    first = self._first_queued
+                    full = len(self._queue) >= self.batch_size
+                if first is not None and (full or time.monotonic() - first >= self.flush_interval):
+                    self.flush()
+                    continue
+                timeout = None if first is None else first + self.flush_interval - time.monotonic()
+                self._wakeup.wait(timeout)
+                self._wakeup.clear()
+        finally:
+            self.connections.close_thread()
+
+    def _renumber(self, committed: int):
+        """復旧に失敗した後に振った番号が committed 以下なら、その後ろへ振り直してジャーナルも書き直す
+
+        ジャーナルから読んだ記録（_journal_seq 以下）は番号を変えない（書き出し済みかどうかを seq で判定する）。
+        """
+        with self._lock:
+            new = [r for r in self._queue if r.seq > self._journal_seq]
+            offset = max(committed, self._journal_seq) + 1 - new[0].seq if new else 0
+            if offset > 0:
+                self._queue = [r._replace(seq=r.seq + offset) if r.seq > self._journal_seq else r
+                               for r in self._queue]
+                self._seq += offset
+                if self._journal is not None:
+                    # 書き出しが 1 度も成功していないので、キューがジャーナルの全行と一致する
+                    self._journal.seek(0)
+                    self._journal.truncate()
+                    self._journal.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in self._queue)
+                    self._journal.flush()
+                    if self.fsync:
+                        os.fsync(self._journal.fileno())
+                logger.warning("解答記録の通し番号を %d 件振り直しました", len(new))
+            elif not new:
+                self._seq = max(self._seq, committed)
+            self._committed_unknown = False
+
+    def _write(self, batch: List[AnswerRecord]):
+        with self.get_conn() as conn:
+            # 書き出し済みの seq 以前の記録は入れない（復旧に失敗してキューに積んだ分の二重登録を防ぐ）
+            row = conn.execute("SELECT value FROM settings WHERE key = ?;", (COMMITTED_SEQ_KEY,)).fetchone()
+            committed = int(row[0]) if row is not None else 0
+            conn.executemany(INSERT_SQL, [record.params() for record in batch if record.seq > committed])
+            conn.execute(SAVE_SEQ_SQL, (COMMITTED_SEQ_KEY, str(max(committed, batch[-1].seq))))
+
+    def _truncate_journal(self):
+        # キューが空なら、ジャーナルの全行が書き出し済み
+        with self._lock:
+            if self._queue or self._journal is None:
+                return
+            self._journal.seek(0)
+            self._journal.truncate()
+
+    # --- 異常終了からの復旧 ---
+
+    def _committed_seq(self) -> int:
+        value = self.fetch_value("SELECT value FROM settings WHERE key = ?;", (COMMITTED_SEQ_KEY,))
+        return int(value) if value is not None else 0
+
+    def _read_journal(self) -> List[AnswerRecord]:
+        if not os.path.exists(self.journal_path):
+            return []
+        records = []
+        with open(self.journal_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(AnswerRecord(*json.loads(line)))
+                except (ValueError, TypeError):
+                    # 書きかけの最終行（異常終了時）は捨てる
+                    logger.warning("ジャーナルの壊れた行を読み飛ばしました: %r", line[:80])
+        return records
+
+    def _recover(self) -> int:
+        """ジャーナルのうち未書き出しの分を DB に入れ、次の通し番号の起点を返す"""
+        try:
+            committed = self._committed_seq()
+            records = self._read_journal()
+            missing = [r for r in records if r.seq > committed]
+            if missing:
+                self._write(missing)
+                self.recovered = len(missing)
+                logger.info("ジャーナルから解答記録を %d 件復旧しました", len(missing))
+            # 書きかけの行が残っていると次の追記が同じ行に続いてしまうので、常に空にする
+            open(self.journal_path, "w").close()
+            return max([committed] + [r.seq for r in records])
+        except Exception:
+            logger.exception("解答記録の復旧エラー（次の書き出しで再試行します）")
+            # 復旧できなかった記録はキューに積み、書き出すまでジャーナルを空にしない。
+            # 書きかけの行に次の追記が続かないよう、読めた行だけで書き直しておく
+            records = self._read_journal()
+            with open(self.journal_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            if records:
+                self._queue = records
+                self._first_queued = time.monotonic()
+            self._journal_seq = max([0] + [r.seq for r in records])
+            self._committed_unknown = True
+            return self._journal_seq
@@ -0,0 +1,51 @@
+# Model/async_model.py
+"""モデルの同期メソッドを asyncio から待てるようにする薄い包み（facade）。
+
+    amodel = AsyncModel(WordListModel(), executor)
+    terms, stats = await asyncio.gather(amodel.get_all_terms(), amodel.get_stats())
+
+メソッド呼び出しは DB 専用のスレッドプール（create_db_executor）で実行する。
+各スレッドは ConnectionManager から自分の接続を受け取るので、独立した読み出しは並行して進む。
+イベントループは Tk のメインスレッドで回す想定（Controller/async_bridge.py）。
+"""
+import asyncio
+import functools
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any
+
+# DB 呼び出し用スレッドの数（一覧・件数などの初期読み込みを並行に流せる程度）
+DEFAULT_DB_WORKERS = 3
+
+
+def create_db_executor(max_workers: int = DEFAULT_DB_WORKERS) -> ThreadPoolExecutor:
+    """DB 呼び出し専用のスレッドプール（接続はアプリ終了時の close_all_connections で閉じる）"""
+    return ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="itls-db")
+
+
+class AsyncModel:
+    """model の公開メソッドを、DB スレッドで実行するコルーチン関数として返す。
+
+    先頭が '_' の属性と呼び出せない属性は、元の model の値をそのまま返す。
+    書き込みの変更通知はワーカースレッドから発行されるが、AppController がメインスレッドに渡す。
+    """
+
+    def __init__(self, model, executor: Executor):
+        self._model = model
+        self._executor = executor
+
+    @property
+    def model(self):
+        return self._model
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._model, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+
+        call.__name__ = name
+        call.__doc__ = getattr(attr, "__doc__", None)
+        return call
@@ -0,0 +1,248 @@
+# Model/bulk_import.py
+"""CSV / TSV / JSONL から用語を一括登録する。
+
+ファイルは 1 行ずつ読み、batch_size 件ごとに executemany で投入する（全体で 1 トランザクション）。
+列名は terms と同じ（word_name, explain, tag, category, yomi, word_cloud_id）。
+
+    python -m Model.bulk_import terms.csv [--format csv|tsv|jsonl] [--batch-size 1000]
+"""
+import argparse
+import csv
+import json
+import os
+import time
+import unicodedata
+import logging
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Tuple
+
+from Model.BaseModel import BaseModel
+from Model.kana import normalize_yomi, yomi_row, yomi_row_key
+from Model.change_events import TermChangeEvent, RELOAD
+from Model.migrations import (CHANGEFEED_DEFERRED_KEY, FTS_DEFERRED_KEY, STATS_DEFERRED_KEY, SQL_NOW,
+                              rebuild_term_stats)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+FORMATS = {
+    '.csv': 'csv',
+    '.tsv': 'tsv',
+    '.tab': 'tsv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+}
+
+# updated_at / yomi_row はここで埋めて、行ごとの更新トリガを動かさない
+INSERT_SQL = ("INSERT INTO terms (word_name, explain, tag, category, yomi, word_cloud_id, yomi_row, updated_at) "
+              f"VALUES (?, ?, ?, ?, ?, ?, ?, {SQL_NOW});")
+
+
+class ImportProgress(NamedTuple):
+    rows_read: int
+    inserted: int
+    invalid: int
+    duplicates: int
+    elapsed: float
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed > 0 else 0.0
+
+
+ProgressCallback = Callable[[ImportProgress], None]
+
+
+def detect_format(path: str) -> str:
+    ext = os.path.splitext(path)[1].lower()
+    if ext not in FORMATS:
+        raise ValueError(f"対応していないファイル形式です: {ext}")
+    return FORMATS[ext]
+
+
+def iter_records(path: str, fmt: Optional[str] = None) -> Iterator[Dict]:
+    """ファイルを先頭から 1 レコードずつ dict で返す（全体をメモリに読み込まない）"""
+    fmt = fmt or detect_format(path)
+    with open(path, encoding='utf-8-sig', newline='') as f:
+        if fmt in ('csv', 'tsv'):
+            reader = csv.DictReader(f, delimiter=',' if fmt == 'csv' else '\t')
+            for record in reader:
+                yield record
+        elif fmt == 'jsonl':
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    logger.warning("JSON として読めない行をスキップしました: %d 行目", line_no)
+                    yield {}
+                    continue
+                yield record if isinstance(record, dict) else {}
+        else:
+            raise ValueError(f"対応していない形式です: {fmt}")
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    text = unicodedata.normalize('NFKC', str(value)).strip()
+    return text or None
+
+
+def normalize_category(category: Optional[str], yomi: Optional[str]) -> Optional[str]:
+    """カテゴリを五十音の行（'あ'〜'わ'）にそろえる。
+
+    terms.category は索引の行として使うので、1 文字のかな（'き' / 'キ' など）はその行の先頭にそろえ、
+    それ以外（'データベース' などの分類名や空）は読みから行を決める（読みも無ければ None）。
+    """
+    text = _text(category)
+    if text and len(text) == 1:
+        row = yomi_row(text)
+        if row:
+            return row
+    return yomi_row(yomi)
+
+
+def normalize_record(record: Dict) -> Optional[Tuple]:
+    """INSERT_SQL の引数タプルを返す。必須項目が欠けていれば None"""
+    word_name = _text(record.get('word_name'))
+    explain = _text(record.get('explain'))
+    if not word_name or not explain:
+        return None
+    yomi = normalize_yomi(record.get('yomi'))
+    tag = _text(record.get('tag'))
+    if tag:
+        tag = ','.join(t.strip() for t in tag.split(',') if t.strip()) or None
+    category = normalize_category(record.get('category'), yomi)
+    return (word_name, explain, tag, category, yomi, _text(record.get('word_cloud_id')), yomi_row_key(yomi))
+
+
+class BulkImporter(BaseModel):
+    """用語ファイルの一括取り込み"""
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 repository=None):
+        super().__init__(db_path=db_path)
+        self.batch_size = max(1, batch_size)
+        self.repository = repository
+
+    def import_file(self, path: str, fmt: Optional[str] = None,
+                    progress: Optional[ProgressCallback] = None) -> ImportProgress:
+        return self.import_records(iter_records(path, fmt), progress=progress)
+
+    def import_records(self, records, progress: Optional[ProgressCallback] = None) -> ImportProgress:
+        """records（dict の反復子）を取り込み、最終的な進捗を返す。
+
+        既存の word_name とファイル内で重複する word_name はスキップする。
+        途中で失敗した場合はすべてロールバックする。
+        """
+        started = time.perf_counter()
+        rows_read = inserted = invalid = duplicates = 0
+
+        def snapshot() -> ImportProgress:
+            return ImportProgress(rows_read, inserted, invalid, duplicates, time.perf_counter() - started)
+
+        with self.get_conn() as conn:
+            seen = set(self.fetch_column("SELECT word_name FROM terms;"))
+            fts_after_id = self._defer_fts(conn)
+            stats_deferred = self._defer_stats(conn)
+            changefeed_after_id = self._defer_changefeed(conn)
+            batch = []
+            for record in records:
+                rows_read += 1
+                params = normalize_record(record)
+                if params is None:
+                    invalid += 1
+                    continue
+                if params[0] in seen:
+                    duplicates += 1
+                    continue
+                seen.add(params[0])
+                batch.append(params)
+                if len(batch) >= self.batch_size:
+                    conn.executemany(INSERT_SQL, batch)
+                    inserted += len(batch)
+                    batch.clear()
+                    if progress:
+                        progress(snapshot())
+            if batch:
+                conn.executemany(INSERT_SQL, batch)
+                inserted += len(batch)
+            if fts_after_id is not None:
+                self._flush_fts(conn, fts_after_id)
+            if stats_deferred:
+                # 行ごとのトリガで数えるより、最後にまとめて数え直す方が速い
+                rebuild_term_stats(conn)
+                conn.execute("DELETE FROM settings WHERE key = ?;", (STATS_DEFERRED_KEY,))
+            if changefeed_after_id is not None:
+                self._flush_changefeed(conn, changefeed_after_id)
+
+        result = snapshot()
+        if progress:
+            progress(result)
+        logger.info("一括登録: %d 件追加 / 読込 %d 件 (%.0f 件/秒)", inserted, rows_read, result.rows_per_sec)
+        if inserted and self.repository is not None:
+            self.repository.events.publish(TermChangeEvent(RELOAD))
+        return result
+
+    def _defer_fts(self, conn) -> Optional[int]:
+        """行ごとの terms_fts 更新を止め、取り込み前の最大 question_id を返す（FTS が無ければ None）"""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'terms_fts';").fetchone():
+            return None
+        max_id = conn.execute("SELECT COALESCE(MAX(question_id), 0) FROM terms;").fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, '1');", (FTS_DEFERRED_KEY,))
+        return max_id
+
+    def _defer_stats(self, conn) -> bool:
+        """行ごとの term_stats 更新を止める（term_stats が無ければ False）"""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'term_stats';").fetchone():
+            return False
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, '1');", (STATS_DEFERRED_KEY,))
+        return True
+
+    def _defer_changefeed(self, conn) -> Optional[int]:
+        """行ごとの changefeed 記録を止め、取り込み前の最大 question_id を返す（changefeed が無ければ None）"""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'changefeed';").fetchone():
+            return None
+        max_id = conn.execute("SELECT COALESCE(MAX(question_id), 0) FROM terms;").fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO settings (key, value) VALUES (?, '1');", (CHANGEFEED_DEFERRED_KEY,))
+        return max_id
+
+    def _flush_changefeed(self, conn, after_id: int):
+        """取り込んだ行の insert を 1 文で changefeed に記録する"""
+        conn.execute("""
+            INSERT INTO changefeed (table_name, row_key, op)
+            SELECT 'terms', question_id, 'insert' FROM terms WHERE question_id > ? ORDER BY question_id;
+        """, (after_id,))
+        conn.execute("DELETE FROM settings WHERE key = ?;", (CHANGEFEED_DEFERRED_KEY,))
+
+    def _flush_fts(self, conn, after_id: int):
+        """取り込んだ行（AUTOINCREMENT なので after_id より大きい）を 1 文で terms_fts に追加する"""
+        conn.execute("""
+            INSERT INTO terms_fts (rowid, word_name, yomi, explain, tag)
+            SELECT question_id, word_name, yomi, explain, tag FROM terms WHERE question_id > ?;
+        """, (after_id,))
+        conn.execute("DELETE FROM settings WHERE key = ?;", (FTS_DEFERRED_KEY,))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="用語ファイルを terms に一括登録する")
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=sorted(set(FORMATS.values())))
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--db")
+    args = parser.parse_args(argv)
+
+    def report(p: ImportProgress):
+        print(f"\r読込 {p.rows_read} / 追加 {p.inserted} / 重複 {p.duplicates} / 不正 {p.invalid}"
+              f"  ({p.rows_per_sec:.0f} 件/秒)", end="", flush=True)
+
+    importer = BulkImporter(db_path=args.db, batch_size=args.batch_size)
+    importer.import_file(args.path, fmt=args.format, progress=report)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# Model/change_events.py
+import threading
+import logging
+from typing import Callable, List, NamedTuple, Optional
+
+from Model.term import Term
+
+logger = logging.getLogger(__name__)
+
+# イベント種別
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+RELOAD = "reload"   # 何が変わったか分からない（他プロセスでの変更・一括処理など）
+
+
+class TermChangeEvent(NamedTuple):
+    """terms テーブルへの変更通知。
+
+    row は変更後の行、old_row は変更前の行（どちらも Term）。
+    insert では old_row、delete では row が None になる。reload では両方 None。
+    """
+    kind: str
+    question_id: Optional[int] = None
+    row: Optional[Term] = None
+    old_row: Optional[Term] = None
+
+    @property
+    def word_name(self) -> Optional[str]:
+        source = self.row or self.old_row
+        return source.word_name if source else None
+
+
+Subscriber = Callable[[TermChangeEvent], None]
+
+
+class ChangeBus:
+    """モデルの書き込みを購読者に配る同期イベントバス。
+
+    publish は書き込みを行ったスレッドでそのまま購読者を呼ぶ。
+    Tk のウィジェットを触る購読者は AppController.subscribe 経由で登録すること
+    （メインスレッドへの受け渡しは AppController が行う）。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: List[Subscriber] = []
+        self.published = 0
+
+    def subscribe(self, callback: Subscriber) -> Callable[[], None]:
+        """callback を登録し、登録解除用の関数を返す。"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def unsubscribe():
+            self.unsubscribe(callback)
+        return unsubscribe
+
+    def unsubscribe(self, callback: Subscriber):
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, event: TermChangeEvent):
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("変更通知の処理に失敗しました: %s", event.kind)
@@ -0,0 +1,218 @@
+# Model/changefeed.py
+"""terms / words の変更履歴（changefeed テーブル）の読み手 API。
+
+changefeed にはトリガが insert / update / delete のたびに (seq, table_name, row_key, op) を追記する。
+読み手は名前を付けて register し、read_batch で自分の位置（cursor）より後の変更を seq 順に読み、
+処理が済んだら ack で位置を進める。全読み手が読み終えた行は ack のたびに消す（compaction）。
+
+    feed = Changefeed()
+    feed.register("exporter")
+    for batch in feed.consume("exporter", tables=("terms",)):
+        for change in batch: ...        # ブロックを抜けると（次の反復で）ack される
+
+読み手が居ない間の変更は残さない。register した時点より後の変更から読める。
+"""
+import logging
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+
+from Model.BaseModel import BaseModel
+from Model.migrations import SQL_NOW
+
+logger = logging.getLogger(__name__)
+
+INSERT = "insert"
+UPDATE = "update"
+DELETE = "delete"
+
+DEFAULT_BATCH_SIZE = 500
+
+
+class Change(NamedTuple):
+    seq: int
+    table: str
+    key: int
+    op: str
+    changed_at: float
+
+
+def coalesce(changes: Iterable[Change]) -> List[Change]:
+    """同じ行への複数の変更を最後の 1 件にまとめる（seq 順を保つ）
+
+    insert の後に delete された行は消し、insert の後の update は insert として残す。
+    """
+    latest: Dict[tuple, Change] = {}
+    for change in changes:
+        ident = (change.table, change.key)
+        previous = latest.pop(ident, None)
+        if previous is not None and previous.op == INSERT:
+            if change.op == DELETE:
+                continue
+            change = change._replace(op=INSERT)
+        latest[ident] = change
+    return sorted(latest.values())
+
+
+class ConsumerInfo(NamedTuple):
+    name: str
+    cursor: int
+    lag: int            # 未読の変更の件数
+    updated_at: float
+
+
+class Changefeed(BaseModel):
+    """changefeed の読み手の登録・読み出し・位置の保存と compaction"""
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 auto_compact: bool = True):
+        super().__init__(db_path=db_path)
+        self.batch_size = max(1, batch_size)
+        self.auto_compact = auto_compact
+        self.compacted = 0
+
+    # --- 読み手の登録 ---
+
+    def register(self, name: str, from_start: bool = False) -> int:
+        """読み手を登録して位置を返す（登録済みなら保存済みの位置）。
+
+        from_start が真なら、残っている最も古い変更から読む。
+        """
+        try:
+            with self.get_conn() as conn:
+                row = conn.execute("SELECT cursor FROM changefeed_consumers WHERE name = ?;", (name,)).fetchone()
+                if row is not None:
+                    return row[0]
+                cursor = 0 if from_start else self._head(conn)
+                conn.execute("INSERT INTO changefeed_consumers (name, cursor) VALUES (?, ?);", (name, cursor))
+                return cursor
+        except Exception:
+            logger.exception("changefeed の読み手の登録エラー")
+            return 0
+
+    def unregister(self, name: str) -> bool:
+        """読み手を外す（その読み手が読んでいない行も compaction の対象になる）"""
+        try:
+            with self.get_conn() as conn:
+                removed = conn.execute("DELETE FROM changefeed_consumers WHERE name = ?;", (name,)).rowcount > 0
+                if removed and self.auto_compact:
+                    self._compact(conn)
+                return removed
+        except Exception:
+            logger.exception("changefeed の読み手の削除エラー")
+            return False
+
+    def consumers(self) -> List[ConsumerInfo]:
+        try:
+            rows = self.fetchall_tuples("""
+                SELECT c.name, c.cursor, (SELECT COUNT(*) FROM changefeed WHERE seq > c.cursor), c.updated_at
+                FROM changefeed_consumers AS c ORDER BY c.name;
+            """)
+            return [ConsumerInfo(*row) for row in rows]
+        except Exception:
+            logger.exception("changefeed の読み手一覧の取得エラー")
+            return []
+
+    # --- 読み出し ---
+
+    def changes_since(self, cursor: int, limit: Optional[int] = None,
+                      tables: Optional[Sequence[str]] = None) -> List[Change]:
+        """seq が cursor より後の変更を seq 順に最大 limit 件（主キーの範囲読み）"""
+        sql = "SELECT seq, table_name, row_key, op, changed_at FROM changefeed WHERE seq > ?"
+        params: List = [cursor]
+        if tables:
+            sql += f" AND table_name IN ({', '.join('?' * len(tables))})"
+            params.extend(tables)
+        sql += " ORDER BY seq LIMIT ?;"
+        params.append(limit or self.batch_size)
+        try:
+            return [Change(*row) for row in self.fetchall_tuples(sql, params)]
+        except Exception:
+            logger.exception("changefeed の読み出しエラー")
+            return []
+
+    def read_batch(self, name: str, limit: Optional[int] = None,
+                   tables: Optional[Sequence[str]] = None) -> List[Change]:
+        """読み手 name の位置より後の変更（位置は進めない。処理後に ack する）"""
+        cursor = self.cursor(name)
+        if cursor is None:
+            raise KeyError(f"changefeed の読み手 '{name}' は登録されていません")
+        return self.changes_since(cursor, limit, tables)
+
+    def ack(self, name: str, seq: int) -> bool:
+        """読み手 name の位置を seq まで進める（戻しはしない）。全員が読んだ行はここで消す"""
+        try:
+            with self.get_conn() as conn:
+                cur = conn.execute(f"""
+                    UPDATE changefeed_consumers SET cursor = ?, updated_at = {SQL_NOW}
+                    WHERE name = ? AND cursor < ?;
+                """, (seq, name, seq))
+                if cur.rowcount and self.auto_compact:
+                    self._compact(conn)
+                return cur.rowcount > 0
+        except Exception:
+            logger.exception("changefeed の位置の保存エラー")
+            return False
+
+    def consume(self, name: str, limit: Optional[int] = None,
+                tables: Optional[Sequence[str]] = None) -> Iterator[List[Change]]:
+        """未読の変更をバッチごとに返すジェネレータ。
+
+        次のバッチを要求した時点で前のバッチを ack する（処理中に例外で抜けたバッチは ack しない）。
+        tables で絞った場合も、読み飛ばした他のテーブルの分を含めて位置を進める。
+        """
+        limit = limit or self.batch_size
+        while True:
+            cursor = self.cursor(name)
+            if cursor is None:
+                raise KeyError(f"changefeed の読み手 '{name}' は登録されていません")
+            # 位置はテーブルで絞らずに進めたいので、全テーブル分を読んでから絞る
+            changes = self.changes_since(cursor, limit)
+            if not changes:
+                return
+            selected = [c for c in changes if not tables or c.table in tables]
+            if selected:
+                yield selected
+            self.ack(name, changes[-1].seq)
+            if len(changes) < limit:
+                return
+
+    def cursor(self, name: str) -> Optional[int]:
+        try:
+            return self.fetch_value("SELECT cursor FROM changefeed_consumers WHERE name = ?;", (name,))
+        except Exception:
+            logger.exception("changefeed の位置の取得エラー")
+            return None
+
+    def head(self) -> int:
+        """最後に記録された変更の seq（まだ何も無ければ 0）"""
+        try:
+            with self.get_conn() as conn:
+                return self._head(conn)
+        except Exception:
+            logger.exception("changefeed の先頭の取得エラー")
+            return 0
+
+    # --- compaction ---
+
+    def compact(self) -> int:
+        """全読み手が読み終えた行を消し、消した件数を返す"""
+        try:
+            with self.get_conn() as conn:
+                return self._compact(conn)
+        except Exception:
+            logger.exception("changefeed の compaction エラー")
+            return 0
+
+    def _compact(self, conn) -> int:
+        # 読み手が居なければ全行が対象。seq は主キーなので先頭からの範囲削除になる
+        removed = conn.execute("""
+            DELETE FROM changefeed
+            WHERE seq <= COALESCE((SELECT MIN(cursor) FROM changefeed_consumers), (SELECT MAX(seq) FROM changefeed));
+        """).rowcount
+        self.compacted += removed
+        return removed
+
+    @staticmethod
+    def _head(conn) -> int:
+        # AUTOINCREMENT の最大値は sqlite_sequence にある（行を消した後も残る）
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changefeed';").fetchone()
+        return row[0] if row else 0
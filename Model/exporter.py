@@ -0,0 +1,200 @@
+# Model/exporter.py
+"""terms を CSV / JSONL / ZIP アーカイブに書き出す。
+
+行は fetchmany で少しずつ読み、そのままファイルへ流すので、デッキの大きさに関わらずメモリ使用量は一定。
+拡張子で形式を決める（.csv / .jsonl / .zip。.csv.gz / .jsonl.gz は gzip 圧縮）。
+差分エクスポートは changefeed の seq（コミット順に振られる）で、前回以降に変更された行を選ぶ
+（削除された行は含まれない）。差分エクスポートの name ごとに changefeed の読み手を登録するので、
+使わなくなった name は forget_incremental で外す。
+"""
+import csv
+import gzip
+import io
+import json
+import time
+import zipfile
+import logging
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from Model.BaseModel import BaseModel, DEFAULT_CHUNK_SIZE
+from Model.changefeed import Changefeed
+
+logger = logging.getLogger(__name__)
+
+EXPORT_COLUMNS = ("question_id", "word_cloud_id", "word_name", "explain", "tag", "category", "yomi", "updated_at")
+
+# 差分エクスポートごとの changefeed の読み手名（'export:<name>'）
+FEED_CONSUMER_PREFIX = "export:"
+
+# (cursor, head]: changefeed のこの範囲に記録された terms の行
+FeedRange = Tuple[int, int]
+
+
+class ExportFilter(NamedTuple):
+    category: Optional[str] = None
+    yomi_row: Optional[str] = None   # 'あ'〜'わ' / '他'（kana.ROW_KEYS）
+    tag: Optional[str] = None
+
+
+class ExportResult(NamedTuple):
+    path: str
+    rows: int
+    watermark: Optional[float]
+    elapsed: float
+
+
+class TermExporter(BaseModel):
+    """terms のストリーミングエクスポート"""
+
+    def __init__(self, db_path: Optional[str] = None, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        super().__init__(db_path=db_path)
+        self.chunk_size = max(1, chunk_size)
+
+    # --- 読み出し ---
+
+    def _build_query(self, filters: ExportFilter, since: Optional[float],
+                     changed: Optional[FeedRange] = None) -> Tuple[str, List]:
+        where = []
+        params: List = []
+        if changed is not None:
+            where.append("question_id IN (SELECT row_key FROM changefeed "
+                         "WHERE table_name = 'terms' AND seq > ? AND seq <= ?)")
+            params.extend(changed)
+        if filters.category:
+            where.append("category = ?")
+            params.append(filters.category)
+        if filters.yomi_row:
+            where.append("yomi_row = ?")
+            params.append(filters.yomi_row)
+        if filters.tag:
+            # tag はカンマ区切り。前後にカンマを足して要素単位で一致させる
+            where.append("(',' || tag || ',') LIKE ?")
+            params.append(f"%,{filters.tag},%")
+        if since is not None:
+            where.append("updated_at > ?")
+            params.append(since)
+        sql = f"SELECT {', '.join(EXPORT_COLUMNS)} FROM terms"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY question_id;"
+        return sql, params
+
+    def iter_terms(self, filters: ExportFilter = ExportFilter(), since: Optional[float] = None,
+                   changed: Optional[FeedRange] = None) -> Iterator[Tuple]:
+        """条件に合う行を EXPORT_COLUMNS 順のタプルで 1 件ずつ返す"""
+        sql, params = self._build_query(filters, since, changed)
+        return self.iter_rows(sql, params, chunk_size=self.chunk_size)
+
+    # --- 書き出し ---
+
+    def export(self, path: str, filters: ExportFilter = ExportFilter(), since: Optional[float] = None,
+               changed: Optional[FeedRange] = None) -> ExportResult:
+        """path に書き出す。形式は拡張子で決める（changed を渡すと changefeed のその範囲で変更された行だけ）"""
+        started = time.perf_counter()
+        lower = path.lower()
+        if lower.endswith(".zip"):
+            rows, watermark = self._write_archive(path, filters, since, changed)
+        else:
+            compressed = lower.endswith(".gz")
+            base = lower[:-3] if compressed else lower
+            if base.endswith(".csv"):
+                writer = self._write_csv
+            elif base.endswith(".jsonl"):
+                writer = self._write_jsonl
+            else:
+                raise ValueError(f"対応していない出力形式です: {path}")
+            opener = gzip.open if compressed else open
+            with opener(path, "wt", encoding="utf-8", newline="") as f:
+                rows, watermark = writer(f, self.iter_terms(filters, since, changed))
+        result = ExportResult(path, rows, watermark, time.perf_counter() - started)
+        logger.info("エクスポート: %s に %d 件 (%.2f 秒)", path, rows, result.elapsed)
+        return result
+
+    def export_incremental(self, path: str, name: str = "default",
+                           filters: ExportFilter = ExportFilter()) -> ExportResult:
+        """前回の name のエクスポート以降に変更された行だけを書き出す。
+
+        changefeed の読み手 'export:<name>' の位置から、書き出し前に読んだ先頭（head）までに
+        記録された行を選び、書き出した後で位置を head に進める。seq はコミット順なので、
+        書き出しの後にコミットされた変更は updated_at が古くても次回に入る。
+        初回は全件を書き出す。読み手を登録している間、changefeed の行は次の差分エクスポートまで残るので、
+        使わなくなった name は forget_incremental で外すこと（外さないと changefeed が縮まない）。
+        書き出しに失敗したときは位置を進めないので、次回は同じ範囲から書き出す。
+        """
+        feed = Changefeed(db_path=self.db_path)
+        consumer = FEED_CONSUMER_PREFIX + name
+        cursor = feed.cursor(consumer)
+        if cursor is None:
+            # 先に登録して、書き出し中にコミットされた変更も記録に残す
+            feed.register(consumer)
+        head = feed.head()
+        try:
+            result = self.export(path, filters, changed=(cursor, head) if cursor is not None else None)
+        except Exception:
+            # 初回の全件書き出しに失敗したら登録も取り消す（次回も全件から書き出す）
+            if cursor is None:
+                feed.unregister(consumer)
+            raise
+        feed.ack(consumer, head)
+        return result
+
+    def snapshot(self, path: str) -> ExportResult:
+        """デッキ全体を ZIP アーカイブ（terms.jsonl + manifest.json）に保存する"""
+        if not path.lower().endswith(".zip"):
+            path += ".zip"
+        return self.export(path)
+
+    def _write_csv(self, f, rows: Iterator[Tuple]) -> Tuple[int, Optional[float]]:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_COLUMNS)
+        count, watermark = 0, None
+        updated_index = EXPORT_COLUMNS.index("updated_at")
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+            if row[updated_index] is not None and (watermark is None or row[updated_index] > watermark):
+                watermark = row[updated_index]
+        return count, watermark
+
+    def _write_jsonl(self, f, rows: Iterator[Tuple]) -> Tuple[int, Optional[float]]:
+        count, watermark = 0, None
+        updated_index = EXPORT_COLUMNS.index("updated_at")
+        for row in rows:
+            f.write(json.dumps(dict(zip(EXPORT_COLUMNS, row)), ensure_ascii=False))
+            f.write("\n")
+            count += 1
+            if row[updated_index] is not None and (watermark is None or row[updated_index] > watermark):
+                watermark = row[updated_index]
+        return count, watermark
+
+    def _write_archive(self, path: str, filters: ExportFilter, since: Optional[float],
+                       changed: Optional[FeedRange] = None) -> Tuple[int, Optional[float]]:
+        with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open("terms.jsonl", "w") as raw:
+                with io.TextIOWrapper(raw, encoding="utf-8", newline="") as f:
+                    count, watermark = self._write_jsonl(f, self.iter_terms(filters, since, changed))
+            manifest = {
+                "format": "terms.jsonl",
+                "rows": count,
+                "columns": list(EXPORT_COLUMNS),
+                "filters": filters._asdict(),
+                "since": since,
+                "changed": list(changed) if changed is not None else None,
+                "watermark": watermark,
+                "exported_at": time.time(),
+            }
+            archive.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+        return count, watermark
+
+    # --- 差分エクスポートの位置 ---
+
+    def get_cursor(self, name: str = "default") -> Optional[int]:
+        """name の差分エクスポートが書き出し済みの changefeed の seq（未実施なら None）"""
+        return Changefeed(db_path=self.db_path).cursor(FEED_CONSUMER_PREFIX + name)
+
+    def forget_incremental(self, name: str = "default") -> bool:
+        """name の差分エクスポートをやめる（changefeed の読み手を外す。次回の export_incremental は全件）
+
+        外した読み手が読んでいなかった changefeed の行も compaction で消える。外したら True
+        """
+        return Changefeed(db_path=self.db_path).unregister(FEED_CONSUMER_PREFIX + name)
@@ -0,0 +1,236 @@
+# Model/fuzzy_search.py
+"""word_name / yomi を対象にした、打ち間違いを許す用語検索（q-gram 索引 + 編集距離）。
+
+- 文字列は NFKC 正規化・casefold・カタカナ→ひらがなでそろえてから比べる
+  （"ｄｏｃｋｅｒ" と "Docker"、"クバネティス" と "くばねてぃす" は同じ文字列になる）
+- 前後に印を付けた 2-gram の転置索引を文字数ごとに持つ。編集距離 k 以内の語は
+  文字数の差が k 以内で、少なくとも (gram 数 - k*GRAMS_PER_EDIT) 個の gram を共有するので、
+  その文字数の転置リストだけを数え上げて候補を絞り、残った語とだけ距離を計算する
+  （共有 gram の多い順に調べ、top_k 件そろった後は上限の距離を縮めて打ち切る）
+- 索引は最初の検索で作り、以後は TermChangeEvent で 1 語ずつ出し入れする
+"""
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from Model.change_events import TermChangeEvent, RELOAD
+from Model.kana import KATAKANA_TO_HIRAGANA
+
+Q = 2
+# 1 回の編集で変わりうる gram の数（置換・挿入・削除は Q 個、隣り合う文字の入れ替えは Q + 1 個）
+GRAMS_PER_EDIT = Q + 1
+_PAD_START = "\x02"
+_PAD_END = "\x03"
+
+DEFAULT_TOP_K = 20
+
+# 削除済みの項目がこの割合を超えたら、転置リストを作り直す
+COMPACT_RATIO = 0.5
+
+
+def normalize(text: Optional[str]) -> str:
+    """比較用の正規化（NFKC → casefold → カタカナをひらがなに、空白は 1 つにまとめる）"""
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).casefold().translate(KATAKANA_TO_HIRAGANA)
+    return " ".join(text.split())
+
+
+def qgrams(text: str) -> Set[str]:
+    padded = _PAD_START + text + _PAD_END
+    return {padded[i:i + Q] for i in range(len(padded) - Q + 1)}
+
+
+def default_max_distance(length: int) -> int:
+    """クエリの長さに応じて許す編集距離（短い語では打ち間違いと別の語を区別できない）"""
+    if length < 3:
+        return 0
+    if length < 8:
+        return 1
+    return 2
+
+
+def bounded_levenshtein(a: str, b: str, limit: int) -> Optional[int]:
+    """a と b の編集距離（隣り合う 2 文字の入れ替えも 1 回と数える）。limit を超えれば None
+
+    |i - j| が limit を超えるマスは必ず limit を超えるので、対角線の周りの帯だけを計算する。
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    if len(a) < len(b):
+        a, b = b, a
+    over = limit + 1
+    width = len(b)
+    before: List[int] = []
+    previous = [j if j <= limit else over for j in range(width + 1)]
+    for i in range(1, len(a) + 1):
+        ca = a[i - 1]
+        current = [over] * (width + 1)
+        current[0] = row_min = i if i <= limit else over
+        for j in range(max(1, i - limit), min(width, i + limit) + 1):
+            cb = b[j - 1]
+            cost = previous[j - 1] + (ca != cb)
+            if previous[j] + 1 < cost:
+                cost = previous[j] + 1
+            if current[j - 1] + 1 < cost:
+                cost = current[j - 1] + 1
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb and before[j - 2] + 1 < cost:
+                cost = before[j - 2] + 1
+            if cost > over:
+                cost = over
+            current[j] = cost
+            if cost < row_min:
+                row_min = cost
+        if row_min > limit:
+            return None
+        before, previous = previous, current
+    return previous[width] if previous[width] <= limit else None
+
+
+class FuzzyMatch(NamedTuple):
+    word_name: str
+    question_id: int
+    distance: int
+    matched: str        # 一致した正規化済みの文字列（word_name か yomi）
+
+
+class FuzzyIndex:
+    """用語名と読みの q-gram 転置索引（メモリ上のみ。DB には何も書かない）"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        # 項目番号 → (正規化した文字列, question_id, word_name)。削除した項目は None
+        self._entries: List[Optional[Tuple[str, int, str]]] = []
+        # 文字数 → gram → 項目番号の列
+        self._postings: Dict[int, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        self._by_term: Dict[int, List[int]] = {}
+        # 作り直し用の元の値（question_id → (word_name, yomi)）
+        self._terms: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._removed = 0
+        self.built = False
+        self.searches = 0
+
+    # --- 作成・更新 ---
+
+    def build(self, rows: Iterable[Tuple[int, str, Optional[str]]]):
+        """(question_id, word_name, yomi) の列から作り直す"""
+        with self._lock:
+            self._entries = []
+            self._postings = defaultdict(lambda: defaultdict(list))
+            self._by_term = {}
+            self._terms = {}
+            self._removed = 0
+            for question_id, word_name, yomi in rows:
+                self._add(question_id, word_name, yomi)
+            self.built = True
+
+    def add(self, question_id: int, word_name: Optional[str], yomi: Optional[str]):
+        with self._lock:
+            self._remove(question_id)
+            self._add(question_id, word_name, yomi)
+            self._maybe_compact()
+
+    def remove(self, question_id: int):
+        with self._lock:
+            self._remove(question_id)
+            self._maybe_compact()
+
+    def invalidate(self):
+        """次の検索の前に作り直させる（RELOAD 時）"""
+        with self._lock:
+            self.built = False
+
+    def apply_event(self, event: TermChangeEvent):
+        """ChangeBus の購読者。作成前なら何もしない（作成時に DB から読む）"""
+        with self._lock:
+            if not self.built:
+                return
+            if event.kind == RELOAD:
+                self.invalidate()
+            elif event.row is not None:
+                self.add(event.row.question_id, event.row.word_name, event.row.yomi)
+            elif event.question_id is not None:
+                self.remove(event.question_id)
+
+    def _add(self, question_id: int, word_name: Optional[str], yomi: Optional[str]):
+        if not word_name:
+            return
+        ids = []
+        # 名前と読みが同じ文字列になる語は 1 項目だけにする
+        for key in dict.fromkeys(k for k in (normalize(word_name), normalize(yomi)) if k):
+            entry_id = len(self._entries)
+            self._entries.append((key, question_id, word_name))
+            bucket = self._postings[len(key)]
+            for gram in qgrams(key):
+                bucket[gram].append(entry_id)
+            ids.append(entry_id)
+        self._by_term[question_id] = ids
+        self._terms[question_id] = (word_name, yomi)
+
+    def _remove(self, question_id: int):
+        # 転置リストからは消さず、項目を None にしておく（検索時に読み飛ばす）
+        self._terms.pop(question_id, None)
+        for entry_id in self._by_term.pop(question_id, ()):
+            self._entries[entry_id] = None
+            self._removed += 1
+
+    def _maybe_compact(self):
+        if self._removed > len(self._entries) * COMPACT_RATIO:
+            self.build([(qid, name, yomi) for qid, (name, yomi) in self._terms.items()])
+
+    # --- 検索 ---
+
+    def search(self, query: str, top_k: int = DEFAULT_TOP_K,
+               max_distance: Optional[int] = None) -> List[FuzzyMatch]:
+        """query との編集距離が max_distance 以下の用語を、距離の近い順に最大 top_k 件返す"""
+        key = normalize(query)
+        if not key:
+            return []
+        limit = default_max_distance(len(key)) if max_distance is None else max_distance
+        grams = qgrams(key)
+        best: Dict[str, FuzzyMatch] = {}
+        with self._lock:
+            self.searches += 1
+            # 共有 gram の多い順に調べ、top_k 件そろったら上限を k 番目の距離まで下げる
+            for entry_id, shared in self._candidates(grams, len(key), limit):
+                if shared < len(grams) - limit * GRAMS_PER_EDIT:
+                    break
+                entry = self._entries[entry_id]
+                if entry is None:
+                    continue
+                text, question_id, word_name = entry
+                distance = bounded_levenshtein(key, text, limit)
+                if distance is None:
+                    continue
+                current = best.get(word_name)
+                if current is None or distance < current.distance:
+                    best[word_name] = FuzzyMatch(word_name, question_id, distance, text)
+                    if len(best) >= top_k:
+                        limit = min(limit, sorted(m.distance for m in best.values())[top_k - 1])
+        ranked = sorted(best.values(),
+                        key=lambda m: (m.distance, abs(len(m.matched) - len(key)), m.word_name))
+        return ranked[:top_k]
+
+    def _candidates(self, grams: Set[str], length: int, limit: int) -> List[Tuple[int, int]]:
+        """文字数の差が limit 以内で、距離 limit 以内になりうる項目を (項目番号, 共有 gram 数) の多い順で"""
+        counts: Counter = Counter()
+        for n in range(max(1, length - limit), length + limit + 1):
+            bucket = self._postings.get(n)
+            if bucket:
+                for gram in grams:
+                    counts.update(bucket.get(gram, ()))
+        required = len(grams) - limit * GRAMS_PER_EDIT
+        candidates = [item for item in counts.items() if item[1] >= required]
+        candidates.sort(key=itemgetter(1), reverse=True)
+        return candidates
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'entries': len(self._entries) - self._removed,
+                'removed': self._removed,
+                'postings': sum(len(bucket) for bucket in self._postings.values()),
+                'searches': self.searches,
+            }
@@ -0,0 +1,90 @@
+# Model/kana.py
+"""読み仮名（yomi）の正規化と五十音の行の判定。"""
+import unicodedata
+from typing import Dict, Optional
+
+# カタカナ（ァ〜ヶ）とひらがな（ぁ〜ゖ）のコードポイント差
+_KATAKANA_OFFSET = ord('ァ') - ord('ぁ')
+
+
+# str.translate 用の変換表（カタカナ → ひらがな）
+KATAKANA_TO_HIRAGANA = {code: code - _KATAKANA_OFFSET for code in range(ord('ァ'), ord('ヶ') + 1)}
+
+
+def katakana_to_hiragana(text: str) -> str:
+    return text.translate(KATAKANA_TO_HIRAGANA)
+
+
+def normalize_yomi(yomi: Optional[str]) -> Optional[str]:
+    """NFKC 正規化（半角カナ → 全角）し、カタカナをひらがなにそろえる。空なら None"""
+    if yomi is None:
+        return None
+    text = katakana_to_hiragana(unicodedata.normalize('NFKC', yomi).strip())
+    return text or None
+
+
+# 五十音の行 → その行に属するひらがな（濁音・半濁音・小書き文字を含む）
+ROW_MEMBERS = {
+    'あ': 'あいうえおぁぃぅぇぉゔ',
+    'か': 'かきくけこがぎぐげごゕゖ',
+    'さ': 'さしすせそざじずぜぞ',
+    'た': 'たちつてとだぢづでどっ',
+    'な': 'なにぬねの',
+    'は': 'はひふへほばびぶべぼぱぴぷぺぽ',
+    'ま': 'まみむめも',
+    'や': 'やゆよゃゅょ',
+    'ら': 'らりるれろ',
+    'わ': 'わゐゑをんゎ',
+}
+
+_ROW_OF = {ch: row for row, members in ROW_MEMBERS.items() for ch in members}
+
+
+def yomi_row(yomi: Optional[str]) -> Optional[str]:
+    """読みの先頭文字が属する行（'あ'〜'わ'）を返す。かなで始まらなければ None"""
+    text = normalize_yomi(yomi)
+    if not text:
+        return None
+    return _ROW_OF.get(text[0])
+
+
+# 行に属さない読み（英数字・記号・空など）をまとめる区分
+OTHER_ROW = '他'
+
+# terms.yomi_row に入る値（表示順）
+ROW_KEYS = tuple(ROW_MEMBERS) + (OTHER_ROW,)
+
+
+def _build_row_key_table() -> Dict[str, str]:
+    """先頭 1 文字 → 行。ひらがなに加えてカタカナ・半角カナも正規化せずに引けるようにする"""
+    table = dict(_ROW_OF)
+    for ch, row in _ROW_OF.items():
+        table[chr(ord(ch) + _KATAKANA_OFFSET)] = row
+    for code in range(0xFF66, 0xFF9E):   # 半角カナ（ｦ〜ﾝ）
+        ch = chr(code)
+        row = _ROW_OF.get(katakana_to_hiragana(unicodedata.normalize('NFKC', ch)))
+        if row:
+            table[ch] = row
+    return table
+
+
+_ROW_KEY_OF = _build_row_key_table()
+
+
+def yomi_row_key(yomi: Optional[str]) -> str:
+    """terms.yomi_row の値。yomi_row_sql と同じ規則（先頭の半角空白を除いた 1 文字目）で決める"""
+    text = (yomi or '').lstrip(' ')
+    return _ROW_KEY_OF.get(text[:1], OTHER_ROW)
+
+
+def yomi_row_sql(column: str) -> str:
+    """column の yomi_row を求める SQL の CASE 式（トリガ・移行用）"""
+    first = f"substr(ltrim({column}, ' '), 1, 1)"
+    members: Dict[str, list] = {row: [] for row in ROW_MEMBERS}
+    for ch, row in _ROW_KEY_OF.items():
+        members[row].append(ch)
+    whens = " ".join(
+        f"WHEN {first} IN ({', '.join(repr(ch) for ch in sorted(chars))}) THEN '{row}'"
+        for row, chars in members.items()
+    )
+    return f"(CASE {whens} ELSE '{OTHER_ROW}' END)"
@@ -0,0 +1,326 @@
+# Model/memory_replica.py
+"""DB ファイルのメモリ上の読み取り用コピー（レプリカ）。
+
+環境変数 ITLS_MEMORY_REPLICA=1 のときだけ、ConnectionManager が最初の読み出しの前に
+backup API で DB 全体をメモリ上の DB（memdb VFS。同じプロセスの接続で共有できる）へ写す。
+（読み込みの途中では一時的に DB の約 3 倍のメモリを使う）
+
+- 読み出し（BaseModel.fetchall など）はレプリカから行う
+- 書き込みは今まで通りファイルに行う。このプロセスの接続のコミットは、TEMP トリガで記録した
+  変更行（WITHOUT ROWID のテーブルは表ごと）をコミット前に読み、コミットと同じ手順でレプリカへ写す
+  （文をレプリカで実行し直すと、トリガの julianday('now') などがファイルと違う値を書くため、行の値を写す）
+- レプリカに残すトリガは仮想テーブル（terms_fts）を書くものだけ。それ以外のトリガが書いた行は
+  ファイルから写す
+- 他の接続（他プロセス・同期サーバなど）のコミットやスキーマの変更は PRAGMA data_version と
+  schema_version で検出し、次の読み出しの前にファイル全体を写し直す
+- DB が ITLS_REPLICA_BUDGET_MB（既定 64MB）を超えたら、レプリカを捨ててファイルから読む
+"""
+import itertools
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+REPLICA_ENV = "ITLS_MEMORY_REPLICA"
+REPLICA_BUDGET_ENV = "ITLS_REPLICA_BUDGET_MB"
+DEFAULT_REPLICA_BUDGET_MB = 64
+
+# 書き込み接続の TEMP スキーマに作る、変更行の記録先とトリガ名の接頭辞
+DIRTY_TABLE = "replica_dirty"
+DIRTY_TRIGGER_PREFIX = "replica_dirty_"
+# WITHOUT ROWID のテーブルは行を特定できないので、この key で表ごと写す
+WHOLE_TABLE = "*"
+
+_names = itertools.count(1)
+_WRITE_TARGET = re.compile(
+    r"\b(?:INSERT(?:\s+OR\s+\w+)?\s+INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+[\"'`\[]?(\w+)",
+    re.IGNORECASE)
+
+def replica_enabled() -> bool:
+    return os.environ.get(REPLICA_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def replica_budget_bytes() -> int:
+    try:
+        megabytes = float(os.environ.get(REPLICA_BUDGET_ENV, DEFAULT_REPLICA_BUDGET_MB))
+    except ValueError:
+        megabytes = DEFAULT_REPLICA_BUDGET_MB
+    return int(megabytes * 1024 * 1024)
+
+
+def database_size(conn: sqlite3.Connection) -> int:
+    page_count = conn.execute("PRAGMA page_count;").fetchone()[0]
+    page_size = conn.execute("PRAGMA page_size;").fetchone()[0]
+    return page_count * page_size
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _rowid_tables(conn: sqlite3.Connection) -> Dict[str, bool]:
+    """main の通常のテーブル名 -> rowid を持つか（仮想テーブル・シャドウテーブル・sqlite_ で始まる表は除く）"""
+    return {
+        row[1]: not row[4]
+        for row in conn.execute("PRAGMA main.table_list;")
+        if row[2] == "table" and not row[1].startswith("sqlite_")
+    }
+
+
+def install_change_tracking(conn: sqlite3.Connection):
+    """書き込み接続に、変更行を temp.replica_dirty へ記録する TEMP トリガを作る（作り直す）"""
+    conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {DIRTY_TABLE} (tbl TEXT NOT NULL, key, PRIMARY KEY (tbl, key));")
+    old = [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_temp_master WHERE type = 'trigger' AND substr(name, 1, ?) = ?;",
+        (len(DIRTY_TRIGGER_PREFIX), DIRTY_TRIGGER_PREFIX))]
+    for name in old:
+        conn.execute(f"DROP TRIGGER temp.{_quote(name)};")
+    for table, has_rowid in _rowid_tables(conn).items():
+        literal = "'" + table.replace("'", "''") + "'"
+        # 外側の文の ON CONFLICT が引き継がれるので OR IGNORE ではなく NOT EXISTS で重複を避ける
+        record = (f"INSERT INTO {DIRTY_TABLE} SELECT {literal}, %(key)s WHERE NOT EXISTS "
+                  f"(SELECT 1 FROM {DIRTY_TABLE} WHERE tbl = {literal} AND key = %(key)s);")
+        for suffix, event, keys in (("ai", "INSERT", ("NEW",)), ("ad", "DELETE", ("OLD",)),
+                                    ("au", "UPDATE", ("OLD", "NEW"))):
+            body = " ".join(record % {"key": f"{key}.rowid" if has_rowid else f"'{WHOLE_TABLE}'"} for key in keys)
+            conn.execute(f"""
+                CREATE TEMP TRIGGER {_quote(DIRTY_TRIGGER_PREFIX + table + '_' + suffix)}
+                AFTER {event} ON main.{_quote(table)} BEGIN {body} END;
+            """)
+    conn.execute(f"DELETE FROM temp.{DIRTY_TABLE};")
+
+
+class MemoryReplica:
+    """1 つの DB ファイルに対するメモリ上のコピー"""
+
+    def __init__(self, db_path: str, budget_bytes: Optional[int] = None, query_stats=None):
+        self.db_path = db_path
+        self.budget_bytes = replica_budget_bytes() if budget_bytes is None else budget_bytes
+        self.query_stats = query_stats
+        self.uri = f"file:/itls-replica-{os.getpid()}-{next(_names)}?vfs=memdb"
+        # 版数の確認と写し直しはこのロックの中で行う
+        self.lock = threading.RLock()
+        self.active = False
+        self.disabled = False
+        self._keeper: Optional[sqlite3.Connection] = None   # 書き込み用（メモリ上の DB を保持する）
+        self._watch: Optional[sqlite3.Connection] = None    # ファイル側の data_version の監視用
+        self._seen_version: Optional[int] = None
+        self._local = threading.local()
+        self._generation = 0
+        self._readers: Dict[int, sqlite3.Connection] = {}
+        self.loads = 0
+        self.reads = 0
+        self.applied = 0        # 変更行だけを写したコミット数
+        self.applied_rows = 0
+
+    # --- 読み出し ---
+
+    def reader(self) -> Optional[sqlite3.Connection]:
+        """呼び出しスレッドの読み出し用接続。レプリカを使えなければ None"""
+        with self.lock:
+            if self.disabled:
+                return None
+            if not self.active or self._is_stale():
+                if not self._load():
+                    return None
+            self.reads += 1
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "generation", None) != self._generation:
+            conn = self._open(readonly=True)
+            self._local.conn = conn
+            self._local.generation = self._generation
+            with self.lock:
+                self._readers[threading.get_ident()] = conn
+        return conn
+
+    # --- 書き込み ---
+
+    def commit(self, conn: sqlite3.Connection, tracked_schema: Optional[int] = None):
+        """書き込み接続 conn をコミットし、記録した変更行をレプリカへ写す。
+
+        tracked_schema は install_change_tracking したときの schema_version（していなければ None）。
+        写せないとき（レプリカが古い・スキーマが変わった・他の接続のコミットが挟まった）は何もせず、
+        次の読み出しで全体を写し直す。
+        """
+        if tracked_schema is None:
+            conn.commit()
+            return
+        with self.lock:
+            dirty = conn.execute(f"SELECT tbl, key FROM temp.{DIRTY_TABLE};").fetchall()
+            if not dirty:
+                conn.commit()
+                return
+            changes = None
+            # 書き込み中はロックを持っているので、ここで古くなければコミットまで他のコミットは入らない
+            if (self.active and not self._is_stale()
+                    and conn.execute("PRAGMA schema_version;").fetchone()[0] == tracked_schema):
+                before = conn.execute("PRAGMA data_version;").fetchone()[0]
+                changes = self._read_changes(conn, dirty)
+            conn.execute(f"DELETE FROM temp.{DIRTY_TABLE};")
+            conn.commit()
+            if changes is None:
+                return
+            version = self._data_version()
+            if conn.execute("PRAGMA data_version;").fetchone()[0] != before:
+                return
+            try:
+                self._apply_changes(changes)
+            except Exception:
+                logger.exception("レプリカへの変更の反映エラー")
+                self._seen_version = None
+                return
+            self._seen_version = version
+            self.applied += 1
+            self.applied_rows += sum(len(rows) for _, _, _, rows in changes)
+
+    # --- 内部処理 ---
+
+    @staticmethod
+    def _read_changes(conn: sqlite3.Connection, dirty) -> List[Tuple[str, Optional[List[int]], List[str], List[Tuple]]]:
+        """変更行を (テーブル名, 消す rowid（None なら表ごと）, 列名, 入れる行) のリストで読む"""
+        keys: Dict[str, Optional[List[int]]] = {}
+        for table, key in dirty:
+            if key == WHOLE_TABLE:
+                keys[table] = None
+            elif keys.get(table, ()) is not None:
+                keys.setdefault(table, []).append(key)
+        # AUTOINCREMENT の採番位置は小さいので毎回表ごと写す
+        keys["sqlite_sequence"] = None
+        cur = conn.cursor()
+        cur.row_factory = None
+        changes = []
+        for table, rowids in keys.items():
+            columns = [row[1] for row in cur.execute(f"PRAGMA main.table_info({_quote(table)});")]
+            if not columns:
+                continue
+            names = ", ".join(_quote(c) for c in columns)
+            if rowids is None:
+                rows = cur.execute(f"SELECT {names} FROM main.{_quote(table)};").fetchall()
+            else:
+                rows = []
+                for start in range(0, len(rowids), 500):
+                    chunk = rowids[start:start + 500]
+                    rows += cur.execute(
+                        f"SELECT rowid, {names} FROM main.{_quote(table)} "
+                        f"WHERE rowid IN ({', '.join('?' * len(chunk))});", chunk).fetchall()
+                columns = ["rowid"] + columns
+            changes.append((table, rowids, columns, rows))
+        return changes
+
+    def _apply_changes(self, changes):
+        with self._keeper:
+            for table, rowids, columns, rows in changes:
+                if rowids is None:
+                    self._keeper.execute(f"DELETE FROM main.{_quote(table)};")
+                else:
+                    self._keeper.executemany(f"DELETE FROM main.{_quote(table)} WHERE rowid = ?;",
+                                             [(rowid,) for rowid in rowids])
+                if rows:
+                    self._keeper.executemany(
+                        f"INSERT OR REPLACE INTO main.{_quote(table)} ({', '.join(_quote(c) for c in columns)}) "
+                        f"VALUES ({', '.join('?' * len(columns))});", rows)
+
+    def _strip_keeper_triggers(self):
+        """仮想テーブルだけを書くトリガ以外を消す（トリガが書いた行はファイルから写すため）"""
+        virtual = {row[1] for row in self._keeper.execute("PRAGMA main.table_list;") if row[2] == "virtual"}
+        triggers = self._keeper.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger';").fetchall()
+        for name, sql in triggers:
+            body = re.split(r"\bBEGIN\b", sql, maxsplit=1, flags=re.IGNORECASE)[-1]
+            targets = set(_WRITE_TARGET.findall(body))
+            if not targets or not targets <= virtual:
+                self._keeper.execute(f"DROP TRIGGER main.{_quote(name)};")
+        self._keeper.commit()
+
+    def _open(self, readonly: bool) -> sqlite3.Connection:
+        from Model.query_stats import InstrumentedConnection
+        conn = sqlite3.connect(self.uri, uri=True, check_same_thread=False,
+                               factory=InstrumentedConnection if self.query_stats is not None else sqlite3.Connection)
+        if self.query_stats is not None:
+            conn.query_stats = self.query_stats
+        conn.row_factory = sqlite3.Row
+        if readonly:
+            conn.execute("PRAGMA query_only = 1;")
+        else:
+            # INSERT OR REPLACE で消える行にも terms_fts の削除トリガを効かせる
+            conn.execute("PRAGMA recursive_triggers = 1;")
+        return conn
+
+    def _data_version(self) -> int:
+        return self._watch.execute("PRAGMA data_version;").fetchone()[0]
+
+    def _is_stale(self) -> bool:
+        return self._data_version() != self._seen_version
+
+    def _load(self) -> bool:
+        """ファイルの内容をレプリカへ写す。上限を超えていれば以後は使わない"""
+        started = time.perf_counter()
+        try:
+            if self._watch is None:
+                self._watch = sqlite3.connect(self.db_path, check_same_thread=False)
+            size = database_size(self._watch)
+            if size > self.budget_bytes:
+                self._disable(f"DB が {size // 1024}KiB で上限を超えているため")
+                return False
+            if self._keeper is None:
+                self._keeper = self._open(readonly=False)
+            version = self._data_version()
+            self._copy_into_keeper()
+            self._strip_keeper_triggers()
+        except Exception:
+            logger.exception("レプリカの作成に失敗しました")
+            self._disable("作成に失敗したため")
+            return False
+        self._seen_version = version
+        self.active = True
+        self.loads += 1
+        logger.info("DB をメモリに読み込みました (%dKiB, %.1fms)", size // 1024,
+                    (time.perf_counter() - started) * 1000.0)
+        return True
+
+    def _copy_into_keeper(self):
+        # WAL モードのファイルはヘッダ（18・19 バイト目）が WAL のままだと memdb では開けないので、
+        # 一度バイト列にしてヘッダを通常のジャーナルに直し、私的なメモリ DB を経由して写す
+        image = bytearray(self._watch.serialize())
+        image[18] = image[19] = 1
+        staging = sqlite3.connect(":memory:")
+        try:
+            staging.deserialize(bytes(image))
+            staging.backup(self._keeper)
+        finally:
+            staging.close()
+
+    def _disable(self, reason: str):
+        logger.warning("%s、メモリ上のレプリカを使わずファイルから読みます", reason)
+        self.disabled = True
+        self.active = False
+        self.close()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {
+                'active': int(self.active),
+                'loads': self.loads,
+                'reads': self.reads,
+                'applied': self.applied,
+                'applied_rows': self.applied_rows,
+                'bytes': database_size(self._keeper) if self.active else 0,
+            }
+
+    def close(self):
+        """全接続を閉じる（メモリ上の DB も消える。次の読み出しで読み込み直す）"""
+        with self.lock:
+            conns = list(self._readers.values()) + [c for c in (self._keeper, self._watch) if c is not None]
+            self._readers.clear()
+            self._keeper = self._watch = None
+            self._generation += 1
+            self.active = False
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                logger.exception("レプリカの接続のクローズに失敗しました")
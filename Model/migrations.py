@@ -0,0 +1,483 @@
+# Model/migrations.py
+"""スキーマのバージョン管理。
+
+適用済みのバージョンは settings テーブルの 'schema_version' に記録する。
+新しいマイグレーションは MIGRATIONS の末尾に version を 1 つ増やして追加する。
+
+    python -m Model.migrations --db word_master.db                      # バージョンと word_name の重複を表示
+    python -m Model.migrations --db word_master.db --rename-duplicates  # 重複した word_name を改名する
+"""
+import argparse
+import os
+import sqlite3
+import logging
+from typing import Callable, Dict, List, NamedTuple, Sequence, Union
+
+from Model.kana import yomi_row_sql
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+
+# settings にこのキーがある間は terms_fts_ai トリガを止める。
+# 一括登録で FTS 索引を 1 文でまとめて更新するために使う（トランザクション内でだけ立てること）
+FTS_DEFERRED_KEY = "fts_deferred"
+
+# settings にこのキーがある間は term_stats を更新するトリガを止める（一括登録後に rebuild_term_stats する）
+STATS_DEFERRED_KEY = "stats_deferred"
+
+# settings にこのキーがある間は changefeed への行単位の記録を止める（一括登録後に 1 文でまとめて記録する）
+CHANGEFEED_DEFERRED_KEY = "changefeed_deferred"
+
+# changefeed に記録する列（内部用の updated_at / yomi_row だけの更新は記録しない）
+CHANGEFEED_COLUMNS = {
+    "terms": ("question_id", ("question_id", "word_cloud_id", "word_name", "explain", "tag", "category", "yomi")),
+    "words": ("word_id", ("word_id", "creator_id", "cloud_id", "word_name", "is_shared", "sync_choice",
+                          "last_edited", "status", "content_hash")),
+}
+
+# term_stats.scope の値
+STATS_TOTAL = "total"          # key は ''。word_name の異なり数
+STATS_CATEGORY = "category"    # category ごとの word_name の異なり数
+STATS_YOMI_ROW = "yomi_row"    # yomi_row ごとの行数
+STATS_TAG = "tag"              # タグ（カンマ区切りの各要素）ごとの行数
+
+# terms(word_name) を UNIQUE にするマイグレーションのバージョン
+UNIQUE_WORD_NAME_VERSION = 10
+
+# 1 ステップは SQL 文字列か、接続を受け取る関数
+Step = Union[str, Callable[[sqlite3.Connection], None]]
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    steps: Sequence[Step]
+
+
+def find_duplicate_word_names(conn: sqlite3.Connection) -> Dict[str, List[int]]:
+    """terms.word_name が重複している名前 -> その question_id（昇順）"""
+    duplicates: Dict[str, List[int]] = {}
+    for name, question_id in conn.execute("""
+        SELECT word_name, question_id FROM terms
+        WHERE word_name IN (SELECT word_name FROM terms GROUP BY word_name HAVING COUNT(*) > 1)
+        ORDER BY word_name, question_id;
+    """):
+        duplicates.setdefault(name, []).append(question_id)
+    return duplicates
+
+
+def _word_name_index_is_unique(conn: sqlite3.Connection) -> bool:
+    return any(row[1] == "idx_terms_word_name" and row[2] for row in conn.execute("PRAGMA index_list(terms);"))
+
+
+def _unique_word_name_index(conn: sqlite3.Connection) -> bool:
+    """terms(word_name) の索引を UNIQUE で作り直す。
+
+    words.word_name は terms(word_name) を外部キーとして参照しているため、
+    親キーが UNIQUE でないと terms の削除・名前の変更、words への書き込みが "foreign key mismatch" で失敗する。
+    重複があるときは UNIQUE でない索引のまま警告を出す（起動のたびに作り直しを試みる）。
+    """
+    duplicates = find_duplicate_word_names(conn)
+    if duplicates:
+        names = list(duplicates)
+        logger.warning(
+            "terms.word_name に重複があるため UNIQUE 索引を作成できません。解消するまで用語の削除・名前の変更・"
+            "同期は失敗します。重複している名前: %s%s（python -m Model.migrations --rename-duplicates で改名できます）",
+            ", ".join(names[:20]), " ほか" if len(names) > 20 else "")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_terms_word_name ON terms(word_name);")
+        return False
+    conn.execute("DROP INDEX IF EXISTS idx_terms_word_name;")
+    conn.execute("CREATE UNIQUE INDEX idx_terms_word_name ON terms(word_name);")
+    return True
+
+
+def rename_duplicate_word_names(conn: sqlite3.Connection) -> Dict[str, str]:
+    """重複した word_name のうち question_id が最小の行だけを残し、残りを「名前 (question_id)」に改名する。
+
+    words は元の名前のまま残した行を指す。改名したら terms(word_name) を UNIQUE にし、
+    {改名後の名前: 元の名前} を返す。
+    """
+    renamed: Dict[str, str] = {}
+    conn.commit()
+    # 親キーが UNIQUE でない間は、外部キーを有効にしたままでは terms の名前を変えられない
+    foreign_keys = conn.execute("PRAGMA foreign_keys;").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    try:
+        with conn:
+            for name, question_ids in find_duplicate_word_names(conn).items():
+                for question_id in question_ids[1:]:
+                    new_name = f"{name} ({question_id})"
+                    conn.execute("UPDATE terms SET word_name = ? WHERE question_id = ?;", (new_name, question_id))
+                    renamed[new_name] = name
+            _unique_word_name_index(conn)
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {int(foreign_keys)};")
+    return renamed
+
+
+def _create_terms_fts(conn: sqlite3.Connection):
+    """terms を外部コンテンツとする FTS5 (trigram) 索引とトリガを作る。
+
+    FTS5 / trigram の無い SQLite では作らずに済ませる（検索は従来方式になる）。
+    """
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._fts5_probe USING fts5(x, tokenize='trigram');")
+        conn.execute("DROP TABLE temp._fts5_probe;")
+    except sqlite3.OperationalError:
+        logger.warning("FTS5 (trigram) が利用できないため terms_fts を作成しません")
+        return
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS terms_fts USING fts5(
+            word_name, yomi, explain, tag,
+            content='terms', content_rowid='question_id', tokenize='trigram'
+        );
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS terms_fts_ai AFTER INSERT ON terms BEGIN
+            INSERT INTO terms_fts(rowid, word_name, yomi, explain, tag)
+            VALUES (new.question_id, new.word_name, new.yomi, new.explain, new.tag);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS terms_fts_ad AFTER DELETE ON terms BEGIN
+            INSERT INTO terms_fts(terms_fts, rowid, word_name, yomi, explain, tag)
+            VALUES ('delete', old.question_id, old.word_name, old.yomi, old.explain, old.tag);
+        END;
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS terms_fts_au
+        AFTER UPDATE OF question_id, word_name, yomi, explain, tag ON terms BEGIN
+            INSERT INTO terms_fts(terms_fts, rowid, word_name, yomi, explain, tag)
+            VALUES ('delete', old.question_id, old.word_name, old.yomi, old.explain, old.tag);
+            INSERT INTO terms_fts(rowid, word_name, yomi, explain, tag)
+            VALUES (new.question_id, new.word_name, new.yomi, new.explain, new.tag);
+        END;
+    """)
+    conn.execute("INSERT INTO terms_fts(terms_fts) VALUES ('rebuild');")
+
+
+def _defer_terms_fts_insert(conn: sqlite3.Connection):
+    """terms_fts_ai を FTS_DEFERRED_KEY で止められるように作り直す。"""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'terms_fts';").fetchone():
+        return
+    conn.execute("DROP TRIGGER IF EXISTS terms_fts_ai;")
+    conn.execute(f"""
+        CREATE TRIGGER terms_fts_ai AFTER INSERT ON terms
+        WHEN NOT EXISTS (SELECT 1 FROM settings WHERE key = '{FTS_DEFERRED_KEY}') BEGIN
+            INSERT INTO terms_fts(rowid, word_name, yomi, explain, tag)
+            VALUES (new.question_id, new.word_name, new.yomi, new.explain, new.tag);
+        END;
+    """)
+
+
+def _tag_values(column: str) -> str:
+    """カンマ区切りの tag を json_each で 1 要素ずつ読む式（JSON にできなければ空）"""
+    escaped = f"replace(replace({column}, '\\', '\\\\'), '\"', '\\\"')"
+    array = f"('[\"' || replace({escaped}, ',', '\",\"') || '\"]')"
+    return f"json_each(CASE WHEN json_valid({array}) THEN {array} ELSE '[]' END)"
+
+
+def _stats_upsert(scope: str, key: str, delta: int, where: str = "1") -> str:
+    return f"""
+        INSERT INTO term_stats (scope, key, count) SELECT '{scope}', {key}, {delta} WHERE {where}
+        ON CONFLICT(scope, key) DO UPDATE SET count = count + ({delta});"""
+
+
+def _stats_changes(row: str, delta: int) -> str:
+    """row（NEW / OLD）の行を term_stats に足す（delta=1）/ 引く（delta=-1）文"""
+    others = f"FROM terms WHERE word_name = {row}.word_name AND question_id <> {row}.question_id"
+    tags = _tag_values(f"{row}.tag")
+    return "".join([
+        _stats_upsert(STATS_TOTAL, "''", delta, f"NOT EXISTS (SELECT 1 {others})"),
+        _stats_upsert(STATS_CATEGORY, f"{row}.category", delta,
+                      f"{row}.category IS NOT NULL AND NOT EXISTS (SELECT 1 {others} AND category = {row}.category)"),
+        _stats_upsert(STATS_YOMI_ROW, f"{row}.yomi_row", delta, f"{row}.yomi_row IS NOT NULL"),
+        f"""
+        INSERT INTO term_stats (scope, key, count)
+        SELECT '{STATS_TAG}', trim(value), {delta} FROM {tags}
+        WHERE {row}.tag IS NOT NULL AND trim(value) <> ''
+        ON CONFLICT(scope, key) DO UPDATE SET count = count + ({delta});""",
+    ])
+
+
+def rebuild_term_stats(conn: sqlite3.Connection):
+    """term_stats を terms から作り直す（移行時・一括登録後）"""
+    conn.execute("DELETE FROM term_stats;")
+    conn.execute(f"""
+        INSERT INTO term_stats (scope, key, count)
+        SELECT '{STATS_TOTAL}', '', COUNT(DISTINCT word_name) FROM terms;
+    """)
+    conn.execute(f"""
+        INSERT INTO term_stats (scope, key, count)
+        SELECT '{STATS_CATEGORY}', category, COUNT(DISTINCT word_name)
+        FROM terms WHERE category IS NOT NULL GROUP BY category;
+    """)
+    conn.execute(f"""
+        INSERT INTO term_stats (scope, key, count)
+        SELECT '{STATS_YOMI_ROW}', yomi_row, COUNT(*) FROM terms WHERE yomi_row IS NOT NULL GROUP BY yomi_row;
+    """)
+    conn.execute(f"""
+        INSERT INTO term_stats (scope, key, count)
+        SELECT '{STATS_TAG}', trim(j.value), COUNT(*)
+        FROM terms, {_tag_values('terms.tag')} AS j
+        WHERE terms.tag IS NOT NULL AND trim(j.value) <> ''
+        GROUP BY trim(j.value);
+    """)
+
+
+def _create_term_stats(conn: sqlite3.Connection):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS term_stats (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (scope, key)
+        ) WITHOUT ROWID;
+    """)
+    rebuild_term_stats(conn)
+    enabled = f"NOT EXISTS (SELECT 1 FROM settings WHERE key = '{STATS_DEFERRED_KEY}')"
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS terms_stats_ai AFTER INSERT ON terms WHEN {enabled} BEGIN
+            {_stats_changes('NEW', 1)}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS terms_stats_ad AFTER DELETE ON terms WHEN {enabled} BEGIN
+            {_stats_changes('OLD', -1)}
+        END;
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS terms_stats_au
+        AFTER UPDATE OF word_name, category, yomi_row, tag ON terms WHEN {enabled} BEGIN
+            {_stats_changes('OLD', -1)}
+            {_stats_changes('NEW', 1)}
+        END;
+    """)
+
+
+# 現在時刻の UNIX 秒（小数部はミリ秒）
+SQL_NOW = "((julianday('now') - 2440587.5) * 86400.0)"
+
+
+def _prepare_words_sync(conn: sqlite3.Connection):
+    """words に同期用の列・索引と、用語の編集を送信待ちにするトリガを付ける（words が無ければ何もしない）"""
+    if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'words';").fetchone():
+        logger.warning("words テーブルが無いため同期用の準備を省略します")
+        return
+    # 最後に送受信した内容のハッシュ（同じ内容なら送らない・書き換えない）
+    conn.execute("ALTER TABLE words ADD COLUMN content_hash TEXT;")
+    # 送信待ちの行だけを持つ部分索引（同期の手間は変更件数に比例する）
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_words_pending ON words(word_id) WHERE status <> 'synced';")
+    duplicated = conn.execute(
+        "SELECT 1 FROM words WHERE cloud_id IS NOT NULL GROUP BY cloud_id HAVING COUNT(*) > 1 LIMIT 1;"
+    ).fetchone()
+    unique = "" if duplicated else "UNIQUE "
+    if duplicated:
+        logger.warning("words.cloud_id に重複があるため UNIQUE 索引を作成できません")
+    conn.execute(f"CREATE {unique}INDEX IF NOT EXISTS idx_words_cloud_id ON words(cloud_id);")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_words_word_name ON words(word_name);")
+    conn.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS terms_words_pending_au
+        AFTER UPDATE OF explain, tag, category, yomi ON terms BEGIN
+            UPDATE words SET status = 'pending_upload', last_edited = {SQL_NOW}
+            WHERE word_name = NEW.word_name AND status = 'synced';
+        END;
+    """)
+
+
+def _create_changefeed(conn: sqlite3.Connection):
+    """terms / words の変更を seq 順に記録する changefeed と、読み手ごとの位置 changefeed_consumers"""
+    # AUTOINCREMENT なので、古い行を消しても seq は再利用されない
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS changefeed (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            row_key INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at REAL NOT NULL DEFAULT {SQL_NOW}
+        );
+    """)
+    conn.execute(f"""
+        CREATE TABLE IF NOT EXISTS changefeed_consumers (
+            name TEXT PRIMARY KEY,
+            cursor INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL DEFAULT {SQL_NOW}
+        );
+    """)
+    enabled = f"NOT EXISTS (SELECT 1 FROM settings WHERE key = '{CHANGEFEED_DEFERRED_KEY}')"
+    for table, (key, columns) in CHANGEFEED_COLUMNS.items():
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (table,)).fetchone():
+            continue
+        record = "INSERT INTO changefeed (table_name, row_key, op) SELECT '{table}', {row}.{key}, '{op}'"
+        # 主キー自体が変わった更新は、古いキーの削除としても記録する
+        key_moved = record.format(table=table, row="OLD", key=key, op="delete") + f" WHERE OLD.{key} IS NOT NEW.{key};"
+        for suffix, event, op, row, before in (("ai", "INSERT", "insert", "NEW", ""),
+                                               ("au", f"UPDATE OF {', '.join(columns)}", "update", "NEW", key_moved),
+                                               ("ad", "DELETE", "delete", "OLD", "")):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_changefeed_{suffix} AFTER {event} ON {table}
+                WHEN {enabled} BEGIN
+                    {before}
+                    {record.format(table=table, row=row, key=key, op=op)};
+                END;
+            """)
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "terms の検索・並び替え用インデックス", [
+        "CREATE INDEX IF NOT EXISTS idx_terms_word_name ON terms(word_name);",
+        "CREATE INDEX IF NOT EXISTS idx_terms_category_word_name ON terms(category, word_name);",
+        "CREATE INDEX IF NOT EXISTS idx_terms_yomi_word_name ON terms(yomi, word_name);",
+    ]),
+    Migration(2, "全文検索用の terms_fts (FTS5 trigram)", [_create_terms_fts]),
+    Migration(3, "一括登録時に terms_fts への行単位の追加を止められるようにする", [_defer_terms_fts_insert]),
+    Migration(4, "差分エクスポート用の terms.updated_at", [
+        "ALTER TABLE terms ADD COLUMN updated_at REAL;",
+        "CREATE INDEX IF NOT EXISTS idx_terms_updated_at ON terms(updated_at);",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS terms_updated_at_ai AFTER INSERT ON terms
+        WHEN NEW.updated_at IS NULL BEGIN
+            UPDATE terms SET updated_at = {SQL_NOW} WHERE question_id = NEW.question_id;
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS terms_updated_at_au AFTER UPDATE ON terms
+        WHEN NEW.updated_at IS OLD.updated_at BEGIN
+            UPDATE terms SET updated_at = {SQL_NOW} WHERE question_id = NEW.question_id;
+        END;
+        """,
+    ]),
+    # yomi_row は kana.yomi_row_key と同じ規則。値を入れて INSERT すればトリガは何もしない
+    Migration(5, "五十音の行で引くための terms.yomi_row", [
+        "ALTER TABLE terms ADD COLUMN yomi_row TEXT;",
+        f"UPDATE terms SET yomi_row = {yomi_row_sql('yomi')};",
+        "CREATE INDEX IF NOT EXISTS idx_terms_yomi_row ON terms(yomi_row, yomi, word_name);",
+        f"""
+        CREATE TRIGGER IF NOT EXISTS terms_yomi_row_ai AFTER INSERT ON terms
+        WHEN NEW.yomi_row IS NOT {yomi_row_sql('NEW.yomi')} BEGIN
+            UPDATE terms SET yomi_row = {yomi_row_sql('NEW.yomi')} WHERE question_id = NEW.question_id;
+        END;
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS terms_yomi_row_au AFTER UPDATE OF yomi, yomi_row ON terms
+        WHEN NEW.yomi_row IS NOT {yomi_row_sql('NEW.yomi')} BEGIN
+            UPDATE terms SET yomi_row = {yomi_row_sql('NEW.yomi')} WHERE question_id = NEW.question_id;
+        END;
+        """,
+    ]),
+    Migration(6, "総数・カテゴリ別・行別・タグ別の件数を持つ term_stats", [_create_term_stats]),
+    # question_id は INTEGER PRIMARY KEY（rowid）なので、due_at の索引は実質 (due_at, question_id)
+    Migration(7, "クイズの復習スケジュール review_state", [
+        """
+        CREATE TABLE IF NOT EXISTS review_state (
+            question_id INTEGER PRIMARY KEY REFERENCES terms(question_id) ON DELETE CASCADE,
+            repetitions INTEGER NOT NULL DEFAULT 0,
+            interval_days REAL NOT NULL DEFAULT 0,
+            ease REAL NOT NULL DEFAULT 2.5,
+            due_at REAL NOT NULL,
+            last_reviewed REAL,
+            lapses INTEGER NOT NULL DEFAULT 0
+        );
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_review_state_due_at ON review_state(due_at);",
+    ]),
+    Migration(8, "words の差分同期用の content_hash と送信待ちの索引", [_prepare_words_sync]),
+    Migration(9, "terms / words の変更を記録する changefeed", [_create_changefeed]),
+    # words を書き込む同期（v8）の前提。重複があれば UNIQUE でないまま記録し、起動のたびに作り直しを試みる
+    Migration(10, "words の外部キーの親キー terms(word_name) を UNIQUE にする", [_unique_word_name_index]),
+]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);")
+    row = conn.execute("SELECT value FROM settings WHERE key = ?;", (SCHEMA_VERSION_KEY,)).fetchone()
+    try:
+        return int(row[0]) if row else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def _set_schema_version(conn: sqlite3.Connection, version: int):
+    conn.execute(
+        "INSERT INTO settings (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value;",
+        (SCHEMA_VERSION_KEY, str(version))
+    )
+
+
+def run_migrations(conn: sqlite3.Connection, migrations: Sequence[Migration] = MIGRATIONS) -> int:
+    """未適用のマイグレーションを順に適用し、最終的なスキーマバージョンを返す。
+
+    マイグレーションは 1 つずつ独立したトランザクションで適用し、
+    失敗したらそこで止める（それ以前の分は適用済みのまま残る）。
+    """
+    current = get_schema_version(conn)
+    conn.commit()
+    applied = 0
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version <= current:
+            continue
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            for step in migration.steps:
+                if callable(step):
+                    step(conn)
+                else:
+                    conn.execute(step)
+            _set_schema_version(conn, migration.version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("マイグレーション v%d (%s) に失敗しました", migration.version, migration.description)
+            break
+        current = migration.version
+        applied += 1
+        logger.info("マイグレーション v%d を適用しました: %s", migration.version, migration.description)
+
+    if current >= UNIQUE_WORD_NAME_VERSION and not applied and not _word_name_index_is_unique(conn):
+        try:
+            conn.execute("BEGIN IMMEDIATE;")
+            unique = _unique_word_name_index(conn)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            logger.exception("terms(word_name) の UNIQUE 索引の作成エラー")
+        else:
+            if unique:
+                logger.info("重複が解消されたため terms(word_name) を UNIQUE にしました")
+
+    if applied:
+        # 新しいインデックスをプランナに使わせるため統計を取り直す
+        conn.execute("ANALYZE;")
+        conn.commit()
+    return current
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="スキーマのバージョンと terms.word_name の重複を確認する")
+    parser.add_argument("--db")
+    parser.add_argument("--rename-duplicates", action="store_true",
+                        help="重複した word_name を「名前 (question_id)」に改名して UNIQUE にする")
+    args = parser.parse_args(argv)
+
+    from Model.BaseModel import DB_CANDIDATES
+    path = args.db or next((p for p in map(os.path.abspath, DB_CANDIDATES) if os.path.exists(p)), None)
+    if not path or not os.path.exists(path):
+        parser.error("データベースファイルが見つかりません")
+    conn = sqlite3.connect(path)
+    try:
+        conn.execute("PRAGMA foreign_keys = ON;")
+        version = run_migrations(conn)
+        print(f"スキーマバージョン: {version} / word_name の UNIQUE 索引: {'あり' if _word_name_index_is_unique(conn) else 'なし'}")
+        if args.rename_duplicates:
+            for new_name, name in rename_duplicate_word_names(conn).items():
+                print(f"改名: {name} -> {new_name}")
+        for name, question_ids in find_duplicate_word_names(conn).items():
+            print(f"重複: {name} (question_id: {', '.join(map(str, question_ids))})")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
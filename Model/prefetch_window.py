@@ -0,0 +1,143 @@
+# Model/prefetch_window.py
+import bisect
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from Model.term import Term
+
+logger = logging.getLogger(__name__)
+
+# 現在位置の前後に保持する件数
+DEFAULT_RADIUS = 20
+# 端までの残りがこの件数以下になったら裏で読み直す
+DEFAULT_REFILL_MARGIN = 5
+
+# loader(center_id, radius) -> (records, at_start, at_end)
+#   records は question_id 昇順の Term。center_id より小さいものを最大 radius 件、
+#   center_id 以上のものを最大 radius + 1 件含む。
+#   at_start / at_end はそれ以上前 / 後ろに行が無いことを示す。
+Loader = Callable[[int, int], Tuple[List[Term], bool, bool]]
+
+
+class PrefetchWindow:
+    """question_id 順の前後 N 件を保持し、次/前の移動を DB なしで答える窓。
+
+    端に近づくと専用スレッドで新しい窓を読み、次の移動時に差し替える。
+    書き込みがあったら invalidate() で捨てる。
+    """
+
+    def __init__(self, loader: Loader, radius: int = DEFAULT_RADIUS,
+                 refill_margin: int = DEFAULT_REFILL_MARGIN):
+        self.loader = loader
+        self.radius = radius
+        self.refill_margin = refill_margin
+        self._records: List[Term] = []
+        self._ids: List[int] = []
+        self._at_start = False
+        self._at_end = False
+        self._valid = False
+        self._future: Optional[Future] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.background_loads = 0
+
+    def neighbor(self, current_id: int, step: int) -> Optional[Term]:
+        """current_id から step（+1 / -1）件移動した行を返す。無ければ None。"""
+        self._collect()
+        if not self._covers(current_id):
+            self._install(self.loader(current_id, self.radius))
+            self.loads += 1
+        else:
+            self.hits += 1
+
+        index = self._target_index(current_id, step)
+        if index is None and not (self._at_start if step < 0 else self._at_end):
+            # 窓の外に出たが、その先にまだ行がある（裏の読み込みが間に合わなかった）
+            self._install(self.loader(current_id, self.radius))
+            self.loads += 1
+            index = self._target_index(current_id, step)
+        if index is None:
+            return None
+        self._maybe_refill(index)
+        return self._records[index]
+
+    def invalidate(self):
+        with self._lock:
+            self._valid = False
+            self._future = None
+
+    def shutdown(self):
+        """先読みスレッドを止める（読み込み中なら終わるまで待つ。DB 接続を閉じる前に呼ぶ）"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._future = None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': len(self._records),
+            'hits': self.hits,
+            'loads': self.loads,
+            'background_loads': self.background_loads,
+        }
+
+    # --- 内部処理 ---
+
+    def _install(self, loaded: Tuple[List[Term], bool, bool]):
+        records, at_start, at_end = loaded
+        with self._lock:
+            self._records = records
+            self._ids = [r.question_id for r in records]
+            self._at_start = at_start
+            self._at_end = at_end
+            self._valid = True
+
+    def _collect(self):
+        """裏で読み終わった窓があれば差し替える。"""
+        with self._lock:
+            future = self._future
+            if future is None or not future.done():
+                return
+            self._future = None
+        try:
+            self._install(future.result())
+        except Exception:
+            # 次の移動では窓の外として読み直す
+            logger.exception("先読みの読み込みエラー")
+
+    def _covers(self, current_id: int) -> bool:
+        with self._lock:
+            if not self._valid:
+                return False
+            if not self._ids:
+                return self._at_start and self._at_end
+            low_ok = self._at_start or self._ids[0] <= current_id
+            high_ok = self._at_end or current_id <= self._ids[-1]
+            return low_ok and high_ok
+
+    def _target_index(self, current_id: int, step: int) -> Optional[int]:
+        if step > 0:
+            index = bisect.bisect_right(self._ids, current_id) + step - 1
+        else:
+            index = bisect.bisect_left(self._ids, current_id) + step
+        if 0 <= index < len(self._ids):
+            return index
+        return None
+
+    def _maybe_refill(self, index: int):
+        near_start = index < self.refill_margin and not self._at_start
+        near_end = len(self._ids) - 1 - index < self.refill_margin and not self._at_end
+        if not (near_start or near_end):
+            return
+        with self._lock:
+            if self._future is not None:
+                return
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+            self._future = self._executor.submit(self.loader, self._ids[index], self.radius)
+            self.background_loads += 1
@@ -0,0 +1,265 @@
+# Model/query_stats.py
+"""SQL の実行時間の計測。
+
+環境変数 ITLS_QUERY_STATS=1 のときだけ、ConnectionManager が計測用の接続クラス
+（InstrumentedConnection）で接続を開く。無効時は通常の sqlite3.Connection のままで、余計な負荷は無い。
+
+- 文の「形」（空白を詰め、リテラルと IN (?, ?, ...) をまとめた SQL）ごとに回数とレイテンシの分布を持つ
+- execute にかかった時間（最初の行まで）と、fetch にかかった時間は分けて数える
+- ITLS_SLOW_QUERY_MS（既定 100ms）を超えた文は EXPLAIN QUERY PLAN 付きで slow-query ログに出す
+"""
+import bisect
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+slow_logger = logging.getLogger("Model.slow_query")
+
+QUERY_STATS_ENV = "ITLS_QUERY_STATS"
+SLOW_QUERY_ENV = "ITLS_SLOW_QUERY_MS"
+DEFAULT_SLOW_QUERY_MS = 100.0
+
+# ヒストグラムの上限値（ミリ秒）。0.05ms から約 1.5 倍ずつ、最後は上限なし
+BUCKET_BOUNDS_MS = tuple(round(0.05 * 1.5 ** i, 3) for i in range(30)) + (float("inf"),)
+
+# EXPLAIN QUERY PLAN を取る文の先頭キーワード
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_NAMED_PARAM = re.compile(r"[:@$]\w+")
+
+
+def query_stats_enabled() -> bool:
+    return os.environ.get(QUERY_STATS_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def slow_query_threshold_ms() -> float:
+    try:
+        return float(os.environ.get(SLOW_QUERY_ENV, DEFAULT_SLOW_QUERY_MS))
+    except ValueError:
+        return DEFAULT_SLOW_QUERY_MS
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """SQL を集計用の形にそろえる（リテラル・名前付き引数・プレースホルダ列を ? にまとめる）"""
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _NAMED_PARAM.sub("?", shape)
+    shape = _PLACEHOLDER_LIST.sub("(?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip().rstrip(";").strip()
+
+
+class LatencyHistogram:
+    """固定バケットのレイテンシ分布（パーセンタイルはバケットの上限値で近似する）"""
+
+    __slots__ = ("counts", "count", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKET_BOUNDS_MS)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, elapsed_ms: float):
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = p / 100.0 * self.count
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+
+class ShapeStats:
+    """1 つの SQL の形についての集計"""
+
+    __slots__ = ("sql", "latency", "fetch_ms", "rows", "slow")
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.latency = LatencyHistogram()
+        self.fetch_ms = 0.0
+        self.rows = 0
+        self.slow = 0
+
+    def as_dict(self) -> Dict:
+        h = self.latency
+        return {
+            "sql": self.sql,
+            "calls": h.count,
+            "total_ms": round(h.total_ms + self.fetch_ms, 3),
+            "execute_ms": round(h.total_ms, 3),
+            "fetch_ms": round(self.fetch_ms, 3),
+            "mean_ms": round(h.total_ms / h.count, 3) if h.count else 0.0,
+            "p50_ms": h.percentile(50),
+            "p95_ms": h.percentile(95),
+            "p99_ms": h.percentile(99),
+            "max_ms": round(h.max_ms, 3),
+            "rows": self.rows,
+            "slow": self.slow,
+        }
+
+
+class QueryStats:
+    """DB ファイル 1 つ分の SQL 計測結果（スレッドセーフ）"""
+
+    def __init__(self, slow_ms: Optional[float] = None):
+        self.slow_ms = slow_query_threshold_ms() if slow_ms is None else slow_ms
+        self._lock = threading.Lock()
+        self._shapes: Dict[str, ShapeStats] = {}
+        self._plans: Dict[str, str] = {}
+        self.started = time.time()
+
+    def _shape(self, sql: str) -> ShapeStats:
+        shape = normalize_sql(sql)
+        stats = self._shapes.get(shape)
+        if stats is None:
+            stats = self._shapes[shape] = ShapeStats(shape)
+        return stats
+
+    def record(self, conn: sqlite3.Connection, sql: str, params, elapsed_ms: float):
+        """execute / executemany 1 回分を記録する（params が None なら EXPLAIN しない）"""
+        with self._lock:
+            stats = self._shape(sql)
+            stats.latency.add(elapsed_ms)
+        if elapsed_ms >= self.slow_ms:
+            self._log_slow(conn, stats, sql, params, elapsed_ms, "execute")
+
+    def record_fetch(self, conn: sqlite3.Connection, sql: str, params, elapsed_ms: float, rows: int):
+        """fetch 1 回分を記録する（行の取り出しが遅い文も slow-query ログに出す）"""
+        with self._lock:
+            stats = self._shape(sql)
+            stats.fetch_ms += elapsed_ms
+            stats.rows += rows
+        if elapsed_ms >= self.slow_ms:
+            self._log_slow(conn, stats, sql, params, elapsed_ms, "fetch")
+
+    def _log_slow(self, conn, stats: ShapeStats, sql: str, params, elapsed_ms: float, stage: str):
+        with self._lock:
+            stats.slow += 1
+            plan = self._plans.get(stats.sql)
+        if plan is None:
+            plan = self._explain(conn, sql, params)
+            with self._lock:
+                self._plans[stats.sql] = plan
+        slow_logger.warning("slow query (%s %.1fms): %s\n%s", stage, elapsed_ms, stats.sql, plan)
+
+    def _explain(self, conn: sqlite3.Connection, sql: str, params) -> str:
+        if params is None or not sql.lstrip().upper().startswith(_EXPLAINABLE):
+            return "  (no plan)"
+        try:
+            # 計測を通さない素の execute で問い合わせる
+            rows = sqlite3.Connection.execute(conn, "EXPLAIN QUERY PLAN " + sql, params).fetchall()
+        except Exception as e:
+            return f"  (EXPLAIN failed: {e})"
+        depth = {0: 0}
+        lines = []
+        for node_id, parent, _, detail in rows:
+            depth[node_id] = depth.get(parent, 0) + 1
+            lines.append("  " * depth[node_id] + detail)
+        return "\n".join(lines)
+
+    def snapshot(self, top: Optional[int] = None, order_by: str = "total_ms") -> List[Dict]:
+        """形ごとの集計を order_by の降順で返す"""
+        with self._lock:
+            rows = [s.as_dict() for s in self._shapes.values()]
+        rows.sort(key=lambda r: r[order_by], reverse=True)
+        return rows if top is None else rows[:top]
+
+    def reset(self):
+        with self._lock:
+            self._shapes.clear()
+            self._plans.clear()
+            self.started = time.time()
+
+    def report(self, top: int = 15) -> str:
+        # p50 / p99 / max は execute（最初の行まで）の時間。total は fetch を含む
+        lines = [f"{'calls':>7} {'total':>9} {'p50':>7} {'p99':>7} {'max':>8} {'rows':>8}  sql"]
+        for r in self.snapshot(top):
+            lines.append(f"{r['calls']:>7} {r['total_ms']:>9.1f} {r['p50_ms']:>7.2f} {r['p99_ms']:>7.2f} "
+                         f"{r['max_ms']:>8.2f} {r['rows']:>8}  {r['sql'][:120]}")
+        return "\n".join(lines)
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute / fetch の時間を接続の QueryStats に記録するカーソル"""
+
+    _sql = None
+    _params = None
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._sql = sql
+            self._params = parameters
+            self.connection.query_stats.record(self.connection, sql, parameters,
+                                               (time.perf_counter() - started) * 1000.0)
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._sql = None
+            # 引数の列は反復子のこともあるので EXPLAIN はしない（params=None）
+            self.connection.query_stats.record(self.connection, sql, None,
+                                               (time.perf_counter() - started) * 1000.0)
+
+    def _timed_fetch(self, fetch, *args):
+        started = time.perf_counter()
+        result = fetch(*args)
+        if self._sql is not None:
+            rows = len(result) if isinstance(result, list) else (0 if result is None else 1)
+            self.connection.query_stats.record_fetch(self.connection, self._sql, self._params,
+                                                     (time.perf_counter() - started) * 1000.0, rows)
+        return result
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, self.arraysize if size is None else size)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+    def __next__(self):
+        return self._timed_fetch(super().__next__)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """sqlite3.connect(factory=...) 用。execute 系をすべて InstrumentedCursor 経由にする"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.query_stats: Optional[QueryStats] = None
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
@@ -0,0 +1,364 @@
+# Model/quiz_scheduler.py
+"""間隔反復（SM-2）によるクイズの出題順の管理。
+
+用語ごとの復習状態は review_state に保存し、due_at の索引から期限の近い順に
+batch_size 件ずつまとめて読み込む。読み込んだ分はメモリ上のヒープで管理するので、
+次の問題の選択は O(log n) で DB を待たない。Tk に依存しないのでそのまま計測にも使える。
+
+    python -m Model.quiz_scheduler --answers 10000   # 出題・採点を繰り返して速度を測る（DB のコピーで）
+"""
+import argparse
+import heapq
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+import logging
+from collections import deque
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from Model.BaseModel import DB_CANDIDATES, BaseModel, close_all_connections
+from Model.term import Term
+from Model.term_repository import DETAIL_COLUMNS
+from Model.change_events import ChangeBus, TermChangeEvent, INSERT, UPDATE, DELETE, RELOAD
+
+logger = logging.getLogger(__name__)
+
+DAY = 86400.0
+
+# 1 回の問い合わせで読み込む件数
+DEFAULT_BATCH_SIZE = 200
+
+# SM-2 の定数
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+PASSING_GRADE = 3          # 0〜5 のうち、これ以上を正解とみなす
+
+# _loaded_until がこの値なら review_state を全件読み込み済み
+_INF = float("inf")
+
+_TERM_COLUMNS = ", ".join("t." + col.strip() for col in DETAIL_COLUMNS.split(","))
+
+
+class ReviewState(NamedTuple):
+    question_id: int
+    repetitions: int = 0
+    interval_days: float = 0.0
+    ease: float = INITIAL_EASE
+    due_at: float = 0.0
+    last_reviewed: Optional[float] = None
+    lapses: int = 0
+
+
+class QuizCard(NamedTuple):
+    term: Term
+    state: Optional[ReviewState]   # 新しい用語（未出題）なら None
+
+    @property
+    def is_new(self) -> bool:
+        return self.state is None
+
+
+def sm2(state: Optional[ReviewState], question_id: int, grade: int, now: float) -> ReviewState:
+    """SM-2 で次の復習状態を求める。grade は 0（全く分からない）〜 5（完璧）"""
+    grade = max(0, min(5, int(grade)))
+    if state is None:
+        state = ReviewState(question_id)
+    ease = max(MIN_EASE, state.ease + 0.1 - (5 - grade) * (0.08 + (5 - grade) * 0.02))
+    if grade >= PASSING_GRADE:
+        repetitions = state.repetitions + 1
+        if repetitions == 1:
+            interval = 1.0
+        elif repetitions == 2:
+            interval = 6.0
+        else:
+            interval = state.interval_days * ease
+        lapses = state.lapses
+    else:
+        repetitions = 0
+        interval = 1.0
+        lapses = state.lapses + 1
+    return ReviewState(question_id, repetitions, interval, ease, now + interval * DAY, now, lapses)
+
+
+class QuizScheduler(BaseModel):
+    """期限の近い順に出題し、解答を SM-2 で次の期限に反映する"""
+
+    def __init__(self, db_path: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_new: Optional[int] = None, events: Optional[ChangeBus] = None,
+                 clock: Callable[[], float] = time.time):
+        super().__init__(db_path=db_path)
+        self.batch_size = max(1, batch_size)
+        self.max_new = max_new          # 1 セッションで出す新しい用語の上限（None で無制限）
+        self.clock = clock
+        self._lock = threading.RLock()
+        self._unsubscribe = events.subscribe(self._on_event) if events is not None else None
+        self.answered = 0
+        self.refills = 0
+        self.reset()
+
+    def reset(self):
+        """メモリ上のキューを捨てる（次の出題時に DB から読み直す）"""
+        with self._lock:
+            # (due_at, question_id)。古くなった要素は _states と突き合わせて捨てる
+            self._heap: List[Tuple[float, int]] = []
+            self._states: Dict[int, ReviewState] = {}
+            self._terms: Dict[int, Term] = {}
+            # ここまで（この (due_at, question_id) 以下）は DB から読み込み済み
+            self._loaded_until: Optional[Tuple[float, int]] = None
+            self._new: Deque[Term] = deque()
+            self._new_after = 0
+            self._new_exhausted = False
+            self.new_served = 0
+
+    # --- 出題 ---
+
+    def next_card(self, now: Optional[float] = None) -> Optional[QuizCard]:
+        """次に出す問題。期限切れの復習 → 新しい用語の順。どちらも無ければ None"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            top = self._peek_due()
+            if top is not None and top[0] <= now:
+                question_id = top[1]
+                return QuizCard(self._terms[question_id], self._states[question_id])
+            term = self._peek_new()
+            if term is not None:
+                return QuizCard(term, None)
+        return None
+
+    def answer(self, question_id: int, grade: int, now: Optional[float] = None) -> Optional[ReviewState]:
+        """解答を記録して次の期限を決める。用語が存在しなければ None"""
+        now = self.clock() if now is None else now
+        with self._lock:
+            state = self._states.get(question_id)
+            if state is None:
+                state = self._load_state(question_id)
+            new_state = sm2(state, question_id, grade, now)
+            try:
+                with self.get_conn() as conn:
+                    cur = conn.execute("""
+                        INSERT INTO review_state
+                            (question_id, repetitions, interval_days, ease, due_at, last_reviewed, lapses)
+                        SELECT ?, ?, ?, ?, ?, ?, ? WHERE EXISTS (SELECT 1 FROM terms WHERE question_id = ?)
+                        ON CONFLICT(question_id) DO UPDATE SET
+                            repetitions = excluded.repetitions, interval_days = excluded.interval_days,
+                            ease = excluded.ease, due_at = excluded.due_at,
+                            last_reviewed = excluded.last_reviewed, lapses = excluded.lapses;
+                    """, new_state + (question_id,))
+                    if cur.rowcount == 0:
+                        self._drop(question_id)
+                        return None
+            except Exception:
+                logger.exception("復習状態の保存エラー")
+                return None
+
+            term = self._terms.get(question_id)
+            if self._new and self._new[0].question_id == question_id:
+                term = self._new.popleft()
+                self.new_served += 1
+            self._drop(question_id)
+            # 読み込み済みの範囲に入るなら、ヒープに戻す（範囲外なら次の読み込みで DB から来る）
+            if term is not None and self._loaded_until is not None \
+                    and (new_state.due_at, question_id) <= self._loaded_until:
+                self._push(term, new_state)
+            self.answered += 1
+            return new_state
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        """期限切れの復習の件数（due_at の索引の範囲を数える）"""
+        now = self.clock() if now is None else now
+        try:
+            return self.fetch_value("SELECT COUNT(*) FROM review_state WHERE due_at <= ?;", (now,), default=0)
+        except Exception:
+            logger.exception("期限切れ件数の取得エラー")
+            return 0
+
+    def get_state(self, question_id: int) -> Optional[ReviewState]:
+        with self._lock:
+            state = self._states.get(question_id)
+        return state if state is not None else self._load_state(question_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'queued': len(self._states),
+                'heap': len(self._heap),
+                'new_queued': len(self._new),
+                'new_served': self.new_served,
+                'answered': self.answered,
+                'refills': self.refills,
+            }
+
+    def shutdown(self):
+        """変更通知の購読をやめる"""
+        if self._unsubscribe is not None:
+            self._unsubscribe()
+            self._unsubscribe = None
+
+    # --- 期限順キュー ---
+
+    def _push(self, term: Term, state: ReviewState):
+        self._terms[state.question_id] = term
+        self._states[state.question_id] = state
+        heapq.heappush(self._heap, (state.due_at, state.question_id))
+
+    def _drop(self, question_id: int):
+        # ヒープ上の要素は残るが、_states と一致しないので _peek_due で捨てられる
+        self._states.pop(question_id, None)
+        self._terms.pop(question_id, None)
+
+    def _peek_due(self) -> Optional[Tuple[float, int]]:
+        while True:
+            while self._heap:
+                due_at, question_id = self._heap[0]
+                state = self._states.get(question_id)
+                if state is not None and state.due_at == due_at:
+                    return self._heap[0]
+                heapq.heappop(self._heap)
+            if self._loaded_until == (_INF, 0) or not self._refill_due():
+                return None
+
+    def _refill_due(self) -> bool:
+        """読み込み済みの範囲の続きを期限順に batch_size 件読む。読めなければ False"""
+        after = self._loaded_until or (-_INF, 0)
+        try:
+            rows = self.fetchall_tuples(f"""
+                SELECT r.question_id, r.repetitions, r.interval_days, r.ease, r.due_at, r.last_reviewed, r.lapses,
+                       {_TERM_COLUMNS}
+                FROM review_state AS r
+                JOIN terms AS t ON t.question_id = r.question_id
+                WHERE (r.due_at, r.question_id) > (?, ?)
+                ORDER BY r.due_at, r.question_id
+                LIMIT ?;
+            """, (after[0], after[1], self.batch_size))
+        except Exception:
+            logger.exception("復習キューの読み込みエラー")
+            return False
+        self.refills += 1
+        width = len(ReviewState._fields)
+        for row in rows:
+            state = ReviewState(*row[:width])
+            if state.question_id not in self._states:
+                self._push(Term.from_tuple(row[width:]), state)
+        if len(rows) < self.batch_size:
+            self._loaded_until = (_INF, 0)
+        else:
+            self._loaded_until = (rows[-1][4], rows[-1][0])
+        return bool(rows)
+
+    # --- 新しい用語 ---
+
+    def _peek_new(self) -> Optional[Term]:
+        if self.max_new is not None and self.new_served >= self.max_new:
+            return None
+        while not self._new:
+            if self._new_exhausted or not self._refill_new():
+                return None
+        return self._new[0]
+
+    def _refill_new(self) -> bool:
+        """review_state に無い用語を question_id 順に batch_size 件読む"""
+        try:
+            rows = self.fetchall_tuples(f"""
+                SELECT {_TERM_COLUMNS}
+                FROM terms AS t
+                WHERE t.question_id > ?
+                  AND NOT EXISTS (SELECT 1 FROM review_state AS r WHERE r.question_id = t.question_id)
+                ORDER BY t.question_id
+                LIMIT ?;
+            """, (self._new_after, self.batch_size))
+        except Exception:
+            logger.exception("新しい用語の読み込みエラー")
+            return False
+        self.refills += 1
+        if len(rows) < self.batch_size:
+            self._new_exhausted = True
+        if rows:
+            self._new_after = rows[-1][0]
+            self._new.extend(Term.from_tuple(row) for row in rows)
+        return bool(rows)
+
+    def _load_state(self, question_id: int) -> Optional[ReviewState]:
+        row = self.fetchall_tuples("""
+            SELECT question_id, repetitions, interval_days, ease, due_at, last_reviewed, lapses
+            FROM review_state WHERE question_id = ?;
+        """, (question_id,))
+        return ReviewState(*row[0]) if row else None
+
+    # --- 変更通知 ---
+
+    def _on_event(self, event: TermChangeEvent):
+        with self._lock:
+            if event.kind == RELOAD:
+                self.reset()
+            elif event.kind == DELETE and event.question_id is not None:
+                self._drop(event.question_id)
+                self._new = deque(t for t in self._new if t.question_id != event.question_id)
+            elif event.kind == INSERT and event.row is not None:
+                # 読み込み済みの範囲より後なら次の _refill_new で読む。範囲内なら（同期の受信など）ここで積む
+                if event.row.question_id <= self._new_after:
+                    if all(t.question_id != event.row.question_id for t in self._new):
+                        self._new.append(event.row)
+                else:
+                    self._new_exhausted = False
+            elif event.kind == UPDATE and event.row is not None:
+                # 読み込み済みの Term を新しい内容に差し替える（期限順キューは question_id しか持たない）
+                question_id = event.row.question_id
+                if question_id in self._terms:
+                    self._terms[question_id] = event.row
+                self._new = deque(event.row if t.question_id == question_id else t for t in self._new)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="クイズの出題・採点を繰り返して速度を測る")
+    parser.add_argument("--answers", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--db", help="コピー元の DB（省略時は word_master.db）。元の DB には書き込まない")
+    args = parser.parse_args(argv)
+
+    source = args.db or next((p for p in map(os.path.abspath, DB_CANDIDATES) if os.path.exists(p)), None)
+    if not source or not os.path.exists(source):
+        parser.error("データベースファイルが見つかりません")
+    with tempfile.TemporaryDirectory() as work:
+        # 採点で review_state を書き換えるので、backup API で作ったコピーに対して測る
+        copy = os.path.join(work, "bench.db")
+        src, dst = sqlite3.connect(source), sqlite3.connect(copy)
+        try:
+            src.backup(dst)
+        finally:
+            src.close()
+            dst.close()
+        try:
+            _run_benchmark(copy, args)
+        finally:
+            close_all_connections()
+
+
+def _run_benchmark(db_path: str, args):
+    rng = random.Random(args.seed)
+    # 仮想時計: 1 問ごとに 1 分進め、出す問題が無くなったら次の期限まで飛ばす
+    now = [time.time()]
+    scheduler = QuizScheduler(db_path=db_path, batch_size=args.batch_size, clock=lambda: now[0])
+    pick = []
+    started = time.perf_counter()
+    for _ in range(args.answers):
+        t0 = time.perf_counter()
+        card = scheduler.next_card()
+        if card is None:
+            now[0] += DAY
+            continue
+        pick.append(time.perf_counter() - t0)
+        scheduler.answer(card.term.question_id, rng.choice((1, 3, 4, 4, 5, 5)))
+        now[0] += 60
+    elapsed = time.perf_counter() - started
+    pick.sort()
+    if pick:
+        print(f"{len(pick)} 問: 合計 {elapsed:.2f} 秒, 出題 p50 {pick[len(pick) // 2] * 1e6:.0f}µs "
+              f"/ p99 {pick[int(len(pick) * 0.99)] * 1e6:.0f}µs, {scheduler.stats()}")
+
+
+if __name__ == "__main__":
+    main()
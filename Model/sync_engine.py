@@ -0,0 +1,349 @@
+# Model/sync_engine.py
+"""words テーブルの差分同期。
+
+- push: status が synced 以外（pending_upload / pending_delete）の行だけを、部分索引
+  idx_words_pending から word_id 順に batch_size 件ずつ送る
+- pull: サーバーの変更番号（seq）が settings の 'sync_pull_watermark' より後の分だけを受け取る
+- 内容（用語名・説明・タグ・カテゴリ・読み・共有）のハッシュが前回の送受信と同じ行は送らず、書き換えない
+- 1 回のやり取りは gzip 圧縮した JSON。通信路は SyncTransport を差し替えられる
+  （LocalTransport は同梱の LocalSyncServer をプロセス内で呼ぶ、HttpTransport は HTTP で送る）
+
+各バッチの結果は 1 トランザクションで反映する（pull は watermark も同じトランザクションで進める）。
+途中で失敗しても、送信済みの行は synced、受信済みの分は watermark に記録済みなので、
+次の sync() は残りから再開する。
+"""
+import gzip
+import hashlib
+import json
+import threading
+import time
+import uuid
+import urllib.request
+import logging
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from Model.BaseModel import BaseModel
+from Model.change_events import ChangeBus, TermChangeEvent, RELOAD
+
+logger = logging.getLogger(__name__)
+
+CLIENT_ID_KEY = "sync_client_id"
+PULL_WATERMARK_KEY = "sync_pull_watermark"
+
+SYNCED = "synced"
+PENDING_UPLOAD = "pending_upload"
+PENDING_DELETE = "pending_delete"
+
+DEFAULT_BATCH_SIZE = 200
+
+# ハッシュの対象（この順に連結する）
+CONTENT_FIELDS = ("word_name", "explain", "tag", "category", "yomi", "is_shared")
+
+SAVE_SETTING_SQL = """
+    INSERT INTO settings (key, value) VALUES (?, ?)
+    ON CONFLICT(key) DO UPDATE SET value = excluded.value;
+"""
+
+
+def content_hash(item: Dict[str, Any]) -> str:
+    """同期する内容のハッシュ（クライアントとサーバーで同じ規則を使う）"""
+    values = json.dumps([item.get(field) for field in CONTENT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(values.encode("utf-8")).hexdigest()
+
+
+def encode_payload(data: Dict[str, Any]) -> bytes:
+    return gzip.compress(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    return json.loads(gzip.decompress(payload).decode("utf-8"))
+
+
+class SyncError(Exception):
+    """通信路・サーバー側の失敗"""
+
+
+class SyncTransport:
+    """同期の通信路。endpoint（'push' / 'pull'）に圧縮済みの payload を送り、応答を返す"""
+
+    def request(self, endpoint: str, payload: bytes) -> bytes:
+        raise NotImplementedError
+
+
+class LocalTransport(SyncTransport):
+    """同梱の LocalSyncServer をプロセス内で呼ぶ（テスト・開発用）"""
+
+    def __init__(self, server):
+        self.server = server
+
+    def request(self, endpoint: str, payload: bytes) -> bytes:
+        return self.server.handle(endpoint, payload)
+
+
+class HttpTransport(SyncTransport):
+    """base_url/<endpoint> に POST する（python -m Model.sync_server で立てたサーバーなど）"""
+
+    def __init__(self, base_url: str, timeout: float = 30.0):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+
+    def request(self, endpoint: str, payload: bytes) -> bytes:
+        req = urllib.request.Request(
+            f"{self.base_url}/{endpoint}", data=payload, method="POST",
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+        try:
+            with urllib.request.urlopen(req, timeout=self.timeout) as res:
+                return res.read()
+        except OSError as e:
+            raise SyncError(f"{endpoint} に失敗しました: {e}") from e
+
+
+class SyncResult(NamedTuple):
+    pushed: int = 0          # 送信した行（削除を含む）
+    deleted: int = 0         # うち削除
+    skipped: int = 0         # 内容が同じで送らなかった・書き換えなかった行
+    pulled: int = 0          # 受信して反映した行
+    conflicts: int = 0       # ローカルの編集の方が新しく、受信分を捨てた行
+    batches: int = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    complete: bool = True    # False なら途中で失敗した（次回は残りから再開する）
+    error: Optional[str] = None
+
+
+class SyncEngine(BaseModel):
+    """words の送信待ちの行を送り、サーバーの変更を watermark 以降だけ受け取る"""
+
+    _PENDING_SQL = f"""
+        SELECT w.word_id, w.cloud_id, w.word_name, w.is_shared, w.last_edited, w.status, w.content_hash,
+               t.explain, t.tag, t.category, t.yomi
+        FROM words AS w LEFT JOIN terms AS t ON t.word_name = w.word_name
+        WHERE w.status <> '{SYNCED}' AND w.word_id > ? AND w.sync_choice = 1
+        ORDER BY w.word_id LIMIT ?;
+    """
+
+    def __init__(self, transport: SyncTransport, db_path: Optional[str] = None,
+                 batch_size: int = DEFAULT_BATCH_SIZE, events: Optional[ChangeBus] = None):
+        super().__init__(db_path=db_path)
+        self.transport = transport
+        self.batch_size = max(1, batch_size)
+        self.events = events
+        self._lock = threading.Lock()
+        self.client_id = self._client_id()
+
+    # --- 公開メソッド ---
+
+    def sync(self) -> SyncResult:
+        """push してから pull する"""
+        return self._run(self._push, self._pull)
+
+    def push(self) -> SyncResult:
+        return self._run(self._push)
+
+    def pull(self) -> SyncResult:
+        return self._run(self._pull)
+
+    def mark_for_upload(self, word_name: str, is_shared: bool = False) -> Optional[int]:
+        """用語を同期対象（pending_upload）にする。words の行が無ければ作る。word_id を返す"""
+        try:
+            with self.get_conn() as conn:
+                row = conn.execute("SELECT word_id FROM words WHERE word_name = ?;", (word_name,)).fetchone()
+                now = time.time()
+                if row is not None:
+                    conn.execute(
+                        "UPDATE words SET status = ?, is_shared = ?, sync_choice = 1, last_edited = ? "
+                        "WHERE word_id = ?;",
+                        (PENDING_UPLOAD, int(is_shared), now, row[0]))
+                    return row[0]
+                cur = conn.execute(
+                    "INSERT INTO words (word_name, is_shared, sync_choice, last_edited, status) "
+                    "VALUES (?, ?, 1, ?, ?);",
+                    (word_name, int(is_shared), now, PENDING_UPLOAD))
+                return cur.lastrowid
+        except Exception:
+            logger.exception("同期対象の登録エラー")
+            return None
+
+    def mark_for_delete(self, word_name: str) -> bool:
+        """サーバーからも消す（次の push で削除を送る）"""
+        try:
+            with self.get_conn() as conn:
+                cur = conn.execute(
+                    "UPDATE words SET status = ?, last_edited = ? WHERE word_name = ?;",
+                    (PENDING_DELETE, time.time(), word_name))
+                return cur.rowcount > 0
+        except Exception:
+            logger.exception("同期対象の削除エラー")
+            return False
+
+    def pending_count(self) -> int:
+        try:
+            return self.fetch_value(
+                f"SELECT COUNT(*) FROM words WHERE status <> '{SYNCED}' AND sync_choice = 1;", default=0)
+        except Exception:
+            logger.exception("送信待ち件数の取得エラー")
+            return 0
+
+    def watermark(self) -> int:
+        return int(self._setting(PULL_WATERMARK_KEY) or 0)
+
+    # --- push ---
+
+    def _push(self, counts: Dict[str, Any]):
+        after = 0
+        while True:
+            rows = self.fetchall_tuples(self._PENDING_SQL, (after, self.batch_size))
+            if not rows:
+                return
+            after = rows[-1][0]
+            items, skipped, local_deletes = [], [], []
+            for word_id, cloud_id, word_name, is_shared, last_edited, status, old_hash, \
+                    explain, tag, category, yomi in rows:
+                if status == PENDING_DELETE:
+                    if cloud_id is None:
+                        # 一度も送っていない行は、ローカルで消すだけ
+                        local_deletes.append((word_id, last_edited))
+                    else:
+                        items.append({"local_id": word_id, "cloud_id": cloud_id, "deleted": True,
+                                      "last_edited": last_edited})
+                    continue
+                item = {"local_id": word_id, "cloud_id": cloud_id, "word_name": word_name,
+                        "explain": explain, "tag": tag, "category": category, "yomi": yomi,
+                        "is_shared": is_shared, "last_edited": last_edited}
+                item["hash"] = content_hash(item)
+                if cloud_id is not None and item["hash"] == old_hash:
+                    skipped.append((word_id, last_edited))
+                else:
+                    items.append(item)
+
+            results = []
+            if items:
+                request = encode_payload({"client_id": self.client_id, "items": items})
+                response = self.transport.request("push", request)
+                counts["bytes_sent"] += len(request)
+                counts["bytes_received"] += len(response)
+                counts["batches"] += 1
+                results = decode_payload(response).get("results", [])
+            sent = {item["local_id"]: item for item in items}
+            with self.get_conn() as conn:
+                # 送信中に編集された行（last_edited が変わった行）は送信待ちのまま残す
+                conn.executemany(
+                    f"UPDATE words SET status = '{SYNCED}' WHERE word_id = ? AND last_edited = ?;", skipped)
+                conn.executemany(
+                    "DELETE FROM words WHERE word_id = ? AND last_edited = ?;", local_deletes)
+                for result in results:
+                    item = sent.get(result.get("local_id"))
+                    if item is None:
+                        continue
+                    if item.get("deleted"):
+                        conn.execute("DELETE FROM words WHERE word_id = ? AND last_edited = ?;",
+                                     (item["local_id"], item["last_edited"]))
+                        counts["deleted"] += 1
+                    else:
+                        conn.execute(
+                            f"UPDATE words SET status = '{SYNCED}', cloud_id = ?, content_hash = ? "
+                            "WHERE word_id = ? AND last_edited = ?;",
+                            (result["cloud_id"], item["hash"], item["local_id"], item["last_edited"]))
+                    counts["pushed"] += 1
+            counts["skipped"] += len(skipped)
+            if len(rows) < self.batch_size:
+                return
+
+    # --- pull ---
+
+    def _pull(self, counts: Dict[str, Any]):
+        changed_terms = False
+        try:
+            while True:
+                since = self.watermark()
+                request = encode_payload({"client_id": self.client_id, "since": since, "limit": self.batch_size})
+                response = self.transport.request("pull", request)
+                counts["bytes_sent"] += len(request)
+                counts["bytes_received"] += len(response)
+                counts["batches"] += 1
+                data = decode_payload(response)
+                items = data.get("items", [])
+                with self.get_conn() as conn:
+                    for item in items:
+                        outcome = self._apply_remote(conn, item)
+                        counts[outcome] += 1
+                        changed_terms = changed_terms or outcome == "pulled"
+                    conn.execute(SAVE_SETTING_SQL, (PULL_WATERMARK_KEY, str(data.get("next", since))))
+                if not data.get("more"):
+                    return
+        finally:
+            if changed_terms and self.events is not None:
+                self.events.publish(TermChangeEvent(RELOAD))
+
+    def _apply_remote(self, conn, item: Dict[str, Any]) -> str:
+        """受信した 1 件を反映し、counts のキー（pulled / skipped / conflicts）を返す"""
+        local = conn.execute(
+            "SELECT word_id, status, last_edited, content_hash FROM words WHERE cloud_id = ?;",
+            (item["cloud_id"],)).fetchone()
+        if local is None and not item.get("deleted"):
+            # まだ送っていない同じ用語の行があれば、それを受信した行として使う
+            local = conn.execute(
+                "SELECT word_id, status, last_edited, content_hash FROM words "
+                "WHERE word_name = ? AND cloud_id IS NULL;", (item["word_name"],)).fetchone()
+        if local is not None:
+            word_id, status, last_edited, old_hash = local
+            if status != SYNCED and (last_edited or 0) > (item.get("last_edited") or 0):
+                return "conflicts"
+            if not item.get("deleted") and item.get("hash") == old_hash:
+                return "skipped"
+        if item.get("deleted"):
+            if local is None:
+                return "skipped"
+            conn.execute("DELETE FROM words WHERE word_id = ?;", (local[0],))
+            return "pulled"
+
+        # 先に terms を書き換える（terms_words_pending_au が pending にした状態を下で synced に戻す）
+        values = (item.get("explain"), item.get("tag"), item.get("category"), item.get("yomi"))
+        cur = conn.execute("UPDATE terms SET explain = ?, tag = ?, category = ?, yomi = ? WHERE word_name = ?;",
+                           values + (item["word_name"],))
+        if cur.rowcount == 0:
+            conn.execute("INSERT INTO terms (word_name, explain, tag, category, yomi, word_cloud_id) "
+                         "VALUES (?, ?, ?, ?, ?, ?);",
+                         (item["word_name"],) + values + (str(item["cloud_id"]),))
+        row = (item["word_name"], item.get("is_shared", 0), item.get("last_edited") or time.time(),
+               item.get("hash"), item["cloud_id"])
+        if local is None:
+            conn.execute(
+                "INSERT INTO words (word_name, is_shared, last_edited, content_hash, cloud_id, sync_choice, status) "
+                f"VALUES (?, ?, ?, ?, ?, 1, '{SYNCED}');", row)
+        else:
+            conn.execute(
+                "UPDATE words SET word_name = ?, is_shared = ?, last_edited = ?, content_hash = ?, cloud_id = ?, "
+                f"status = '{SYNCED}' WHERE word_id = ?;", row + (local[0],))
+        return "pulled"
+
+    # --- 内部処理 ---
+
+    def _run(self, *steps) -> SyncResult:
+        with self._lock:
+            counts = self._new_counts()
+            try:
+                for step in steps:
+                    step(counts)
+            except Exception as e:
+                logger.exception("同期エラー")
+                counts["complete"] = False
+                counts["error"] = str(e)
+            return SyncResult(**counts)
+
+    @staticmethod
+    def _new_counts() -> Dict[str, Any]:
+        return SyncResult()._asdict()
+
+    def _setting(self, key: str) -> Optional[str]:
+        return self.fetch_value("SELECT value FROM settings WHERE key = ?;", (key,))
+
+    def _client_id(self) -> str:
+        """この DB の同期用 ID（初回に作って settings に保存する）"""
+        value = self._setting(CLIENT_ID_KEY)
+        if value is None:
+            value = uuid.uuid4().hex
+            with self.get_conn() as conn:
+                conn.execute(SAVE_SETTING_SQL, (CLIENT_ID_KEY, value))
+        return value
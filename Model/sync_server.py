@@ -0,0 +1,189 @@
+# Model/sync_server.py
+"""同期サーバーの代わりに使うローカルサーバー（開発・動作確認用）。
+
+SyncEngine と同じ形式（gzip 圧縮した JSON）で push / pull に応答する。
+単語は SQLite（既定はメモリ上）に保存し、変更のたびに通し番号 seq を振る。
+pull は seq の索引で since より後の分だけを返す。
+
+    python -m Model.sync_server --port 8765 --db server.db   # HTTP で立てる（HttpTransport から使う）
+"""
+import argparse
+import sqlite3
+import threading
+import time
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+from Model.sync_engine import content_hash, decode_payload, encode_payload
+
+logger = logging.getLogger(__name__)
+
+ITEM_COLUMNS = ("cloud_id", "word_name", "explain", "tag", "category", "yomi", "is_shared",
+                "last_edited", "deleted", "hash")
+
+
+class LocalSyncServer:
+    """push / pull に応答する単語置き場"""
+
+    def __init__(self, db_path: str = ":memory:"):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS server_words (
+                cloud_id INTEGER PRIMARY KEY,
+                word_name TEXT NOT NULL,
+                explain TEXT,
+                tag TEXT,
+                category TEXT,
+                yomi TEXT,
+                is_shared INTEGER NOT NULL DEFAULT 0,
+                last_edited REAL,
+                deleted INTEGER NOT NULL DEFAULT 0,
+                hash TEXT,
+                seq INTEGER NOT NULL,
+                origin_client TEXT,
+                origin_local_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS idx_server_words_seq ON server_words(seq);
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_server_words_origin
+                ON server_words(origin_client, origin_local_id);
+        """)
+        self._seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM server_words;").fetchone()[0]
+        self.requests = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def handle(self, endpoint: str, payload: bytes) -> bytes:
+        """endpoint（'push' / 'pull'）の要求を処理して応答を返す"""
+        handler = {"push": self._push, "pull": self._pull}.get(endpoint)
+        if handler is None:
+            raise ValueError(f"unknown endpoint: {endpoint}")
+        with self._lock:
+            self.requests += 1
+            self.bytes_in += len(payload)
+            try:
+                response = handler(decode_payload(payload))
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            body = encode_payload(response)
+            self.bytes_out += len(body)
+            return body
+
+    def word_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM server_words WHERE deleted = 0;").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # --- 要求の処理 ---
+
+    def _next_seq(self) -> int:
+        self._seq += 1
+        return self._seq
+
+    def _push(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        client_id = data.get("client_id")
+        results = []
+        for item in data.get("items", []):
+            cloud_id = item.get("cloud_id")
+            if cloud_id is None:
+                # 同じ要求の再送なら、前回振った cloud_id を返す（二重に登録しない）
+                row = self._conn.execute(
+                    "SELECT cloud_id FROM server_words WHERE origin_client = ? AND origin_local_id = ?;",
+                    (client_id, item["local_id"])).fetchone()
+                cloud_id = row[0] if row else None
+            if item.get("deleted"):
+                if cloud_id is not None:
+                    self._conn.execute(
+                        "UPDATE server_words SET deleted = 1, last_edited = ?, seq = ? "
+                        "WHERE cloud_id = ? AND deleted = 0;",
+                        (item.get("last_edited") or time.time(), self._next_seq(), cloud_id))
+                results.append({"local_id": item["local_id"], "cloud_id": cloud_id})
+                continue
+
+            item_hash = content_hash(item)
+            values = (item["word_name"], item.get("explain"), item.get("tag"), item.get("category"),
+                      item.get("yomi"), item.get("is_shared", 0), item.get("last_edited"), item_hash)
+            current = None
+            if cloud_id is not None:
+                current = self._conn.execute(
+                    "SELECT hash, deleted FROM server_words WHERE cloud_id = ?;", (cloud_id,)).fetchone()
+            if current is None:
+                cur = self._conn.execute(
+                    "INSERT INTO server_words (word_name, explain, tag, category, yomi, is_shared, last_edited, "
+                    "hash, seq, origin_client, origin_local_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);",
+                    values + (self._next_seq(), client_id, item["local_id"]))
+                cloud_id = cur.lastrowid
+            elif current != (item_hash, 0):
+                # 内容が同じなら seq を進めない（他の端末に配り直さない）
+                self._conn.execute(
+                    "UPDATE server_words SET word_name = ?, explain = ?, tag = ?, category = ?, yomi = ?, "
+                    "is_shared = ?, last_edited = ?, hash = ?, deleted = 0, seq = ? WHERE cloud_id = ?;",
+                    values + (self._next_seq(), cloud_id))
+            results.append({"local_id": item["local_id"], "cloud_id": cloud_id})
+        return {"results": results}
+
+    def _pull(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        since = int(data.get("since", 0))
+        limit = max(1, int(data.get("limit", 200)))
+        rows = self._conn.execute(
+            f"SELECT {', '.join(ITEM_COLUMNS)}, seq FROM server_words WHERE seq > ? ORDER BY seq LIMIT ?;",
+            (since, limit + 1)).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        items = [dict(zip(ITEM_COLUMNS, row)) for row in rows]
+        return {"items": items, "next": rows[-1][-1] if rows else since, "more": more}
+
+
+def serve_http(server: LocalSyncServer, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """LocalSyncServer を HTTP で公開する（POST /push, POST /pull）"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                body = server.handle(self.path.strip("/"), self.rfile.read(length))
+            except ValueError as e:
+                self.send_error(404, str(e))
+                return
+            except Exception as e:
+                logger.exception("同期要求の処理エラー")
+                self.send_error(500, str(e))
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(format, *args)
+
+    return ThreadingHTTPServer((host, port), Handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ローカル同期サーバー")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--db", default=":memory:")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    httpd = serve_http(LocalSyncServer(args.db), args.host, args.port)
+    print(f"sync server: http://{args.host}:{args.port}/ (db={args.db})")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Model/term.py
+from typing import Any, Dict, Mapping, Optional
+
+# terms テーブルの列のうち、アプリ内で扱うもの（DB から読むときの SELECT 順）
+TERM_COLUMNS = ("question_id", "word_cloud_id", "word_name", "explain", "tag", "category", "yomi")
+
+
+class Term:
+    """用語 1 件を表す不変オブジェクト。
+
+    モデル・コントローラ・ビューの間ではこの型で受け渡す（dict のキー名の揺れを無くす）。
+    __slots__ なのでインスタンスごとの __dict__ を持たず、大量にキャッシュしても軽い。
+    一覧表示用に名前だけを持つ形（name_only）も作れる。
+    """
+
+    __slots__ = TERM_COLUMNS + ("is_name_only",)
+
+    def __init__(self, word_name: str, question_id: Optional[int] = None, explain: Optional[str] = None,
+                 tag: Optional[str] = None, category: Optional[str] = None, yomi: Optional[str] = None,
+                 word_cloud_id: Optional[str] = None, is_name_only: bool = False):
+        set_ = object.__setattr__
+        set_(self, "question_id", question_id)
+        set_(self, "word_cloud_id", word_cloud_id)
+        set_(self, "word_name", word_name)
+        set_(self, "explain", explain)
+        set_(self, "tag", tag)
+        set_(self, "category", category)
+        set_(self, "yomi", yomi)
+        set_(self, "is_name_only", is_name_only)
+
+    @classmethod
+    def from_row(cls, row: Mapping) -> "Term":
+        """TERM_COLUMNS のキーを持つ行（sqlite3.Row / dict）から作る"""
+        keys = row.keys()
+        return cls(**{col: row[col] for col in TERM_COLUMNS if col in keys})
+
+    @classmethod
+    def from_tuple(cls, values) -> "Term":
+        """TERM_COLUMNS の順に並んだタプルから作る"""
+        question_id, word_cloud_id, word_name, explain, tag, category, yomi = values
+        return cls(word_name, question_id, explain, tag, category, yomi, word_cloud_id)
+
+    @classmethod
+    def name_only(cls, word_name: str, question_id: Optional[int] = None) -> "Term":
+        """一覧表示用の、名前（と ID）だけを持つ Term"""
+        return cls(word_name, question_id, is_name_only=True)
+
+    def replace(self, **changes) -> "Term":
+        """一部の値を差し替えた新しい Term を返す"""
+        values = {col: getattr(self, col) for col in TERM_COLUMNS}
+        values.update(changes)
+        return Term(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {col: getattr(self, col) for col in TERM_COLUMNS}
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Term は変更できません（replace() を使ってください）")
+
+    def __delattr__(self, name):
+        raise AttributeError("Term は変更できません")
+
+    def _key(self):
+        return tuple(getattr(self, col) for col in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Term):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"Term(question_id={self.question_id!r}, word_name={self.word_name!r})"
@@ -0,0 +1,181 @@
+# Model/term_repository.py
+import bisect
+import sqlite3
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+
+from Model.BaseModel import BaseModel
+from Model.change_events import ChangeBus, TermChangeEvent, INSERT, DELETE, RELOAD
+from Model.term import Term, TERM_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+# 詳細レコードを保持する件数の既定値
+DEFAULT_MAX_DETAILS = 1024
+
+DETAIL_COLUMNS = ", ".join(TERM_COLUMNS)
+
+
+def fetch_term_row(conn: sqlite3.Connection, question_id: int) -> Optional[Term]:
+    """書き込み中のトランザクション内で 1 行を読む（変更通知に載せる行の取得用）"""
+    row = conn.execute(f"SELECT {DETAIL_COLUMNS} FROM terms WHERE question_id = ?;", (question_id,)).fetchone()
+    return Term.from_tuple(row) if row else None
+
+
+class TermRepository(BaseModel):
+    """各モデルで共有する用語キャッシュ。
+
+    - 詳細レコード（question_id / word_name の両方で引ける LRU）
+    - 並び替え済みの用語名一覧
+    を保持する。書き込みを行うモデルは events（ChangeBus）に TermChangeEvent を流し、
+    リポジトリはそれを購読してキャッシュを差分で更新する（名前一覧は bisect で 1 件だけ出し入れした写しに差し替える）。
+    レコードは不変の Term なので、キャッシュしたものをそのまま返す。
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_details: int = DEFAULT_MAX_DETAILS,
+                 events: Optional[ChangeBus] = None):
+        super().__init__(db_path=db_path)
+        self.max_details = max_details
+        self._lock = threading.RLock()
+        self._details: "OrderedDict[int, Term]" = OrderedDict()
+        self._ids_by_name: Dict[str, int] = {}
+        self._names: Optional[List[str]] = None
+        # get_names で渡したあとなら、書き換える前に複製する（渡していなければその場で書き換える）
+        self._names_shared = False
+        self.hits = 0
+        self.misses = 0
+        self.events = events if events is not None else ChangeBus()
+        self.events.subscribe(self._apply_event)
+
+    # --- 読み出し ---
+
+    def get_by_id(self, question_id: int) -> Optional[Term]:
+        with self._lock:
+            record = self._details.get(question_id)
+            if record is not None:
+                self._details.move_to_end(question_id)
+                self.hits += 1
+                return record
+            self.misses += 1
+        return self._load("question_id = ?", (question_id,))
+
+    def get_by_name(self, word_name: str) -> Optional[Term]:
+        with self._lock:
+            question_id = self._ids_by_name.get(word_name)
+            if question_id is not None:
+                record = self._details[question_id]
+                self._details.move_to_end(question_id)
+                self.hits += 1
+                return record
+            self.misses += 1
+        return self._load("word_name = ?", (word_name,))
+
+    def get_names(self, force_refresh: bool = False) -> List[str]:
+        """word_name の昇順に並んだ用語名一覧（重複なし）
+
+        返す一覧は変更されない（渡したあとの変更通知では複製してから書き換える）。呼び出し側も書き換えないこと。
+        """
+        with self._lock:
+            if self._names is not None and not force_refresh:
+                self._names_shared = True
+                return self._names
+        names = self.fetch_column("SELECT DISTINCT word_name FROM terms WHERE word_name IS NOT NULL ORDER BY word_name;")
+        with self._lock:
+            self._names = names
+            self._names_shared = True
+        return names
+
+    def change_events(self, changes: Iterable) -> List[TermChangeEvent]:
+        """changefeed の terms の変更（Change）を、今の行を載せた TermChangeEvent にする
+
+        changefeed には変更前の行が無いので、old_row はキャッシュにあるときだけ載せる。
+        キャッシュに無い行の削除・更新があれば、消えた名前（変更前の名前）が分からないので RELOAD 1 件にする。
+        """
+        events = []
+        with self.get_conn() as conn:
+            for change in changes:
+                row = None if change.op == DELETE else fetch_term_row(conn, change.key)
+                with self._lock:
+                    old_row = self._details.get(change.key)
+                kind = DELETE if row is None else change.op
+                if old_row is None and kind != INSERT:
+                    return [TermChangeEvent(RELOAD)]
+                events.append(TermChangeEvent(kind, change.key, row=row, old_row=old_row))
+        return events
+
+    def _load(self, where: str, params: tuple) -> Optional[Term]:
+        with self.read_conn() as conn:
+            row = conn.execute(f"SELECT {DETAIL_COLUMNS} FROM terms WHERE {where} LIMIT 1;", params).fetchone()
+        if row is None:
+            return None
+        record = Term.from_tuple(row)
+        self._remember(record)
+        return record
+
+    def _remember(self, record: Term):
+        with self._lock:
+            question_id = record.question_id
+            self._forget(question_id)
+            self._details[question_id] = record
+            self._ids_by_name[record.word_name] = question_id
+            while len(self._details) > self.max_details:
+                _, old = self._details.popitem(last=False)
+                if self._ids_by_name.get(old.word_name) == old.question_id:
+                    del self._ids_by_name[old.word_name]
+
+    def _forget(self, question_id: int):
+        record = self._details.pop(question_id, None)
+        if record is not None and self._ids_by_name.get(record.word_name) == question_id:
+            del self._ids_by_name[record.word_name]
+
+    # --- 変更通知の反映 ---
+
+    def _apply_event(self, event: TermChangeEvent):
+        with self._lock:
+            if event.kind == RELOAD:
+                self.invalidate()
+                return
+            if event.question_id is not None:
+                self._forget(event.question_id)
+            if event.row is not None:
+                self._remember(event.row)
+
+            if self._names is None:
+                return
+            old_name = event.old_row.word_name if event.old_row else None
+            new_name = event.row.word_name if event.row else None
+            if old_name == new_name:
+                return
+            # get_names で渡した一覧は呼び出し側が反復中かもしれないので、複製してから書き換える。
+            # 複製（O(n)）は渡すたびに 1 回だけで、次に get_names されるまでの変更は bisect でその場で反映する
+            names = self._names
+            if self._names_shared:
+                names = list(names)
+                self._names_shared = False
+            if old_name is not None:
+                i = bisect.bisect_left(names, old_name)
+                if i < len(names) and names[i] == old_name:
+                    del names[i]
+            if new_name is not None:
+                i = bisect.bisect_left(names, new_name)
+                if i == len(names) or names[i] != new_name:
+                    names.insert(i, new_name)
+            self._names = names
+
+    def invalidate(self):
+        """キャッシュをすべて捨てる（外部での一括変更後など）。"""
+        with self._lock:
+            self._details.clear()
+            self._ids_by_name.clear()
+            self._names = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'details': len(self._details),
+                'names': len(self._names) if self._names is not None else 0,
+            }
@@ -1,127 +1,224 @@
 # Model/wordlist_model.py
 import logging
-from typing import List, Dict, Optional
+import sqlite3
+from typing import List, Dict, Optional, Tuple
 
 from Model.BaseModel import BaseModel  # 追加
+from Model.term import Term, TERM_COLUMNS
+from Model.term_repository import TermRepository, DETAIL_COLUMNS
+from Model.kana import ROW_KEYS
+from Model.fuzzy_search import FuzzyIndex, DEFAULT_TOP_K
+from Model.migrations import STATS_TOTAL, STATS_CATEGORY, STATS_YOMI_ROW, STATS_TAG
 
 logger = logging.getLogger(__name__)
 
-# 読み仮名マップ（各行の先頭文字群）
-YOMI_MAP = {
-    'あ': ('あ', 'い', 'う', 'え', 'お'),
-    'か': ('か', 'き', 'く', 'け', 'こ'),
-    'さ': ('さ', 'し', 'す', 'せ', 'そ'),
-    'た': ('た', 'ち', 'つ', 'て', 'と'),
-    'な': ('な', 'に', 'ぬ', 'ね', 'の'),
-    'は': ('は', 'ひ', 'ふ', 'へ', 'ほ'),
-    'ま': ('ま', 'み', 'む', 'め', 'も'),
-    'や': ('や', 'ゆ', 'よ'),
-    'ら': ('ら', 'り', 'る', 'れ', 'ろ'),
-    'わ': ('わ', 'を', 'ん'),
-}
+# 検索結果の既定の上限件数（None で無制限）
+DEFAULT_SEARCH_LIMIT = 500
+
+# trigram トークナイザが MATCH できる最短の文字数
+FTS_MIN_QUERY_LEN = 3
+
+# bm25 の列ごとの重み（word_name, yomi, explain, tag の順）
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 2.0)
 
 class WordListModel(BaseModel):
     """IT用語辞書のデータモデル（BaseModel の get_conn を利用）"""
 
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, search_limit: Optional[int] = DEFAULT_SEARCH_LIMIT,
+                 repository: Optional[TermRepository] = None):
         super().__init__(db_path=db_path)
-        self._cache_all_terms: Optional[List[str]] = None
+        # 用語名一覧と詳細は他のモデルと共有するキャッシュから引く
+        self.repository = repository if repository is not None else TermRepository(db_path=self.db_path)
+        self.search_limit = search_limit
+        self._has_fts: Optional[bool] = None
+        # 打ち間違いを許す検索の索引（最初の検索で作り、以後は変更通知で差分更新）
+        self.fuzzy_index = FuzzyIndex()
+        self.repository.events.subscribe(self.fuzzy_index.apply_event)
 
     def get_all_terms(self, force_refresh: bool = False) -> List[str]:
-        if self._cache_all_terms is not None and not force_refresh:
-            return self._cache_all_terms
-
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute("SELECT DISTINCT word_name FROM terms WHERE word_name IS NOT NULL ORDER BY word_name;")
-                rows = cur.fetchall()
-                terms = [row['word_name'] for row in rows]
-                self._cache_all_terms = terms
-                return terms
+            return self.repository.get_names(force_refresh=force_refresh)
         except Exception as e:
             logger.exception("全件取得エラー")
             return []
 
     def get_terms_by_category(self, category: str) -> List[str]:
-        if category not in YOMI_MAP:
+        if category not in ROW_KEYS:
             return []
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute(
-                    "SELECT DISTINCT word_name FROM terms WHERE category = ? AND word_name IS NOT NULL ORDER BY word_name;",
-                    (category,)
-                )
-                return [row['word_name'] for row in cur.fetchall()]
+            return self.fetch_column(
+                "SELECT DISTINCT word_name FROM terms WHERE category = ? AND word_name IS NOT NULL ORDER BY word_name;",
+                (category,)
+            )
         except Exception:
             logger.exception("カテゴリ別取得エラー")
             return []
 
     def get_terms_by_yomi(self, category: str) -> List[str]:
-        if category not in YOMI_MAP:
+        """読みの行（'あ'〜'わ' / '他'）の用語を読み順で返す（idx_terms_yomi_row の範囲読み）"""
+        if category not in ROW_KEYS:
             return []
         try:
-            placeholders = ','.join('?' * len(YOMI_MAP[category]))
-            params = tuple(YOMI_MAP[category])
-            sql = f"""
-                SELECT DISTINCT word_name, yomi
+            return self.fetch_column("""
+                SELECT DISTINCT yomi, word_name
                 FROM terms
-                WHERE SUBSTR(yomi, 1, 1) IN ({placeholders}) AND word_name IS NOT NULL
+                WHERE yomi_row = ? AND word_name IS NOT NULL
                 ORDER BY yomi, word_name;
-            """
-            with self.get_conn() as conn:
-                cur = conn.execute(sql, params)
-                return [row['word_name'] for row in cur.fetchall()]
+            """, (category,), index=1)
         except Exception:
             logger.exception("読み仮名別取得エラー")
             return []
 
-    def get_term_detail(self, word_name: str) -> Optional[Dict]:
+    def get_yomi_row_counts(self) -> Dict[str, int]:
+        """行ごとの用語数（term_stats から読む）"""
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute("""
-                    SELECT question_id, word_cloud_id, word_name, explain, tag, category, yomi
-                    FROM terms
-                    WHERE word_name = ?
-                    LIMIT 1;
-                """, (word_name,))
-                row = cur.fetchone()
-                return dict(row) if row else None
+            counts = dict(self.fetchall_tuples(
+                "SELECT key, count FROM term_stats WHERE scope = ?;", (STATS_YOMI_ROW,)
+            ))
+            return {row: counts.get(row, 0) for row in ROW_KEYS}
+        except Exception:
+            logger.exception("行別件数取得エラー")
+            return {}
+
+    def get_term_detail(self, word_name: str) -> Optional[Term]:
+        try:
+            return self.repository.get_by_name(word_name)
         except Exception:
             logger.exception("詳細取得エラー")
             return None
 
-    def search_terms(self, query: str) -> List[str]:
+    def search_terms(self, query: str, limit: Optional[int] = None) -> List[str]:
         if not query:
             return self.get_all_terms()
+        return [term.word_name for term in self.search_terms_ranked(query, limit=limit)]
+
+    def search_terms_ranked(self, query: str, limit: Optional[int] = None) -> List[Term]:
+        """word_name / yomi / explain / tag を対象に検索し、関連度順の Term を返す。
+
+        同名の用語は先頭の 1 件だけを返す。
+        """
+        return [term for term, _ in self._search(query, limit, with_snippet=False)]
+
+    def search_snippets(self, query: str, limit: Optional[int] = None) -> List[Tuple[Term, str]]:
+        """search_terms_ranked と同じ順で、(Term, 一致箇所の抜粋) を返す"""
+        return self._search(query, limit, with_snippet=True)
+
+    def _search(self, query: str, limit: Optional[int], with_snippet: bool) -> List[Tuple[Term, Optional[str]]]:
+        query = (query or "").strip()
+        if not query:
+            return []
+        if limit is None:
+            limit = self.search_limit
         try:
-            query_lower = query.lower()
-            all_terms = self.get_all_terms()
-            return [term for term in all_terms if query_lower in term.lower()]
+            if self._fts_available() and len(query) >= FTS_MIN_QUERY_LEN:
+                rows = self._search_fts(query, limit, with_snippet)
+            elif self._fts_available():
+                rows = self._search_like(query, limit, with_snippet)
+            else:
+                rows = self._search_in_memory(query, limit)
         except Exception:
             logger.exception("検索処理エラー")
             return []
 
+        seen = set()
+        results = []
+        for row in rows:
+            if isinstance(row, Term):
+                term, snippet = row, None
+            else:
+                term, snippet = Term.from_row(row), (row['snippet'] if with_snippet else None)
+            if term.word_name in seen:
+                continue
+            seen.add(term.word_name)
+            results.append((term, snippet))
+        return results
+
+    def _fts_available(self) -> bool:
+        if self._has_fts is None:
+            self._has_fts = self.exists('terms_fts')
+        return self._has_fts
+
+    def _search_fts(self, query: str, limit: Optional[int], with_snippet: bool) -> List[sqlite3.Row]:
+        # クエリ全体を 1 フレーズとして扱い、部分一致と同じ意味にする
+        phrase = '"' + query.replace('"', '""') + '"'
+        snippet = ", snippet(terms_fts, 2, '[', ']', '…', 12) AS snippet" if with_snippet else ""
+        weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+        sql = f"""
+            SELECT {', '.join('t.' + col for col in TERM_COLUMNS)}{snippet}
+            FROM terms_fts
+            JOIN terms AS t ON t.question_id = terms_fts.rowid
+            WHERE terms_fts MATCH ?
+            ORDER BY bm25(terms_fts, {weights}), t.word_name
+            LIMIT ?;
+        """
+        return self.fetchall(sql, (phrase, -1 if limit is None else limit))
+
+    def _search_like(self, query: str, limit: Optional[int], with_snippet: bool) -> List[sqlite3.Row]:
+        # trigram で引けない短いクエリは LIKE で探し、名前の一致を優先する
+        pattern = '%' + query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        snippet = ", explain AS snippet" if with_snippet else ""
+        sql = f"""
+            SELECT {DETAIL_COLUMNS}{snippet}
+            FROM terms
+            WHERE word_name LIKE :p ESCAPE '\\' OR yomi LIKE :p ESCAPE '\\'
+               OR explain LIKE :p ESCAPE '\\' OR tag LIKE :p ESCAPE '\\'
+            ORDER BY (word_name LIKE :p ESCAPE '\\') DESC, word_name
+            LIMIT :limit;
+        """
+        return self.fetchall(sql, {'p': pattern, 'limit': -1 if limit is None else limit})
+
+    def _search_in_memory(self, query: str, limit: Optional[int]) -> List[Term]:
+        # terms_fts が無い DB 向けのフォールバック（名前の部分一致のみ）
+        query_lower = query.lower()
+        matched = [Term.name_only(term) for term in self.get_all_terms() if query_lower in term.lower()]
+        return matched if limit is None else matched[:limit]
+
+    def fuzzy_search_terms(self, query: str, limit: int = DEFAULT_TOP_K) -> List[str]:
+        """word_name / yomi を、打ち間違い・全角半角・大文字小文字の違いを許して探す（近い順）"""
+        try:
+            self._ensure_fuzzy_index()
+            return [match.word_name for match in self.fuzzy_index.search(query, top_k=limit)]
+        except Exception:
+            logger.exception("あいまい検索エラー")
+            return []
+
+    def _ensure_fuzzy_index(self):
+        if self.fuzzy_index.built:
+            return
+        version = self.data_version()
+        rows = self.fetchall_tuples("SELECT question_id, word_name, yomi FROM terms WHERE word_name IS NOT NULL;")
+        self.fuzzy_index.build(rows)
+        # 読み込み中の書き込みは索引に届いていないので、次の検索で作り直す
+        if self.data_version() != version:
+            self.fuzzy_index.invalidate()
+
     def get_categories(self) -> List[str]:
-        return list(YOMI_MAP.keys())
+        return list(ROW_KEYS)
 
     def is_db_available(self) -> bool:
         return self.db_path is not None
 
-    def get_stats(self) -> Dict[str, int]:
+    def get_term_count(self) -> int:
+        """用語の異なり数（term_stats の 1 行を主キーで読む）"""
+        try:
+            return self.fetch_value("SELECT count FROM term_stats WHERE scope = ? AND key = '';",
+                                    (STATS_TOTAL,), default=0)
+        except Exception:
+            logger.exception("用語数取得エラー")
+            return 0
+
+    def get_stats(self) -> Dict:
+        """term_stats（トリガで更新される集計表）から件数を読む。デッキの大きさに関係なく一定時間"""
         try:
-            with self.get_conn() as conn:
-                cur = conn.execute("SELECT COUNT(DISTINCT word_name) as cnt FROM terms WHERE word_name IS NOT NULL;")
-                row = cur.fetchone()
-                total = row['cnt'] if row and 'cnt' in row else (row[0] if row else 0)
-
-                cur = conn.execute("""
-                    SELECT category, COUNT(DISTINCT word_name) as count
-                    FROM terms
-                    WHERE word_name IS NOT NULL AND category IS NOT NULL
-                    GROUP BY category;
-                """)
-                category_counts = {row['category']: row['count'] for row in cur.fetchall()}
-                return {'total': total, 'by_category': category_counts}
+            by_scope: Dict[str, Dict[str, int]] = {}
+            for scope, key, count in self.fetchall_tuples("SELECT scope, key, count FROM term_stats WHERE count > 0;"):
+                by_scope.setdefault(scope, {})[key] = count
+            return {
+                'total': by_scope.get(STATS_TOTAL, {}).get('', 0),
+                'by_category': by_scope.get(STATS_CATEGORY, {}),
+                'by_yomi_row': by_scope.get(STATS_YOMI_ROW, {}),
+                'by_tag': by_scope.get(STATS_TAG, {}),
+            }
         except Exception:
             logger.exception("統計取得エラー")
             return {'total': 0}
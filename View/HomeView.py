@@ -30,6 +30,6 @@ class HomeView(tk.Frame):
         view_button.pack(pady=10, ipadx=20)
 
         # 問題を解くボタン (遷移3)
-       # solve_button = ttk.Button(self, text="問題を解く", 
-       #                          command=self.controller.go_to_quiz)
-       # solve_button.pack(pady=10, ipadx=20)
\ No newline at end of file
+        solve_button = ttk.Button(self, text="問題を解く",
+                                  command=self.controller.go_to_quiz)
+        solve_button.pack(pady=10, ipadx=20)
\ No newline at end of file
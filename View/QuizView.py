@@ -0,0 +1,65 @@
+# QuizView.py
+
+import tkinter as tk
+from tkinter import ttk
+
+# 採点ボタン（表示名, SM-2 の評価 0〜5）
+GRADE_BUTTONS = (
+    ("もう一度", 1),
+    ("難しい", 3),
+    ("普通", 4),
+    ("簡単", 5),
+)
+
+class QuizView(tk.Frame):
+    def __init__(self, master, controller):
+        super().__init__(master)
+        self.controller = controller
+
+        self.question_var = tk.StringVar(value="")
+        self.answer_var = tk.StringVar(value="")
+        self.status_var = tk.StringVar(value="")
+
+        self._create_widgets()
+
+    def _create_widgets(self):
+        self.status_label = ttk.Label(self, textvariable=self.status_var, foreground='gray')
+        self.question_label = ttk.Label(self, textvariable=self.question_var, font=('Arial', 18))
+        self.answer_label = ttk.Label(self, textvariable=self.answer_var, wraplength=400)
+
+        self.revealBTN = ttk.Button(self, text="答えを見る", command=self.controller.reveal_answer)
+        self.grade_frame = ttk.Frame(self)
+        for text, grade in GRADE_BUTTONS:
+            ttk.Button(self.grade_frame, text=text,
+                       command=lambda g=grade: self.controller.grade_answer(g)).pack(side=tk.LEFT, padx=4)
+        self.goHomeBTN = ttk.Button(self, text="homeへ戻る", command=self.controller.handle_go_home)
+
+        self.status_label.pack(pady=(10, 0))
+        self.question_label.pack(pady=20)
+        self.answer_label.pack(padx=20, pady=10)
+        self.revealBTN.pack(pady=10)
+        self.goHomeBTN.pack(side=tk.BOTTOM, pady=10)
+
+    # --- Controllerから呼び出されるメソッド ---
+
+    def show_question(self, question: str):
+        """問題を表示し、答えと採点ボタンを隠す"""
+        self.question_var.set(question)
+        self.answer_var.set("")
+        self.grade_frame.pack_forget()
+        self.revealBTN.pack(pady=10)
+
+    def show_answer(self, answer: str):
+        """答えを表示し、採点ボタンに切り替える"""
+        self.answer_var.set(answer)
+        self.revealBTN.pack_forget()
+        self.grade_frame.pack(pady=10)
+
+    def show_finished(self, message: str):
+        self.question_var.set(message)
+        self.answer_var.set("")
+        self.revealBTN.pack_forget()
+        self.grade_frame.pack_forget()
+
+    def set_status(self, text: str):
+        self.status_var.set(text)
@@ -0,0 +1,139 @@
+# View/virtual_list.py
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Optional
+
+ROW_HEIGHT = 22
+ROW_PADX = 8
+NORMAL_COLOR = 'black'
+HOVER_COLOR = 'blue'
+MESSAGE_COLOR = 'gray'
+
+
+class VirtualTermList(ttk.Frame):
+    """表示中の行だけを描画する用語リスト。
+
+    Canvas 上に「ビューポートに収まる行数 + 2」（上下の端で一部だけ見える行の分）個の text アイテムだけを作り、
+    スクロールのたびに文字列と位置を差し替えて使い回す。
+    ホバーとクリックは Canvas 1 か所のバインドで受け、y 座標から行を求める。
+    描画コストは用語数ではなくビューポートの高さで決まる。
+    """
+
+    def __init__(self, master, on_select: Optional[Callable[[str], None]] = None,
+                 row_height: int = ROW_HEIGHT, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_select = on_select
+        self.row_height = row_height
+        self.items: List[str] = []
+        self.message: Optional[str] = None
+        self._offset = 0          # 先頭からのスクロール量（ピクセル）
+        self._pool: List[int] = []  # 再利用する text アイテムの ID
+        self._hover_index: Optional[int] = None
+
+        self.canvas = tk.Canvas(self, background='white', highlightthickness=0, cursor='hand2')
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.yview)
+        self.canvas.pack(side='left', fill='both', expand=True)
+        self.scrollbar.pack(side='right', fill='y')
+
+        self.canvas.bind('<Configure>', lambda e: self._redraw())
+        self.canvas.bind('<Motion>', self._on_motion)
+        self.canvas.bind('<Leave>', lambda e: self._set_hover(None))
+        self.canvas.bind('<Button-1>', self._on_click)
+        self.canvas.bind('<MouseWheel>', self._on_mousewheel)
+        self.canvas.bind('<Button-4>', lambda e: self.yview('scroll', -3, 'units'))
+        self.canvas.bind('<Button-5>', lambda e: self.yview('scroll', 3, 'units'))
+
+    # --- 公開 API ---
+
+    def set_items(self, items: List[str], message: Optional[str] = None):
+        """表示する用語を差し替える。items が空なら message を表示する。"""
+        self.items = list(items) if items else []
+        self.message = message
+        self._offset = 0
+        self._hover_index = None
+        self._redraw()
+
+    def yview(self, *args):
+        """Scrollbar からの 'moveto' / 'scroll' 要求を処理する。"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self._offset = int(float(args[1]) * self._content_height())
+        elif args[0] == 'scroll':
+            amount = int(args[1])
+            step = self._viewport_height() if args[2] == 'pages' else self.row_height
+            self._offset += amount * step
+        self._redraw()
+
+    def visible_range(self):
+        """現在描画している行の範囲 (first, last) を返す（last は含まない）。"""
+        first = self._offset // self.row_height
+        return first, min(len(self.items), first + len(self._pool))
+
+    # --- 内部処理 ---
+
+    def _viewport_height(self) -> int:
+        return max(self.canvas.winfo_height(), 1)
+
+    def _content_height(self) -> int:
+        return len(self.items) * self.row_height
+
+    def _ensure_pool(self):
+        needed = self._viewport_height() // self.row_height + 2
+        while len(self._pool) < needed:
+            self._pool.append(self.canvas.create_text(ROW_PADX, 0, anchor='nw', text='', fill=NORMAL_COLOR))
+
+    def _redraw(self):
+        self._ensure_pool()
+        viewport = self._viewport_height()
+        max_offset = max(0, self._content_height() - viewport)
+        self._offset = max(0, min(self._offset, max_offset))
+
+        if not self.items:
+            for i, item in enumerate(self._pool):
+                if i == 0:
+                    self.canvas.itemconfigure(item, text=self.message or "用語が見つかりません",
+                                              fill=MESSAGE_COLOR, state='normal')
+                    self.canvas.coords(item, ROW_PADX, 2)
+                else:
+                    self.canvas.itemconfigure(item, state='hidden')
+            self.scrollbar.set(0.0, 1.0)
+            return
+
+        first = self._offset // self.row_height
+        shift = self._offset % self.row_height
+        for i, item in enumerate(self._pool):
+            index = first + i
+            if index < len(self.items):
+                color = HOVER_COLOR if index == self._hover_index else NORMAL_COLOR
+                self.canvas.itemconfigure(item, text=self.items[index], fill=color, state='normal')
+                self.canvas.coords(item, ROW_PADX, i * self.row_height - shift + 2)
+            else:
+                self.canvas.itemconfigure(item, state='hidden')
+
+        total = self._content_height()
+        self.scrollbar.set(self._offset / total, min(1.0, (self._offset + viewport) / total))
+
+    def _index_at(self, y: int) -> Optional[int]:
+        index = (self._offset + y) // self.row_height
+        if 0 <= index < len(self.items):
+            return index
+        return None
+
+    def _set_hover(self, index: Optional[int]):
+        if index != self._hover_index:
+            self._hover_index = index
+            self._redraw()
+
+    def _on_motion(self, event):
+        self._set_hover(self._index_at(event.y))
+
+    def _on_click(self, event):
+        index = self._index_at(event.y)
+        if index is not None and self.on_select:
+            self.on_select(self.items[index])
+
+    def _on_mousewheel(self, event):
+        # Windows は 120 単位、macOS は小さい値で届く
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        self.yview('scroll', -delta * 3, 'units')
@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
 
-MAX_ROWS_PER_COLUMN = 20
+from View.virtual_list import VirtualTermList
 
 class WordListView:
     def __init__(self, root: tk.Tk, controller):
@@ -11,8 +11,9 @@ class WordListView:
         self.frame = ttk.Frame(self.root, padding=0)
         # UI要素（frame 内に作る）
         self.search_var = None
-        self.scrollable_frame = None
-        self.canvas = None
+        self.term_list = None
+        self.index_buttons = {}
+        self.stats_label = None
         # build
         self._build_ui()
         # コントローラにコールバックを設定
@@ -28,12 +29,24 @@ class WordListView:
         index_frame = ttk.Frame(self.frame, padding=8)
         index_frame.pack(fill='x')
         categories = self.controller.get_available_categories()
+        # 件数はコントローラの読み込みが済んだら update_index_counts で入る
         for category in categories:
-            btn = ttk.Button(index_frame, text=category, width=3, command=lambda c=category: self.on_category_click(c))
+            btn = ttk.Button(index_frame, text=self._index_label(category), width=5,
+                             command=lambda c=category: self.on_category_click(c))
             btn.pack(side='left', padx=2)
+            self.index_buttons[category] = btn
         all_btn = ttk.Button(index_frame, text="全て", width=4, command=self.on_show_all_click)
         all_btn.pack(side='left', padx=2)
 
+    @staticmethod
+    def _index_label(category: str, count=None) -> str:
+        return category if count is None else f"{category}\n{count}"
+
+    def update_index_counts(self, counts: dict):
+        """索引ボタンの件数表示を更新する"""
+        for category, btn in self.index_buttons.items():
+            btn.config(text=self._index_label(category, counts.get(category)))
+
     def _create_search_bar(self):
         search_frame = ttk.Frame(self.frame, padding=(8, 4))
         search_frame.pack(fill='x')
@@ -44,51 +57,23 @@ class WordListView:
         self.search_var.trace_add('write', self.on_search_change)
         clear_btn = ttk.Button(search_frame, text="クリア", command=self.on_clear_search_click)
         clear_btn.pack(side='left')
-        stats = self.controller.get_stats()
-        total = stats.get('total', 0)
-        stats_label = ttk.Label(search_frame, text=f"総用語数: {total}", foreground='gray')
-        stats_label.pack(side='right', padx=10)
-
-    def _create_list_area(self):
-        list_frame = ttk.Frame(self.frame, padding=8)
-        list_frame.pack(expand=True, fill='both')
-
-        self.canvas = tk.Canvas(list_frame, background='white')
-        v_scroll = ttk.Scrollbar(list_frame, orient='vertical', command=self.canvas.yview)
-        self.canvas.configure(yscrollcommand=v_scroll.set)
-        self.canvas.pack(side='left', fill='both', expand=True)
-        v_scroll.pack(side='right', fill='y')
+        # 総用語数はコントローラの読み込みが済んだら update_term_count で入る
+        self.stats_label = ttk.Label(search_frame, text="総用語数: -", foreground='gray')
+        self.stats_label.pack(side='right', padx=10)
 
-        self.scrollable_frame = ttk.Frame(self.canvas)
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor='nw')
+    def update_term_count(self, total: int):
+        if self.stats_label is not None:
+            self.stats_label.config(text=f"総用語数: {total}")
 
-        # 中身のサイズ変化に合わせて scrollregion を更新する
-        self.scrollable_frame.bind("<Configure>", lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")))
+    def _create_list_area(self):
+        # 表示中の行だけを描画する仮想リスト（用語数が多くても描画コストは一定）
+        self.term_list = VirtualTermList(self.frame, on_select=self.on_term_click, padding=8)
+        self.term_list.pack(expand=True, fill='both')
 
     def display_terms(self, terms: list, message: str = None):
-        
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
-        if terms:
-            for i, name in enumerate(terms):
-                row_index = i % MAX_ROWS_PER_COLUMN
-                col_index = i // MAX_ROWS_PER_COLUMN
-                lbl = ttk.Label(self.scrollable_frame, text=name, padding=(4, 2), cursor='hand2')
-                lbl.grid(row=row_index, column=col_index, sticky='w')
-                lbl.bind('<Button-1>', lambda e, term=name: self.on_term_click(term))
-                lbl.bind('<Enter>', lambda e, l=lbl: l.configure(foreground='blue'))
-                lbl.bind('<Leave>', lambda e, l=lbl: l.configure(foreground='black'))
-        else:
-            if message is None:
-                message = "用語が見つかりません"
-            ttk.Label(self.scrollable_frame, text=message, foreground='gray').grid(row=0, column=0, sticky='w')
-
-        try:
-            self.canvas.update_idletasks()
-            self.canvas.config(scrollregion=self.canvas.bbox("all"))
-            self.frame.update()
-        except Exception:
-            pass
+        if not terms and message is None:
+            message = "用語が見つかりません"
+        self.term_list.set_items(terms, message)
 
     def on_category_click(self, category: str):
         self.controller.select_category(category)
@@ -116,11 +101,11 @@ class WordListView:
             else:
                 messagebox.showwarning("警告", f"'{term}'の詳細情報が見つかりません")
 
-    def _show_detail_window(self, detail: dict):
+    def _show_detail_window(self, detail):
         win = tk.Toplevel(self.root)
-        win.title(detail.get("word_name", "詳細"))
+        win.title(detail.word_name or "詳細")
         text = tk.Text(win, width=60, height=15)
-        text.insert("1.0", str(detail))
+        text.insert("1.0", "\n".join(f"{key}: {value}" for key, value in detail.to_dict().items() if value is not None))
         text.config(state='disabled')
         text.pack(fill='both', expand=True)
 
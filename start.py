@@ -1,8 +1,14 @@
+import os
 import tkinter as tk
-#import logging
-#logging.basicConfig(level=logging.INFO)
+import logging
+from Model.query_stats import query_stats_enabled
 from Controller.AppController import AppController
 
+# ITLS_LOG_LEVEL=INFO などでログを出す（SQL 計測 ITLS_QUERY_STATS=1 のときは既定で INFO）
+_log_level = os.environ.get("ITLS_LOG_LEVEL") or ("INFO" if query_stats_enabled() else None)
+if _log_level:
+    logging.basicConfig(level=_log_level.upper(), format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
 if __name__ == "__main__":
     print("Application starting...")
     root = tk.Tk()
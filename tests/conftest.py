@@ -0,0 +1,78 @@
+# tests/conftest.py
+import os
+import sqlite3
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from Model import BaseModel as base_model  # noqa: E402
+
+# 初版の word_master.db と同じスキーマ（マイグレーション適用前）
+BASE_SCHEMA = """
+CREATE TABLE "terms" (
+    "question_id" INTEGER, "word_cloud_id" TEXT, "word_name" TEXT NOT NULL,
+    "explain" TEXT, "tag" TEXT, "category" TEXT, "yomi" TEXT,
+    PRIMARY KEY("question_id" AUTOINCREMENT)
+);
+CREATE TABLE words (
+    word_id INTEGER PRIMARY KEY, creator_id INTEGER, cloud_id INTEGER,
+    word_name TEXT NOT NULL, is_shared INTEGER NOT NULL DEFAULT 0,
+    sync_choice INTEGER NOT NULL DEFAULT 1, last_edited REAL NOT NULL, status TEXT NOT NULL,
+    FOREIGN KEY(word_name) REFERENCES "terms"(word_name)
+);
+CREATE TABLE answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, quiz_cloud_id TEXT, retry_checkflag INTEGER,
+    total_questions INTEGER, answered_at REAL NOT NULL
+);
+CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+SAMPLE_TERMS = [
+    ("API", "アプリケーション同士をつなぐ窓口", "基礎", "あ", "えーぴーあい"),
+    ("CPU", "中央処理装置", "ハード", "し", "しーぴーゆー"),
+    ("DNS", "名前解決の仕組み", "ネットワーク", "て", "でぃーえぬえす"),
+    ("SQL", "データベースの問い合わせ言語", "データベース", "え", "えすきゅーえる"),
+    ("TCP", "信頼性のある通信プロトコル", "ネットワーク", "て", "てぃーしーぴー"),
+]
+
+
+def create_base_db(path: str, terms=SAMPLE_TERMS) -> str:
+    """初版のスキーマで DB を作り、terms と、それを参照する words を入れる"""
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(BASE_SCHEMA)
+        conn.executemany(
+            "INSERT INTO terms (word_name, explain, tag, category, yomi) VALUES (?, ?, ?, ?, ?)", terms)
+        conn.executemany(
+            "INSERT INTO words (word_name, last_edited, status) VALUES (?, 2460000.5, 'synced')",
+            [(term[0],) for term in terms])
+        conn.commit()
+    finally:
+        conn.close()
+    return path
+
+
+@pytest.fixture
+def base_db(tmp_path):
+    """マイグレーション前の DB ファイルのパス"""
+    return create_base_db(str(tmp_path / "word_master.db"))
+
+
+@pytest.fixture
+def make_db(tmp_path):
+    """名前ごとに別の DB ファイルを作る（同期の複数クライアント用）"""
+    return lambda name: create_base_db(str(tmp_path / f"{name}.db"))
+
+
+@pytest.fixture(autouse=True)
+def _close_connections(monkeypatch):
+    # 環境変数による計測・レプリカは各テストで明示的に有効にする
+    monkeypatch.delenv("ITLS_QUERY_STATS", raising=False)
+    monkeypatch.delenv("ITLS_MEMORY_REPLICA", raising=False)
+    yield
+    base_model.close_all_connections()
+    base_model._managers.clear()
@@ -0,0 +1,135 @@
+# tests/test_answer_log.py
+import json
+import sqlite3
+
+import pytest
+
+from Model.answer_log import AnswerLogger, AnswerRecord
+
+
+def _answers(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT quiz_cloud_id FROM answers ORDER BY id;")]
+    finally:
+        conn.close()
+
+
+def _write_journal(path, records):
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+
+def _lock_once(monkeypatch):
+    """起動時の復旧だけ「DB がロック中」で失敗させる"""
+    original = AnswerLogger._committed_seq
+    calls = []
+
+    def committed_seq(self):
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return original(self)
+
+    monkeypatch.setattr(AnswerLogger, "_committed_seq", committed_seq)
+
+
+@pytest.fixture
+def journal(base_db):
+    path = base_db + ".answers.journal"
+    _write_journal(path, [AnswerRecord(seq, f"q{seq}", 0, 10, 1000.0 + seq) for seq in (1, 2, 3)])
+    return path
+
+
+def test_recovery_replays_journal(base_db, journal):
+    logger = AnswerLogger(db_path=base_db, flush_interval=60)
+    logger.shutdown()
+    assert logger.recovered == 3
+    assert _answers(base_db) == ["q1", "q2", "q3"]
+
+
+def test_failed_recovery_keeps_records_until_written(base_db, journal, monkeypatch):
+    _lock_once(monkeypatch)
+    logger = AnswerLogger(db_path=base_db, flush_interval=60)
+    assert logger.recovered == 0
+    assert logger.pending() == 3
+
+    assert logger.log("q4", False, 10) == 4
+    assert logger.flush() == 4
+    logger.shutdown()
+    assert _answers(base_db) == ["q1", "q2", "q3", "q4"]
+
+    # 全行を書き出した後なので、再起動しても二重に入らない
+    AnswerLogger(db_path=base_db, flush_interval=60).shutdown()
+    assert _answers(base_db) == ["q1", "q2", "q3", "q4"]
+
+
+def test_failed_recovery_survives_another_crash(base_db, journal, monkeypatch):
+    _lock_once(monkeypatch)
+    logger = AnswerLogger(db_path=base_db, flush_interval=60)
+    logger.log("q4", False, 10)
+    # 書き出す前に異常終了した（スレッドだけ止めてジャーナルは残す）
+    logger._stop.set()
+    logger._wakeup.set()
+    logger._thread.join()
+    logger._journal.close()
+
+    restarted = AnswerLogger(db_path=base_db, flush_interval=60)
+    restarted.shutdown()
+    assert restarted.recovered == 4
+    assert _answers(base_db) == ["q1", "q2", "q3", "q4"]
+
+
+def test_queued_records_already_committed_are_not_duplicated(base_db, journal, monkeypatch):
+    AnswerLogger(db_path=base_db, flush_interval=60).shutdown()
+    # 復旧は済んだが、ジャーナルを空にする前に落ちた
+    _write_journal(journal, [AnswerRecord(seq, f"q{seq}", 0, 10, 1000.0 + seq) for seq in (1, 2, 3)])
+    _lock_once(monkeypatch)
+    logger = AnswerLogger(db_path=base_db, flush_interval=60)
+    logger.shutdown()
+    assert _answers(base_db) == ["q1", "q2", "q3"]
+
+
+def test_failed_recovery_with_empty_journal_does_not_reuse_seqs(base_db, monkeypatch):
+    first = AnswerLogger(db_path=base_db, flush_interval=60)
+    for name in ("q1", "q2", "q3"):
+        first.log(name, False, 10)
+    first.shutdown()
+
+    _lock_once(monkeypatch)
+    logger = AnswerLogger(db_path=base_db, flush_interval=60)
+    logger.log("q4", False, 10)
+    logger.log("q5", False, 10)
+    logger.shutdown()
+    assert _answers(base_db) == ["q1", "q2", "q3", "q4", "q5"]
+
+    # 振り直した番号の後ろから続く（次の起動で二重にも入らない）
+    restarted = AnswerLogger(db_path=base_db, flush_interval=60)
+    assert restarted.log("q6", False, 10) == 6
+    restarted.shutdown()
+    assert _answers(base_db) == ["q1", "q2", "q3", "q4", "q5", "q6"]
+
+
+def test_renumbered_records_survive_a_crash(base_db, monkeypatch):
+    first = AnswerLogger(db_path=base_db, flush_interval=60)
+    first.log("q1", False, 10)
+    first.shutdown()
+
+    _lock_once(monkeypatch)
+    logger = AnswerLogger(db_path=base_db, flush_interval=60)
+    logger.log("q2", False, 10)
+    monkeypatch.setattr(AnswerLogger, "_write", lambda self, batch: (_ for _ in ()).throw(
+        sqlite3.OperationalError("database is locked")))
+    assert logger.flush() == 0
+    # 書き出せないまま異常終了した
+    logger._stop.set()
+    logger._wakeup.set()
+    logger._thread.join()
+    logger._journal.close()
+    monkeypatch.undo()
+
+    restarted = AnswerLogger(db_path=base_db, flush_interval=60)
+    restarted.shutdown()
+    assert restarted.recovered == 1
+    assert _answers(base_db) == ["q1", "q2"]
@@ -0,0 +1,75 @@
+# tests/test_app_controller.py
+import sqlite3
+
+import pytest
+
+from Controller.AppController import AppController
+from Model.change_events import INSERT, UPDATE
+
+
+class FakeRoot:
+    """Tk を使わずに AppController を作るための最小限の root"""
+
+    def geometry(self, *args):
+        pass
+
+    def protocol(self, *args):
+        pass
+
+    def after(self, ms, callback):
+        return "after#0"
+
+    def after_cancel(self, after_id):
+        pass
+
+
+@pytest.fixture
+def app(base_db, monkeypatch):
+    monkeypatch.setattr(AppController, "switch_view", lambda self, name: None)
+    controller = AppController(FakeRoot(), db_path=base_db)
+    yield controller
+    controller.async_bridge.shutdown()
+
+
+def test_external_changes_interleaved_with_own_writes_are_published(app, base_db):
+    received = []
+    app.subscribe(received.append)
+    wordbook = app._get_wordbook_model()
+    repository = app._get_term_repository()
+    assert "HTTP" not in repository.get_names()
+    app.check_external_changes()
+
+    # 同じ確認間隔に、このプロセスの書き込みと他プロセスの書き込みがある
+    question_id = repository.get_by_name("CPU").question_id
+    assert wordbook.update_term(question_id, explain="演算装置")
+    conn = sqlite3.connect(base_db)
+    conn.execute("INSERT INTO terms (word_name, explain) VALUES ('HTTP', 'Web の通信規約');")
+    conn.commit()
+    conn.close()
+    app.check_external_changes()
+
+    kinds = [(event.kind, event.word_name) for event in received]
+    # このプロセスの更新は 1 回だけ（changefeed から配り直さない）、他プロセスの追加は届く
+    assert kinds == [(UPDATE, "CPU"), (INSERT, "HTTP")]
+    assert "HTTP" in repository.get_names()
+
+
+def test_idle_poll_publishes_nothing(app):
+    received = []
+    app.subscribe(received.append)
+    app._get_term_repository().get_names()
+    app.check_external_changes()
+    app.check_external_changes()
+    assert received == []
+
+
+def test_shutdown_stops_the_prefetch_thread(app):
+    app.root.destroy = lambda: None
+    prefetch = app._get_wordbook_model().prefetch
+    prefetch.refill_margin = prefetch.radius = 2
+    first = app._get_wordbook_model().fetch_value("SELECT MIN(question_id) FROM terms;")
+    assert prefetch.neighbor(first, 1) is not None
+    assert prefetch._executor is not None
+
+    app.shutdown()
+    assert prefetch._executor is None
@@ -0,0 +1,38 @@
+# tests/test_bulk_import.py
+import sqlite3
+
+import pytest
+
+from Model.bulk_import import BulkImporter, normalize_category
+from Model.kana import ROW_KEYS
+
+
+@pytest.mark.parametrize("category, yomi, expected", [
+    ("か", None, "か"),
+    ("ギ", None, "か"),
+    ("ﾀ", None, "た"),
+    ("データベース", "でーたべーす", "た"),
+    ("ネットワーク", "ネットワーク", "な"),
+    ("データベース", None, None),
+    ("X", "えっくす", "あ"),
+    (None, "さーばー", "さ"),
+    ("", "API", None),
+])
+def test_normalize_category(category, yomi, expected):
+    assert normalize_category(category, yomi) == expected
+
+
+def test_imported_categories_are_kana_rows(base_db):
+    records = [
+        {"word_name": "NoSQL", "explain": "表形式でないデータベース", "category": "データベース", "yomi": "のーえすきゅーえる"},
+        {"word_name": "HTTP", "explain": "Web の通信規約", "category": "ネットワーク", "yomi": "エイチティーティーピー"},
+        {"word_name": "RAM", "explain": "主記憶", "category": "ら", "yomi": "らむ"},
+    ]
+    progress = BulkImporter(db_path=base_db).import_records(iter(records))
+    assert progress.inserted == 3
+
+    conn = sqlite3.connect(base_db)
+    rows = dict(conn.execute("SELECT word_name, category FROM terms WHERE word_name IN ('NoSQL', 'HTTP', 'RAM');"))
+    conn.close()
+    assert rows == {"NoSQL": "な", "HTTP": "あ", "RAM": "ら"}
+    assert set(rows.values()) <= set(ROW_KEYS)
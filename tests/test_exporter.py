@@ -0,0 +1,96 @@
+# tests/test_exporter.py
+import json
+import sqlite3
+
+import pytest
+
+from Model.exporter import TermExporter
+
+
+def _names(path):
+    with open(path, encoding="utf-8") as f:
+        return sorted(json.loads(line)["word_name"] for line in f)
+
+
+def _write(path, *statements):
+    conn = sqlite3.connect(path)
+    try:
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def test_incremental_export_follows_commit_order(base_db, tmp_path):
+    exporter = TermExporter(db_path=base_db)
+    first = exporter.export_incremental(str(tmp_path / "1.jsonl"))
+    assert first.rows == 5
+
+    nothing = exporter.export_incremental(str(tmp_path / "2.jsonl"))
+    assert nothing.rows == 0
+
+    # 前回の書き出しより古い updated_at を持つ変更が後からコミットされても拾う
+    _write(base_db,
+           "UPDATE terms SET explain = '遅れてコミット', updated_at = 0 WHERE word_name = 'DNS';",
+           "INSERT INTO terms (word_name, explain) VALUES ('HTTP', 'Web の通信規約');")
+    delta = exporter.export_incremental(str(tmp_path / "3.jsonl"))
+    assert _names(tmp_path / "3.jsonl") == ["DNS", "HTTP"]
+    assert delta.rows == 2
+    assert exporter.export_incremental(str(tmp_path / "4.jsonl")).rows == 0
+
+
+def test_incremental_exports_keep_separate_cursors(base_db, tmp_path):
+    exporter = TermExporter(db_path=base_db)
+    exporter.export_incremental(str(tmp_path / "a.jsonl"), name="a")
+    _write(base_db, "UPDATE terms SET explain = '更新' WHERE word_name = 'API';")
+    exporter.export_incremental(str(tmp_path / "b.jsonl"), name="b")
+    _write(base_db, "UPDATE terms SET explain = '更新' WHERE word_name = 'CPU';")
+
+    assert _names(tmp_path / "b.jsonl") == ["API", "CPU", "DNS", "SQL", "TCP"]
+    exporter.export_incremental(str(tmp_path / "a2.jsonl"), name="a")
+    exporter.export_incremental(str(tmp_path / "b2.jsonl"), name="b")
+    assert _names(tmp_path / "a2.jsonl") == ["API", "CPU"]
+    assert _names(tmp_path / "b2.jsonl") == ["CPU"]
+
+
+
+def test_failed_first_export_is_retried_in_full(base_db, tmp_path):
+    exporter = TermExporter(db_path=base_db)
+    with pytest.raises(OSError):
+        exporter.export_incremental(str(tmp_path / "missing" / "1.jsonl"))
+    assert exporter.get_cursor() is None
+
+    assert exporter.export_incremental(str(tmp_path / "1.jsonl")).rows == 5
+
+
+def test_failed_incremental_export_keeps_its_range(base_db, tmp_path):
+    exporter = TermExporter(db_path=base_db)
+    exporter.export_incremental(str(tmp_path / "1.jsonl"))
+    _write(base_db, "UPDATE terms SET explain = '更新' WHERE word_name = 'TCP';")
+    with pytest.raises(OSError):
+        exporter.export_incremental(str(tmp_path / "missing" / "2.jsonl"))
+
+    exporter.export_incremental(str(tmp_path / "2.jsonl"))
+    assert _names(tmp_path / "2.jsonl") == ["TCP"]
+
+
+def test_forget_incremental_releases_the_changefeed(base_db, tmp_path):
+    exporter = TermExporter(db_path=base_db)
+    exporter.export_incremental(str(tmp_path / "1.jsonl"), name="old")
+    _write(base_db, "UPDATE terms SET explain = '更新';")
+    assert _feed_rows(base_db) == 5
+
+    assert exporter.forget_incremental("old")
+    assert not exporter.forget_incremental("old")
+    assert _feed_rows(base_db) == 0
+    assert exporter.get_cursor("old") is None
+    assert exporter.export_incremental(str(tmp_path / "2.jsonl"), name="old").rows == 5
+
+
+def _feed_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM changefeed WHERE table_name = 'terms';").fetchone()[0]
+    finally:
+        conn.close()
@@ -0,0 +1,98 @@
+# tests/test_memory_replica.py
+import sqlite3
+
+import pytest
+
+from Model.BaseModel import get_connection_manager
+from Model.WordbookModel import WordbookModel
+from Model.sync_engine import LocalTransport, SyncEngine
+from Model.sync_server import LocalSyncServer
+
+# トリガが julianday('now') を書く列を含むテーブル
+COMPARED = {
+    "terms": "SELECT * FROM terms ORDER BY question_id",
+    "words": "SELECT * FROM words ORDER BY word_id",
+    "changefeed": "SELECT * FROM changefeed ORDER BY seq",
+    "term_stats": "SELECT * FROM term_stats ORDER BY scope, key",
+}
+
+
+@pytest.fixture
+def replica_db(base_db, monkeypatch):
+    monkeypatch.setenv("ITLS_MEMORY_REPLICA", "1")
+    return base_db
+
+
+def _file_rows(path, sql):
+    conn = sqlite3.connect(path)
+    try:
+        return [tuple(row) for row in conn.execute(sql)]
+    finally:
+        conn.close()
+
+
+def _assert_same_as_file(model):
+    for table, sql in COMPARED.items():
+        assert [tuple(row) for row in model.fetchall_tuples(sql)] == _file_rows(model.db_path, sql), table
+
+
+def test_replica_matches_file_after_trigger_writes(replica_db):
+    model = WordbookModel(db_path=replica_db)
+    engine = SyncEngine(LocalTransport(LocalSyncServer()), db_path=replica_db)
+    assert model.fetch_value("SELECT COUNT(*) FROM terms;") == 5
+    assert get_connection_manager(replica_db).replica.active
+
+    question_id = model.fetch_value("SELECT question_id FROM terms WHERE word_name = 'API';")
+    engine.mark_for_upload("API")
+    assert model.update_term(question_id, explain="更新した説明")
+    _assert_same_as_file(model)
+
+    result = engine.push()
+    assert result.complete and result.pushed >= 1
+    _assert_same_as_file(model)
+    assert model.fetch_value("SELECT status FROM words WHERE word_name = 'API';") == "synced"
+
+
+def test_own_commits_are_applied_without_reload(replica_db):
+    model = WordbookModel(db_path=replica_db)
+    replica = get_connection_manager(replica_db).replica
+    model.fetch_value("SELECT 1;")
+    loads = replica.stats()["loads"]
+
+    with model.get_conn() as conn:
+        conn.execute("UPDATE terms SET explain = 'x' WHERE word_name = 'CPU';")
+    assert model.fetch_value("SELECT explain FROM terms WHERE word_name = 'CPU';") == "x"
+    question_id = model.fetch_value("SELECT question_id FROM terms WHERE word_name = 'DNS';")
+    with model.get_conn() as conn:
+        conn.execute("DELETE FROM words WHERE word_name = 'DNS';")
+    assert model.delete_term(question_id)
+    with model.get_conn() as conn:
+        conn.execute("INSERT INTO terms (word_name, yomi, explain, tag) VALUES ('HTTP', 'えいち', '転送の規約', 'net');")
+    _assert_same_as_file(model)
+
+    stats = replica.stats()
+    assert stats["loads"] == loads
+    assert stats["applied"] == 4
+    # terms_fts はレプリカのトリガで追従する
+    search = "SELECT rowid FROM terms_fts WHERE terms_fts MATCH ? ORDER BY rowid"
+    for query in ("転送の規約", "x", "DNS"):
+        assert model.fetchall_tuples(search, (query,)) == _file_rows(model.db_path, search.replace("?", repr(query)))
+
+
+def test_other_connection_commit_reloads(replica_db):
+    model = WordbookModel(db_path=replica_db)
+    replica = get_connection_manager(replica_db).replica
+    model.fetch_value("SELECT 1;")
+    loads = replica.stats()["loads"]
+
+    other = sqlite3.connect(replica_db)
+    other.execute("UPDATE terms SET explain = 'other' WHERE word_name = 'SQL';")
+    other.commit()
+    other.close()
+    # 他の接続のコミットの後に自分の書き込みがあっても、変更行だけでは足りないので全体を写し直す
+    with model.get_conn() as conn:
+        conn.execute("UPDATE terms SET explain = 'own' WHERE word_name = 'TCP';")
+    assert model.fetch_value("SELECT explain FROM terms WHERE word_name = 'SQL';") == "other"
+    assert model.fetch_value("SELECT explain FROM terms WHERE word_name = 'TCP';") == "own"
+    assert replica.stats()["loads"] == loads + 1
+    _assert_same_as_file(model)
@@ -0,0 +1,93 @@
+# tests/test_migrations.py
+import sqlite3
+
+from Model.migrations import (MIGRATIONS, find_duplicate_word_names, get_schema_version,
+                              rename_duplicate_word_names, run_migrations)
+
+LATEST = max(m.version for m in MIGRATIONS)
+V1 = [m for m in MIGRATIONS if m.version == 1]
+
+
+def _connect(path):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def _index_is_unique(conn, name):
+    return any(row[1] == name and row[2] for row in conn.execute("PRAGMA index_list(terms);"))
+
+
+def test_fresh_db_migrates_to_latest(base_db):
+    conn = _connect(base_db)
+    assert run_migrations(conn) == LATEST
+    assert get_schema_version(conn) == LATEST
+    assert _index_is_unique(conn, "idx_terms_word_name")
+    assert conn.execute("PRAGMA foreign_key_check;").fetchall() == []
+    conn.close()
+
+
+def test_upgrade_from_v1_makes_word_name_unique(base_db):
+    conn = _connect(base_db)
+    assert run_migrations(conn, V1) == 1
+    assert not _index_is_unique(conn, "idx_terms_word_name")
+
+    assert run_migrations(conn) == LATEST
+    assert _index_is_unique(conn, "idx_terms_word_name")
+    # 親キーが UNIQUE でないと "foreign key mismatch" になる
+    conn.execute("DELETE FROM words WHERE word_name IN ('API', 'CPU');")
+    conn.execute("DELETE FROM terms WHERE word_name = 'API';")
+    conn.execute("UPDATE terms SET word_name = 'GPU' WHERE word_name = 'CPU';")
+    conn.commit()
+    assert conn.execute("SELECT COUNT(*) FROM terms;").fetchone()[0] == 4
+    conn.close()
+
+
+def test_upgrade_is_incremental(base_db):
+    conn = _connect(base_db)
+    for migration in sorted(MIGRATIONS, key=lambda m: m.version):
+        assert run_migrations(conn, [m for m in MIGRATIONS if m.version <= migration.version]) == migration.version
+    assert run_migrations(conn) == LATEST
+    conn.close()
+
+
+def _add_duplicate_api(conn):
+    conn.execute("INSERT INTO terms (word_name, explain) VALUES ('API', '重複');")
+    conn.commit()
+    return conn.execute("SELECT MAX(question_id) FROM terms;").fetchone()[0]
+
+
+def test_duplicate_word_names_fall_back_to_plain_index(base_db, caplog):
+    conn = _connect(base_db)
+    duplicate_id = _add_duplicate_api(conn)
+
+    # migration 8 の cloud_id と同じく、UNIQUE でない索引のまま警告してバージョンは進める
+    assert run_migrations(conn) == LATEST
+    assert not _index_is_unique(conn, "idx_terms_word_name")
+    assert "API" in caplog.text
+    assert list(find_duplicate_word_names(conn).items()) == [("API", [1, duplicate_id])]
+
+    # 重複を解消すれば次回の起動で UNIQUE にする
+    conn.execute("PRAGMA foreign_keys = OFF;")
+    conn.execute("DELETE FROM terms WHERE explain = '重複';")
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys = ON;")
+    assert run_migrations(conn) == LATEST
+    assert _index_is_unique(conn, "idx_terms_word_name")
+    conn.close()
+
+
+def test_rename_duplicate_word_names_makes_word_name_unique(base_db):
+    conn = _connect(base_db)
+    duplicate_id = _add_duplicate_api(conn)
+    run_migrations(conn)
+
+    assert rename_duplicate_word_names(conn) == {f"API ({duplicate_id})": "API"}
+    assert _index_is_unique(conn, "idx_terms_word_name")
+    assert find_duplicate_word_names(conn) == {}
+    assert conn.execute("PRAGMA foreign_keys;").fetchone()[0] == 1
+    # words は残した方の API を指し、削除も外部キーで検査される
+    conn.execute("DELETE FROM terms WHERE question_id = ?;", (duplicate_id,))
+    conn.commit()
+    assert conn.execute("PRAGMA foreign_key_check;").fetchall() == []
+    conn.close()
@@ -0,0 +1,65 @@
+# tests/test_quiz_scheduler.py
+import sqlite3
+
+from Model.WordbookModel import WordbookModel
+from Model.change_events import INSERT, TermChangeEvent
+from Model.quiz_scheduler import QuizScheduler, main
+from Model.term_repository import TermRepository, fetch_term_row
+
+NOW = 1_000_000_000.0
+
+
+def _models(base_db):
+    repository = TermRepository(db_path=base_db)
+    scheduler = QuizScheduler(db_path=base_db, batch_size=2, events=repository.events, clock=lambda: NOW)
+    return repository, scheduler
+
+
+def _serve_new(scheduler):
+    """新しい用語を出題できなくなるまで出し、出した用語名を返す"""
+    names = []
+    while True:
+        card = scheduler.next_card()
+        if card is None or not card.is_new:
+            return names
+        names.append(card.term.word_name)
+        scheduler.answer(card.term.question_id, 5)
+
+
+def test_inserted_term_is_served_after_new_terms_ran_out(base_db):
+    repository, scheduler = _models(base_db)
+    assert len(_serve_new(scheduler)) == 5
+
+    with repository.get_conn() as conn:
+        cur = conn.execute("INSERT INTO terms (word_name, explain) VALUES ('HTTP', 'Web の通信規約');")
+        row = fetch_term_row(conn, cur.lastrowid)
+    repository.events.publish(TermChangeEvent(INSERT, row.question_id, row=row))
+    assert _serve_new(scheduler) == ["HTTP"]
+
+
+def test_updated_term_replaces_queued_terms(base_db):
+    repository, scheduler = _models(base_db)
+    wordbook = WordbookModel(db_path=base_db, repository=repository)
+    first = scheduler.next_card().term
+    assert first.word_name == "API"
+    # 1 問目を答えて期限順キューに入れ、2 問目は新しい用語のキューに残す
+    scheduler.answer(first.question_id, 1)
+    second = scheduler.next_card().term
+
+    assert wordbook.update_term(first.question_id, explain="更新後の説明 1")
+    assert wordbook.update_term(second.question_id, explain="更新後の説明 2")
+
+    assert scheduler.next_card().term.explain == "更新後の説明 2"
+    due = scheduler.next_card(now=NOW + 2 * 86400)
+    assert due.term.question_id == first.question_id and due.term.explain == "更新後の説明 1"
+
+
+def test_benchmark_does_not_write_to_the_source_db(base_db, capsys):
+    main(["--db", base_db, "--answers", "50"])
+    assert "問:" in capsys.readouterr().out
+    conn = sqlite3.connect(base_db)
+    try:
+        tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table';")}
+    finally:
+        conn.close()
+    assert "review_state" not in tables
@@ -0,0 +1,171 @@
+# tests/test_sync.py
+import sqlite3
+import time
+
+import pytest
+
+from Model.WordbookModel import WordbookModel
+from Model.sync_engine import LocalTransport, SyncEngine, SyncError, SYNCED
+from Model.sync_server import LocalSyncServer
+
+HEAD_SQL = "SELECT seq FROM sqlite_sequence WHERE name = 'changefeed';"
+
+EXTRA_TERMS = [(f"TERM{i:02d}", f"説明 {i}", None, "た", f"たーむ{i}") for i in range(15)]
+
+
+class FlakyTransport(LocalTransport):
+    """指定した (endpoint, 何回目) の要求を失敗させる。lose_response なら処理させた後で応答を失う"""
+
+    def __init__(self, server, fail=(), lose_response=False):
+        super().__init__(server)
+        self.fail = set(fail)
+        self.lose_response = lose_response
+        self.calls = []
+
+    def request(self, endpoint, payload):
+        self.calls.append(endpoint)
+        if (endpoint, self.calls.count(endpoint)) in self.fail:
+            if self.lose_response:
+                super().request(endpoint, payload)
+            raise SyncError(f"{endpoint} に失敗しました（テスト）")
+        return super().request(endpoint, payload)
+
+
+@pytest.fixture
+def server():
+    server = LocalSyncServer()
+    yield server
+    server.close()
+
+
+def _client(make_db, name, transport, batch_size=5):
+    path = make_db(name)
+    engine = SyncEngine(transport, db_path=path, batch_size=batch_size)
+    with engine.get_conn() as conn:
+        conn.executemany("INSERT INTO terms (word_name, explain, tag, category, yomi) VALUES (?, ?, ?, ?, ?);",
+                         EXTRA_TERMS)
+    return engine
+
+
+def _mark_all(engine):
+    for name in engine.fetch_column("SELECT word_name FROM terms ORDER BY question_id;"):
+        engine.mark_for_upload(name)
+
+
+def _feed_head(engine):
+    conn = sqlite3.connect(engine.db_path)
+    try:
+        return conn.execute(HEAD_SQL).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _words(engine):
+    return {row[0]: row[1:] for row in engine.fetchall_tuples(
+        "SELECT w.word_name, w.status, w.cloud_id, t.explain "
+        "FROM words AS w LEFT JOIN terms AS t ON t.word_name = w.word_name;")}
+
+
+@pytest.mark.parametrize("lose_response", [False, True])
+def test_push_resumes_after_failure(make_db, server, lose_response):
+    transport = FlakyTransport(server, fail=[("push", 3)], lose_response=lose_response)
+    engine = _client(make_db, "a", transport)
+    _mark_all(engine)
+    assert engine.pending_count() == 20
+
+    failed = engine.push()
+    assert not failed.complete and failed.error
+    assert failed.pushed == 10
+    assert engine.pending_count() == 10
+
+    resumed = engine.push()
+    assert resumed.complete
+    assert resumed.pushed == 10
+    assert engine.pending_count() == 0
+    # 応答を失った要求を再送しても、サーバーに二重に登録されない
+    assert server.word_count() == 20
+    assert len({cloud_id for _, cloud_id, _ in _words(engine).values()}) == 20
+
+
+def test_pull_resumes_after_failure(make_db, server):
+    source = _client(make_db, "source", LocalTransport(server))
+    _mark_all(source)
+    assert source.push().pushed == 20
+
+    transport = FlakyTransport(server, fail=[("pull", 3)])
+    engine = _client(make_db, "a", transport)
+    failed = engine.pull()
+    assert not failed.complete
+    assert failed.pulled == 10
+    watermark = engine.watermark()
+    assert watermark > 0
+
+    resumed = engine.pull()
+    assert resumed.complete
+    assert resumed.pulled == 10
+    assert engine.watermark() > watermark
+    words = _words(engine)
+    assert all(status == SYNCED and cloud_id is not None for status, cloud_id, _ in words.values())
+    assert len(words) == 20
+
+
+def test_conflict_keeps_newer_local_edit(make_db, server):
+    a = _client(make_db, "a", LocalTransport(server))
+    b = _client(make_db, "b", LocalTransport(server))
+    a.mark_for_upload("API")
+    assert a.sync().complete
+    assert b.pull().pulled == 1
+
+    b_book = WordbookModel(db_path=b.db_path)
+    question_id = b.fetch_value("SELECT question_id FROM terms WHERE word_name = 'API';")
+    b_book.update_term(question_id, explain="B の編集")
+    assert b.push().pushed == 1
+
+    time.sleep(0.01)
+    a_book = WordbookModel(db_path=a.db_path)
+    question_id = a.fetch_value("SELECT question_id FROM terms WHERE word_name = 'API';")
+    a_book.update_term(question_id, explain="A の新しい編集")
+    pulled = a.pull()
+    assert pulled.conflicts == 1
+    assert _words(a)["API"][2] == "A の新しい編集"
+
+    # ローカルの編集が送られ、B にも届く
+    assert a.push().pushed == 1
+    b.pull()
+    assert _words(b)["API"][2] == "A の新しい編集"
+
+
+def test_delete_propagates_to_other_clients(make_db, server):
+    a = _client(make_db, "a", LocalTransport(server))
+    b = _client(make_db, "b", LocalTransport(server))
+    a.mark_for_upload("API")
+    a.mark_for_upload("CPU")
+    a.sync()
+    b.pull()
+    assert {"API", "CPU"} <= {name for name, (_, cloud_id, _) in _words(b).items() if cloud_id is not None}
+
+    assert a.mark_for_delete("API")
+    result = a.push()
+    assert (result.pushed, result.deleted) == (1, 1)
+    assert "API" not in _words(a)
+    assert server.word_count() == 1
+
+    assert b.pull().pulled == 1
+    assert "API" not in _words(b)
+    assert "CPU" in _words(b)
+
+
+def test_idle_sync_sends_nothing(make_db, server):
+    transport = FlakyTransport(server)
+    engine = _client(make_db, "a", transport)
+    _mark_all(engine)
+    assert engine.sync().complete
+    before = _feed_head(engine)
+    transport.calls.clear()
+
+    idle = engine.sync()
+    assert idle.complete
+    assert (idle.pushed, idle.pulled, idle.skipped, idle.conflicts) == (0, 0, 0, 0)
+    # push は要求を送らず、pull は空の応答を 1 回受け取るだけ
+    assert transport.calls == ["pull"]
+    assert _feed_head(engine) == before
@@ -0,0 +1,104 @@
+# tests/test_term_repository.py
+import sqlite3
+
+from Model.change_events import DELETE, INSERT, RELOAD, TermChangeEvent
+from Model.changefeed import Changefeed, coalesce
+from Model.term_repository import TermRepository, fetch_term_row
+
+
+def _external_write(path, *statements):
+    # 他プロセスの書き込みの代わり（リポジトリのキャッシュを通らない）
+    conn = sqlite3.connect(path)
+    try:
+        for sql in statements:
+            conn.execute(sql)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _publish_feed(repository, feed):
+    changes = feed.read_batch("test")
+    events = repository.change_events(c for c in coalesce(changes) if c.table == "terms")
+    feed.ack("test", changes[-1].seq)
+    for event in events:
+        repository.events.publish(event)
+    return events
+
+
+def _db_names(path):
+    conn = sqlite3.connect(path)
+    try:
+        return [row[0] for row in conn.execute("SELECT DISTINCT word_name FROM terms ORDER BY word_name;")]
+    finally:
+        conn.close()
+
+
+def test_external_delete_and_rename_of_uncached_terms(base_db):
+    repository = TermRepository(db_path=base_db)
+    feed = Changefeed(db_path=base_db)
+    feed.register("test")
+    assert "API" in repository.get_names()
+
+    _external_write(base_db,
+                    "DELETE FROM words WHERE word_name IN ('API', 'SQL');",
+                    "DELETE FROM terms WHERE word_name = 'API';",
+                    "UPDATE terms SET word_name = 'NoSQL' WHERE word_name = 'SQL';")
+    events = _publish_feed(repository, feed)
+
+    assert [event.kind for event in events] == [RELOAD]
+    assert repository.get_names() == _db_names(base_db)
+
+
+def test_external_changes_of_cached_terms_are_applied_in_place(base_db):
+    repository = TermRepository(db_path=base_db)
+    feed = Changefeed(db_path=base_db)
+    feed.register("test")
+    repository.get_names()
+    repository.get_by_name("CPU")
+
+    _external_write(base_db,
+                    "DELETE FROM words WHERE word_name = 'CPU';",
+                    "UPDATE terms SET word_name = 'GPU' WHERE word_name = 'CPU';",
+                    "INSERT INTO terms (word_name, explain) VALUES ('HTTP', 'Web の通信規約');")
+    events = _publish_feed(repository, feed)
+
+    assert RELOAD not in [event.kind for event in events]
+    assert repository.get_names() == _db_names(base_db)
+
+
+
+def test_get_names_is_not_changed_by_later_events(base_db):
+    repository = TermRepository(db_path=base_db)
+    names = repository.get_names()
+    before = list(names)
+
+    with repository.get_conn() as conn:
+        cur = conn.execute("INSERT INTO terms (word_name) VALUES ('AAA');")
+        row = fetch_term_row(conn, cur.lastrowid)
+    repository.events.publish(TermChangeEvent(INSERT, row.question_id, row=row))
+    repository.events.publish(TermChangeEvent(DELETE, row.question_id, old_row=row))
+    repository.events.publish(TermChangeEvent(INSERT, row.question_id, row=row))
+
+    assert names == before
+    assert repository.get_names() == ["AAA"] + before
+
+
+def test_name_list_is_copied_once_per_get_names(base_db):
+    repository = TermRepository(db_path=base_db)
+    names = repository.get_names()
+    for word_name in ("AAA", "BBB", "CCC"):
+        with repository.get_conn() as conn:
+            cur = conn.execute("INSERT INTO terms (word_name) VALUES (?);", (word_name,))
+            row = fetch_term_row(conn, cur.lastrowid)
+        repository.events.publish(TermChangeEvent(INSERT, row.question_id, row=row))
+        if word_name == "AAA":
+            copied = repository._names
+            assert copied is not names
+        else:
+            # 渡していない一覧はその場で書き換える
+            assert repository._names is copied
+
+    assert names == ["API", "CPU", "DNS", "SQL", "TCP"]
+    assert repository.get_names() is copied
+    assert copied == ["AAA", "API", "BBB", "CCC", "CPU", "DNS", "SQL", "TCP"]